@@ -0,0 +1,243 @@
+"""
+Benchmarks reprodutíveis do fluxo consulta -> conversão -> ranking -> gravação, contra o servidor simulado.
+
+Uso:
+    python -m benchmarks.executar                         # todos os cenários, sem banco
+    python -m benchmarks.executar --cenario consulta_pequena --latencia 0.05 --variacao 0.02
+    python -m benchmarks.executar --banco --saida resultados.json --comparar resultados_anteriores.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmarks.servidor_mock import ServidorMockIBGE
+from src.Localidades import ESTADOS
+
+
+def _cenario_consulta_pequena():
+    return [["Maria", "Joao"]], ["35", "33"], ["F"], [1980, 1990]
+
+
+def _cenario_varredura_27_ufs():
+    return [[None]], [str(id_estado) for id_estado in ESTADOS], ["-"], list(range(1910, 2010, 10))
+
+
+def _cenario_lote_50k():
+    from src.Lotes import PlanejadorLotes
+    nomes = [f"Nome{indice:05d}" for indice in range(50_000)]
+    return PlanejadorLotes().planejar(nomes), ["BR"], ["-"], [None]
+
+
+CENARIOS = {
+    "consulta_pequena": _cenario_consulta_pequena,
+    "varredura_27_ufs": _cenario_varredura_27_ufs,
+    "lote_50k": _cenario_lote_50k,
+}
+
+
+class BancoContador:
+    """
+    Destino de gravação em memória, usado quando o benchmark roda sem PostgreSQL. Apenas conta as linhas recebidas.
+    """
+
+    def __init__(self):
+        self.linhas = 0
+        self._trava = threading.Lock()
+
+    def upsert_data(self, items, tamanho_lote=50000, levantar=False):
+        quantidade = sum(1 for _ in items)
+        with self._trava:
+            self.linhas += quantidade
+        return {"inseridos": quantidade}
+
+    def registrar_rankings(self, combinacoes):
+        pass
+
+    def registrar_nomes_sem_resultado(self, combinacoes):
+        pass
+
+    def close(self):
+        pass
+
+
+def percentil(valores, p):
+    """
+    Calcula o percentil `p` (0-100) de uma lista de valores, por interpolação linear.
+
+    Returns:
+        float ou None: Percentil calculado, ou None se a lista estiver vazia.
+    """
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def executar_cenario(nome, url, concorrencia, usar_banco):
+    """
+    Executa um cenário no processo atual e retorna suas métricas. Deve rodar em um processo próprio
+    para que o pico de memória (RSS) medido seja o do cenário.
+    """
+    from main import Main
+    from src.Metricas import metricas
+
+    latencias = []
+
+    def registrar_latencia(tipo, nome_metrica, valor, rotulos):
+        if tipo == "tempo" and nome_metrica == "requisicao":
+            latencias.append(valor)
+
+    metricas.adicionar_hook(registrar_latencia)
+    os.environ["IBGE_API_URL"] = url
+    banco = None if usar_banco else BancoContador()
+    main = Main(postgre=banco)
+    main.concorrencia = concorrencia
+    nomes, localidades, sexos, decadas = CENARIOS[nome]()
+
+    inicio = time.perf_counter()
+    resumo = main.mult_ranking(nomes, localidades, sexos, decadas)
+    main.ranking.ordenar_ranking()
+    duracao = time.perf_counter() - inicio
+    main.postgre.close()
+
+    etapas = {}
+    for tempo in metricas.resumo()["tempos"]:
+        etapas[tempo["nome"]] = etapas.get(tempo["nome"], 0.0) + tempo["soma"]
+    linhas = resumo.get("inseridos", 0) + resumo.get("atualizados", 0) + resumo.get("inalterados", 0)
+    return {
+        "requisicoes": len(latencias),
+        "falhas": resumo["falhas"],
+        "itens": resumo["itens"],
+        "duracao_s": duracao,
+        "requisicoes_s": len(latencias) / duracao if duracao else None,
+        "latencia_p50_s": percentil(latencias, 50),
+        "latencia_p95_s": percentil(latencias, 95),
+        "latencia_p99_s": percentil(latencias, 99),
+        "rss_pico_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "linhas_banco": linhas,
+        "linhas_banco_s": linhas / duracao if duracao else None,
+        "etapas_s": etapas,
+    }
+
+
+def _executar_em_processo(fila, *args):
+    logging.disable(logging.CRITICAL)
+    fila.put(executar_cenario(*args))
+
+
+def aguardar_resultado(fila, processo, intervalo=1.0):
+    """
+    Aguarda as métricas enviadas pelo processo do cenário, sem ficar bloqueado se ele terminar antes de enviá-las.
+
+    Returns:
+        dict ou None: Métricas do cenário, ou None se o processo terminou sem enviá-las.
+    """
+    while True:
+        try:
+            return fila.get(timeout=intervalo)
+        except queue.Empty:
+            if processo.exitcode is not None:
+                # O processo pode ter enviado as métricas logo antes de terminar.
+                try:
+                    return fila.get(timeout=intervalo)
+                except queue.Empty:
+                    return None
+
+
+def formatar(valor, formato, escala=1):
+    """
+    Formata uma métrica para exibição, usando "n/a" quando ela não pôde ser calculada.
+    """
+    return "n/a" if valor is None else format(valor * escala, formato)
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior):
+    """
+    Imprime a variação de vazão e de latência p95 de cada cenário em relação a um resultado anterior.
+    """
+    print(f"\nComparação com {anterior.get('commit')} ({anterior.get('data')}):")
+    for nome, metricas in atual["cenarios"].items():
+        antes = anterior.get("cenarios", {}).get(nome)
+        if not antes:
+            continue
+        for chave in ("requisicoes_s", "latencia_p95_s", "rss_pico_kb", "linhas_banco_s"):
+            valor, valor_antes = (metricas or {}).get(chave), antes.get(chave)
+            if valor is not None and valor_antes:
+                variacao = f"{(valor - valor_antes) / valor_antes * 100:+.1f}%"
+            else:
+                variacao = "n/a"
+            print(f"  {nome:<20}{chave:<18}{formatar(valor_antes, '.4f'):>14} -> {formatar(valor, '.4f'):>14} "
+                  f"({variacao})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Ranking de Nomes do IBGE contra um servidor simulado")
+    parser.add_argument("--cenario", nargs="+", choices=sorted(CENARIOS), default=list(CENARIOS),
+                        help="Cenários a executar (padrão: todos)")
+    parser.add_argument("--latencia", type=float, default=0.02, help="Latência média do servidor em segundos")
+    parser.add_argument("--variacao", type=float, default=0.005, help="Desvio padrão da latência em segundos")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Probabilidade de erro 503 por requisição")
+    parser.add_argument("--concorrencia", type=int, default=16, help="Requisições simultâneas do cliente")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do servidor simulado")
+    parser.add_argument("--banco", action="store_true", help="Grava no PostgreSQL configurado em credenciais.py")
+    parser.add_argument("--saida", help="Arquivo JSON onde salvar os resultados")
+    parser.add_argument("--comparar", help="Arquivo JSON de uma execução anterior para comparação")
+    args = parser.parse_args()
+
+    resultado = {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "parametros": {chave: valor for chave, valor in vars(args).items() if chave not in ("saida", "comparar")},
+        "cenarios": {},
+    }
+    contexto = multiprocessing.get_context("spawn")
+    with ServidorMockIBGE(latencia=args.latencia, variacao=args.variacao, taxa_erro=args.taxa_erro,
+                          semente=args.semente) as servidor:
+        for nome in args.cenario:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_executar_em_processo,
+                                        args=(fila, nome, servidor.url, args.concorrencia, args.banco))
+            processo.start()
+            metricas = aguardar_resultado(fila, processo)
+            processo.join()
+            resultado["cenarios"][nome] = metricas
+            if metricas is None:
+                logging.error(f"Cenário {nome} terminou sem resultados (código de saída {processo.exitcode})")
+                continue
+            print(f"{nome:<20}{metricas['requisicoes']:>8} req  {formatar(metricas['requisicoes_s'], '.1f'):>9} req/s  "
+                  f"p50 {formatar(metricas['latencia_p50_s'], '.1f', 1000):>7} ms  "
+                  f"p95 {formatar(metricas['latencia_p95_s'], '.1f', 1000):>7} ms  "
+                  f"p99 {formatar(metricas['latencia_p99_s'], '.1f', 1000):>7} ms  "
+                  f"RSS {metricas['rss_pico_kb'] / 1024:>6.1f} MiB  "
+                  f"{formatar(metricas['linhas_banco_s'], '.1f'):>10} linhas/s")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(resultado, json.load(arquivo))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from src.Localidades import ESTADOS
+from src.Lotes import normalizar_chave
+
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
+
+PERIODOS = ["1930[", "[1930,1940[", "[1940,1950[", "[1950,1960[", "[1960,1970[",
+            "[1970,1980[", "[1980,1990[", "[1990,2000[", "[2000,2010["]
+
+
+class ServidorMockIBGE:
+    """
+    Servidor HTTP local que imita a API de nomes e de localidades do IBGE, para medir o desempenho
+    do `RepositorioIBGE` e do `Main` sem depender do serviço real.
+
+    As respostas vêm dos arquivos em `benchmarks/dados/` (no formato exato da API; podem ser trocados por
+    respostas gravadas do serviço real). Nomes que não estão nesses arquivos recebem frequências determinísticas
+    derivadas do próprio nome, e cerca de 1 em cada `razao_ausentes` nomes não retorna linha, como na API real.
+
+    Atributos:
+        latencia (float): Atraso médio, em segundos, de cada resposta.
+        variacao (float): Desvio padrão, em segundos, somado ao atraso (jitter).
+        taxa_erro (float): Probabilidade, entre 0 e 1, de uma requisição responder 503.
+        requisicoes (int): Quantidade de requisições atendidas desde o início.
+        url (str): URL base da API simulada, no formato esperado por `RepositorioIBGE(url=...)`.
+    """
+
+    def __init__(self, latencia=0.0, variacao=0.0, taxa_erro=0.0, porta=0, semente=None, razao_ausentes=50):
+        """
+        Inicializa o servidor, sem iniciá-lo.
+
+        Args:
+            latencia (float, opcional): Atraso médio das respostas em segundos. Padrão é 0.
+            variacao (float, opcional): Desvio padrão do atraso em segundos. Padrão é 0.
+            taxa_erro (float, opcional): Probabilidade de erro 503 por requisição. Padrão é 0.
+            porta (int, opcional): Porta TCP. Se 0 (padrão), uma porta livre é escolhida.
+            semente (int, opcional): Semente do gerador aleatório, para execuções reprodutíveis.
+            razao_ausentes (int, opcional): Um em cada `razao_ausentes` nomes desconhecidos não retorna linha.
+        """
+        self.latencia = latencia
+        self.variacao = variacao
+        self.taxa_erro = taxa_erro
+        self.razao_ausentes = razao_ausentes
+        self.requisicoes = 0
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        with open(os.path.join(DIRETORIO_DADOS, "ranking.json"), encoding="utf-8") as arquivo:
+            self._ranking = json.load(arquivo)
+        with open(os.path.join(DIRETORIO_DADOS, "nomes.json"), encoding="utf-8") as arquivo:
+            self._nomes = {dado["nome"]: dado for dado in json.load(arquivo)}
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), self._criar_manipulador())
+        self._servidor.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}/api/"
+
+    def iniciar(self):
+        """
+        Inicia o servidor em uma thread em segundo plano.
+        """
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        """
+        Encerra o servidor e libera a porta.
+        """
+        if self._thread is not None:
+            self._servidor.shutdown()
+            self._thread = None
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.parar()
+
+    def responder(self, caminho, parametros):
+        """
+        Calcula a resposta de uma requisição.
+
+        Args:
+            caminho (str): Caminho da URL, já decodificado (ex: '/api/v2/censos/nomes/Maria|João').
+            parametros (dict): Parâmetros da consulta, com um valor por chave.
+
+        Returns:
+            tuple: (código HTTP, corpo serializável em JSON).
+        """
+        with self._trava:
+            self.requisicoes += 1
+            atraso = max(0.0, self._aleatorio.gauss(self.latencia, self.variacao)) if self.variacao else self.latencia
+            falhar = self._aleatorio.random() < self.taxa_erro
+        if atraso:
+            time.sleep(atraso)
+        if falhar:
+            return 503, {"erro": "Serviço indisponível"}
+
+        localidade = parametros.get("localidade", "BR")
+        sexo = parametros.get("sexo")
+        if caminho.startswith("/api/v2/censos/nomes/ranking"):
+            decada = parametros.get("decada")
+            fator = 1 + (zlib.crc32(f"{localidade}{sexo}{decada}".encode()) % 7) / 10
+            res = [dict(dado, frequencia=int(dado["frequencia"] / fator)) for dado in self._ranking[0]["res"]]
+            return 200, [{"localidade": localidade, "sexo": sexo, "res": res}]
+        if caminho.startswith("/api/v2/censos/nomes/"):
+            nomes = caminho[len("/api/v2/censos/nomes/"):].split("|")
+            return 200, [linha for linha in (self._linha_nome(nome, localidade, sexo) for nome in nomes) if linha]
+        if caminho.startswith("/api/v1/localidades/estados/"):
+            sigla_id = caminho.rsplit("/", 1)[-1].upper()
+            for estado in ESTADOS.values():
+                if sigla_id in (estado["sigla"], str(estado["id"])):
+                    return 200, estado
+            return 200, []
+        return 404, {"erro": "Recurso não encontrado"}
+
+    def _linha_nome(self, nome, localidade, sexo):
+        """
+        Monta a linha da API de nomes para um nome, ou None se o nome deve ser tratado como ausente.
+        """
+        chave = normalizar_chave(nome)
+        if chave in self._nomes:
+            return dict(self._nomes[chave], localidade=localidade, sexo=sexo)
+        semente = zlib.crc32(f"{chave}|{localidade}|{sexo}".encode())
+        if self.razao_ausentes and zlib.crc32(chave.encode()) % self.razao_ausentes == 0:
+            return None
+        res = [{"periodo": periodo, "frequencia": (semente >> indice) % 5000} for indice, periodo in enumerate(PERIODOS)]
+        return {"nome": chave, "sexo": sexo, "localidade": localidade, "res": res}
+
+    def _criar_manipulador(self):
+        servidor = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parametros = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+                codigo, corpo = servidor.responder(unquote(url.path), parametros)
+                conteudo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(conteudo)))
+                self.end_headers()
+                self.wfile.write(conteudo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        return Manipulador
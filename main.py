@@ -1,15 +1,32 @@
+from time import perf_counter
+
+_inicio_importacao = perf_counter()
+
 import argparse
 import logging
+import os
+import sys
 from itertools import product
-from multiprocessing import Pool
 from time import time
-import os
-from src.IBGE import RepositorioIBGE
+from src.IBGE import RepositorioIBGE, AsyncRepositorioIBGE, TAMANHO_RANKING
 from src.Ranking import Ranking
-from src.Item import Item
-from src.Postgre import Postgre
+from src.Item import Item, IndicePeriodos
+from src.Cache import CacheRespostas
+from src.Localidades import buscar_localidade, validar_tabela
+from src.Lotes import PlanejadorLotes, ler_arquivo_nomes, normalizar_chave
+from src.Normalizacao import IndiceNomes, normalizar_nome
+from src.Pipeline import FALHA, PipelineRanking, ler_manifesto_falhas, salvar_manifesto_falhas
+from src.Ingestao import Checkpoint, IngestaoCompleta
+from src.Metricas import metricas
+from src.Limitador import LimitadorAdaptativo
+from src.Transporte import TIMEOUT_CONEXAO, TIMEOUT_LEITURA, Transporte
 import credenciais
 
+# Os módulos pesados (`requests`, `psycopg2`, `pyarrow`) só são importados no primeiro uso, para que consultas
+# curtas, servidas pelo cache, não paguem por eles. O tempo de importação acima da meta é informado ao final.
+TEMPO_IMPORTACAO = perf_counter() - _inicio_importacao
+ORCAMENTO_IMPORTACAO = 0.1
+
 
 class Main:
     """
@@ -20,54 +37,155 @@ class Main:
     Atributos:
         repositorio_ibge (RepositorioIBGE): Instância para acessar a API do IBGE.
         ranking (Ranking): Instância para gerenciar o ranking de nomes.
-        postgre (Postgre): Instância para interagir com o banco de dados PostgreSQL.
+        postgre (PoolPostgre): Pool de conexões com o banco de dados PostgreSQL, criado no primeiro acesso.
         nomes_argumento (list): Lista de nomes recebidos como argumento de linha de comando.
         localidade_argumento (list): Lista de localidades recebidas como argumento.
         sexo_argumento (list): Lista de sexos recebidos como argumento.
         decada_argumento (list): Lista de décadas recebidas como argumento.
-        nomes (list): Lista de listas de nomes processados.
+        intervalo_decadas_argumento (str ou None): Intervalo de décadas recebido como argumento (formato 'YYYY:YYYY').
+        intervalos_soma (list of tuple): Intervalos de anos (inicio, fim) nos quais somar a frequência de cada nome.
+        somas_intervalo (dict): Frequência de cada nome somada em cada intervalo de `intervalos_soma`, indexada por
+            (nome, localidade, sexo, inicio, fim). Calculada pelas somas acumuladas do `IndicePeriodos` da resposta.
+        nomes (list): Lista de lotes de nomes processados, cada um consultado em uma única requisição.
         localidades (list): Lista de localidades processadas.
         sexos (list): Lista de sexos processados.
         decadas (list): Lista de décadas processadas.
+        concorrencia (int): Número máximo de requisições simultâneas à API do IBGE.
+        taxa_maxima (float ou None): Máximo de requisições por segundo à API. Se None, não há limite de taxa.
+        latencia_alvo (float): Latência, em segundos, abaixo da qual a concorrência pode crescer.
+        cache (CacheRespostas ou None): Cache persistente das respostas da API, compartilhado entre execuções.
+        planejador (PlanejadorLotes): Divide os nomes em lotes que cabem em uma URL da API.
+        nomes_sem_resultado (list): Nomes consultados para os quais a API não retornou nenhuma linha,
+            em todas as grafias informadas pelo usuário.
+        indice_nomes (IndiceNomes): Grafias informadas pelo usuário para cada nome canônico consultado.
+        incremental (bool): Se True, nomes já gravados recentemente no banco são servidos dele, sem consultar a API.
+        idade_maxima (float): Idade máxima, em segundos, de uma linha do banco para ser servida no modo incremental.
+        formato_saida (str): Formato do ranking ('tabela', 'csv', 'jsonl' ou 'parquet').
+        arquivo_saida (str ou None): Arquivo de destino do ranking. Se None, usa a saída padrão.
+        formato_metricas (str ou None): Formato do resumo de métricas emitido ao final ('json' ou 'prometheus').
+        arquivo_metricas (str ou None): Arquivo de destino do resumo de métricas. Se None, usa a saída de erro.
+        checkpoint_ingestao (str ou None): Se definido, executa a ingestão completa (`ingerir`) com este checkpoint.
+        novas_tentativas (int): Rodadas de novas tentativas para as combinações que falharem.
+        arquivo_falhas (str ou None): Manifesto onde gravar as combinações que falharam em todas as tentativas.
+        repetir_falhas (bool): Se True, repete apenas as combinações do manifesto de `arquivo_falhas`.
+        falhas (list of tuple): Pares (combinacao, erro) que falharam na última execução de `processar_combinacoes`.
+        sem_banco (bool): Se True, nada é gravado no banco e a conexão com ele nunca é aberta.
+        conexoes_banco (tuple): Conexões (mínimo ociosas, máximo) do pool do banco, usadas na sua criação.
     """
 
-    def __init__(self):
+    def __init__(self, postgre=None):
         """
-        Inicializa uma instância da classe Main, configurando o repositório IBGE,
-        a classe Ranking e a conexão com o banco de dados PostgreSQL.
+        Inicializa uma instância da classe Main, configurando o repositório IBGE e a classe Ranking.
+        Nenhuma conexão é aberta aqui: o pool do banco só é criado no primeiro acesso a `self.postgre`.
+
+        Args:
+            postgre (PoolPostgre, opcional): Destino das gravações. Se None, um pool com as credenciais de
+                `credenciais.py` é criado quando o banco for usado pela primeira vez. Qualquer objeto com `upsert_data`,
+                `registrar_rankings`, `registrar_nomes_sem_resultado` e `close` é aceito (e, no modo incremental,
+                `buscar`, `buscar_atualizados`, `nomes_sem_resultado_atualizados` e `rankings_atualizados`).
         """
         self.repositorio_ibge = RepositorioIBGE()
         self.ranking = Ranking()
-        self.postgre = Postgre(
-            host=credenciais.host,
-            port=credenciais.port,
-            database=credenciais.database,
-            user=credenciais.user,
-            password=credenciais.password
-        )
+        self._postgre = postgre
         self.nomes_argumento = []
         self.localidade_argumento = []
         self.sexo_argumento = []
         self.decada_argumento = []
+        self.intervalo_decadas_argumento = None
+        self.intervalos_soma = []
+        self.somas_intervalo = {}
         self.nomes = []
         self.localidades = []
         self.sexos = []
         self.decadas = []
+        self.concorrencia = 16
+        self.taxa_maxima = None
+        self.latencia_alvo = 2.0
+        self.cache = None
+        self.planejador = PlanejadorLotes(url_base=self.repositorio_ibge.url + "v2/censos/nomes/")
+        self.nomes_sem_resultado = []
+        self.indice_nomes = IndiceNomes()
+        self.incremental = False
+        self.idade_maxima = 24 * 3600
+        self.formato_saida = "tabela"
+        self.arquivo_saida = None
+        self.formato_metricas = None
+        self.arquivo_metricas = None
+        self.checkpoint_ingestao = None
+        self.novas_tentativas = 2
+        self.arquivo_falhas = None
+        self.repetir_falhas = False
+        self.falhas = []
+        self.sem_banco = False
+        # O ThreadedConnectionPool fecha as conexões devolvidas além do mínimo: com 0, cada sessão
+        # abriria e autenticaria uma conexão nova.
+        self.conexoes_banco = (1, 4)
+
+    @property
+    def postgre(self):
+        """
+        Pool de conexões com o banco, criado (e com as migrações aplicadas) no primeiro acesso.
+        """
+        if self._postgre is None:
+            from src.Postgre import PoolPostgre
+
+            self._postgre = PoolPostgre(
+                host=credenciais.host,
+                port=credenciais.port,
+                database=credenciais.database,
+                user=credenciais.user,
+                password=credenciais.password,
+                min_conexoes=self.conexoes_banco[0],
+                max_conexoes=self.conexoes_banco[1]
+            )
+        return self._postgre
+
+    def fechar_banco(self):
+        """
+        Fecha o pool do banco, se ele tiver sido aberto.
+        """
+        if self._postgre is not None:
+            self._postgre.close()
+
+    def gravar_itens(self, itens):
+        """
+        Grava itens no banco (`upsert_data`), levantando o erro se a gravação falhar, para que o `PipelineRanking`
+        e a `IngestaoCompleta` não deem por gravada uma combinação que não chegou ao banco.
+
+        Returns:
+            dict: Contagens 'inseridos', 'atualizados' e 'inalterados'.
+        """
+        return self.postgre.upsert_data(itens, levantar=True)
+
+    def adicionar_ao_ranking(self, item):
+        """
+        Adiciona ao ranking uma linha para cada grafia original (`self.indice_nomes`) do nome canônico do item.
+        Nomes ausentes do índice (por exemplo, os do ranking geral) são adicionados sem alteração.
+
+        Args:
+            item (Item): Item obtido para o nome canônico; o banco continua recebendo apenas esse item.
+        """
+        grafias = self.indice_nomes.grafias.get(normalizar_nome(item.nome)) if item.nome else None
+        if not grafias:
+            self.ranking.adicionar_item(item)
+            return
+        for grafia in grafias:
+            self.ranking.adicionar_item(Item(nome=grafia, sexo=item.sexo, localidade=item.localidade,
+                                             decada=item.decada, frequencia=item.frequencia))
 
     def tratar_nome(self, nome):
         """
-        Trata e formata o nome fornecido, capitalizando a primeira letra.
+        Converte o nome fornecido para a forma canônica usada pela API do IBGE (ver `normalizar_nome`).
 
         Args:
             nome (str): O nome a ser tratado e formatado.
 
         Returns:
-            str ou None: Nome tratado com a primeira letra em maiúscula,
+            str ou None: Nome sem acentos, em maiúsculas e com os espaços normalizados (ex: ' joão ' -> 'JOAO'),
             ou None se o nome for inválido.
         """
         if nome:
-            nome = str(nome)
-            return nome.capitalize()
+            return normalizar_nome(nome) or None
         else:
             return None
 
@@ -98,7 +216,7 @@ class Main:
         Valida e transforma a entrada da localidade em um ID numérico válido.
 
         Args:
-            localidade (str): Sigla ou ID da localidade.
+            localidade (str): Sigla, ID ou nome da localidade (estado ou região).
 
         Returns:
             str: ID da localidade validado ou 'BR' se não fornecido ou inválido.
@@ -106,7 +224,7 @@ class Main:
         Observações:
             - Se 'localidade' for None, retorna 'BR' (Brasil).
             - Se 'localidade' for 'BR', retorna 'BR'.
-            - Tenta obter o ID da localidade através da API do IBGE.
+            - Resolve o ID pela tabela fixa de estados e regiões (`src.Localidades`), sem acessar a rede.
             - Se a localidade não for encontrada, retorna 'BR' e registra um erro.
         """
         if localidade is None:
@@ -114,15 +232,11 @@ class Main:
         elif localidade.upper() == "BR":
             return "BR"
         else:
-            try:
-                info_estado = self.repositorio_ibge.obter_informacoes_estado(localidade)
-                if info_estado:
-                    return str(info_estado["id"])
-                else:
-                    logging.error(f"Localidade com ID ou sigla '{localidade}' não encontrada.")
-                    return "BR"
-            except Exception as e:
-                logging.error(f"Erro ao obter informações da localidade '{localidade}': {e}")
+            info_localidade = buscar_localidade(localidade)
+            if info_localidade:
+                return str(info_localidade["id"])
+            else:
+                logging.error(f"Localidade com ID ou sigla '{localidade}' não encontrada.")
                 return "BR"
 
     def tratar_decada(self, decada):
@@ -152,6 +266,67 @@ class Main:
         else:
             return None
 
+    def tratar_intervalo_decadas(self, intervalo):
+        """
+        Converte um intervalo no formato 'YYYY:YYYY' na lista de décadas que ele abrange.
+
+        Args:
+            intervalo (str): Intervalo de anos, com início e fim inclusivos (ex: '1950:2010').
+
+        Returns:
+            list of int: Décadas do intervalo em ordem crescente (ex: [1950, 1960, ..., 2010]),
+            ou lista vazia se o intervalo for inválido.
+        """
+        try:
+            inicio, fim = (int(ano) // 10 * 10 for ano in intervalo.split(":"))
+        except ValueError:
+            logging.error(f"Intervalo de décadas inválido: '{intervalo}'")
+            return []
+        if inicio > fim:
+            inicio, fim = fim, inicio
+        return list(range(inicio, fim + 10, 10))
+
+    def tratar_intervalo_soma(self, intervalo):
+        """
+        Converte um intervalo de anos no formato 'YYYY:YYYY' em uma tupla (inicio, fim), sem arredondar para décadas.
+
+        Args:
+            intervalo (str): Intervalo de anos, com início e fim inclusivos (ex: '1970:1999').
+
+        Returns:
+            tuple ou None: (inicio, fim) em ordem crescente, ou None se o intervalo for inválido.
+        """
+        try:
+            inicio, fim = (int(ano) for ano in intervalo.split(":"))
+        except ValueError:
+            logging.error(f"Intervalo de anos inválido: '{intervalo}'")
+            return None
+        return min(inicio, fim), max(inicio, fim)
+
+    def registrar_somas_intervalo(self, dado, localidade, sexo):
+        """
+        Soma a frequência de um nome em cada intervalo de `intervalos_soma`, guardando-a em `somas_intervalo`.
+
+        Args:
+            dado (dict): Linha da resposta da API de nomes, com 'nome' e 'res'.
+            localidade (str): Localidade da consulta.
+            sexo (str): Sexo da consulta.
+        """
+        indice = IndicePeriodos(dado["res"])
+        for inicio, fim in self.intervalos_soma:
+            self.somas_intervalo[(dado["nome"], localidade, sexo, inicio, fim)] = indice.intervalo(inicio, fim)
+
+    def exibir_somas_intervalo(self):
+        """
+        Exibe a frequência de cada nome somada em cada intervalo, em uma tabela com as colunas do ranking.
+        """
+        cabecalho = f"{'Nome':<15}{'Localidade':<15}{'Sexo':<15}{'Intervalo':<15}{'Frequência'}"
+        linhas = [f"\n{cabecalho}", "-" * len(cabecalho)]
+        for (nome, localidade, sexo, inicio, fim), frequencia in sorted(self.somas_intervalo.items(),
+                                                                        key=lambda par: (par[0][3:], -par[1])):
+            linhas.append(f"{nome:<18}{localidade or '':<14}{sexo or '-':<13}{f'{inicio}-{fim}':<16}{frequencia}")
+        print("\n".join(linhas))
+
     def args(self):
         """
         Configura e analisa os argumentos de linha de comando para o programa,
@@ -159,25 +334,171 @@ class Main:
         """
         parser = argparse.ArgumentParser(description="Ranking de Nomes do IBGE")
         parser.add_argument("--nomes", nargs='+', help="Nomes para gerar ranking")
+        parser.add_argument("--arquivo-nomes", help="Arquivo de texto com um nome por linha para gerar ranking")
         parser.add_argument("--local", nargs='+', help="Localidade para o ranking")
         parser.add_argument("--sexo", nargs='+', help="Sexo para o ranking ('M', 'F' ou '-')")
         parser.add_argument("--decada", nargs='+', help="Década para buscar o ranking (formato YYYY)")
+        parser.add_argument("--decada-range", help="Intervalo de décadas para buscar o ranking (formato YYYY:YYYY)")
+        parser.add_argument("--somar-intervalo", nargs='+', metavar="YYYY:YYYY",
+                            help="Com --nomes, exibe a frequência de cada nome somada no intervalo de anos")
+        parser.add_argument("--concorrencia", type=int, default=16,
+                            help="Número máximo de requisições simultâneas à API (padrão: 16)")
+        parser.add_argument("--taxa-maxima", type=float,
+                            help="Número máximo de requisições por segundo à API (padrão: sem limite)")
+        parser.add_argument("--latencia-alvo", type=float, default=2.0,
+                            help="Latência em segundos acima da qual a concorrência para de crescer (padrão: 2)")
+        parser.add_argument("--timeout-conexao", type=float, default=TIMEOUT_CONEXAO,
+                            help=f"Tempo máximo em segundos para conectar à API (padrão: {TIMEOUT_CONEXAO:g})")
+        parser.add_argument("--timeout-leitura", type=float, default=TIMEOUT_LEITURA,
+                            help=f"Tempo máximo em segundos de espera por cada leitura da resposta (padrão: {TIMEOUT_LEITURA:g})")
+        parser.add_argument("--sem-cache", action="store_true",
+                            help="Ignora o cache local de respostas e consulta sempre a API")
+        parser.add_argument("--validar-localidades", action="store_true",
+                            help="Confere a tabela fixa de estados com a API de localidades do IBGE")
+        parser.add_argument("--incremental", action="store_true",
+                            help="Consulta na API apenas os nomes e rankings ausentes ou desatualizados no banco")
+        parser.add_argument("--idade-maxima", type=float, default=24,
+                            help="Idade máxima, em horas, dos dados do banco no modo incremental (padrão: 24)")
+        parser.add_argument("--top", type=int,
+                            help="Mantém e exibe apenas os N nomes mais frequentes (por grupo, com --agrupar-por)")
+        parser.add_argument("--agrupar-por", nargs='+', choices=["localidade", "decada", "sexo"],
+                            help="Calcula o top N separadamente para cada localidade, década e/ou sexo")
+        parser.add_argument("--deslocamento", type=int, default=0,
+                            help="Quantidade de itens do topo a pular em cada grupo, para paginar com --top (padrão: 0)")
+        parser.add_argument("--formato", choices=["tabela", "csv", "jsonl", "parquet"], default="tabela",
+                            help="Formato do ranking exibido ou exportado (padrão: tabela)")
+        parser.add_argument("--saida", help="Arquivo onde gravar o ranking (padrão: saída padrão)")
+        parser.add_argument("--metricas", choices=["json", "prometheus"],
+                            help="Emite ao final um resumo de tempos e contadores de cada etapa")
+        parser.add_argument("--arquivo-metricas", help="Arquivo onde gravar o resumo de métricas (padrão: saída de erro)")
+        parser.add_argument("--novas-tentativas", type=int, default=2,
+                            help="Rodadas de novas tentativas para as combinações que falharem (padrão: 2)")
+        parser.add_argument("--arquivo-falhas", default="falhas_ibge.json",
+                            help="Manifesto das combinações que falharam em todas as tentativas (padrão: falhas_ibge.json)")
+        parser.add_argument("--repetir-falhas", "--retry-failed", action="store_true",
+                            help="Repete apenas as combinações registradas no manifesto de --arquivo-falhas")
+        parser.add_argument("--ingestao-completa", metavar="CHECKPOINT",
+                            help="Grava no banco todos os nomes x UF x sexo x década, retomando do arquivo de checkpoint")
+        parser.add_argument("--sem-banco", action="store_true",
+                            help="Apenas consulta e exibe o ranking, sem abrir a conexão com o banco nem gravar nele")
         args = parser.parse_args()
         self.nomes_argumento = args.nomes
+        if args.arquivo_nomes:
+            self.nomes_argumento = (self.nomes_argumento or []) + ler_arquivo_nomes(args.arquivo_nomes)
         self.localidade_argumento = args.local
         self.sexo_argumento = args.sexo
         self.decada_argumento = args.decada
+        self.intervalo_decadas_argumento = args.decada_range
+        if args.somar_intervalo:
+            if not (args.nomes or args.arquivo_nomes) or args.formato != "tabela" or args.incremental:
+                parser.error("--somar-intervalo requer --nomes ou --arquivo-nomes, com --formato tabela e sem "
+                             "--incremental")
+            intervalos = (self.tratar_intervalo_soma(intervalo) for intervalo in args.somar_intervalo)
+            self.intervalos_soma = list(dict.fromkeys(intervalo for intervalo in intervalos if intervalo))
+        self.concorrencia = args.concorrencia
+        self.taxa_maxima = args.taxa_maxima
+        self.latencia_alvo = args.latencia_alvo
+        self.repositorio_ibge.timeout = (args.timeout_conexao, args.timeout_leitura)
+        self.sem_banco = args.sem_banco
+        if self.sem_banco and (args.incremental or args.ingestao_completa):
+            parser.error("--sem-banco não pode ser usado com --incremental ou --ingestao-completa")
+        self.incremental = args.incremental
+        self.idade_maxima = args.idade_maxima * 3600
+        self.formato_saida = args.formato
+        self.arquivo_saida = args.saida
+        self.formato_metricas = args.metricas
+        if args.top is not None:
+            self.ranking = Ranking(top=args.top, agrupar_por=args.agrupar_por, deslocamento=args.deslocamento)
+        self.arquivo_metricas = args.arquivo_metricas
+        self.checkpoint_ingestao = args.ingestao_completa
+        self.novas_tentativas = args.novas_tentativas
+        self.arquivo_falhas = args.arquivo_falhas
+        self.repetir_falhas = args.repetir_falhas
+        if not args.sem_cache:
+            self.cache = CacheRespostas()
+            self.repositorio_ibge.cache = self.cache
+        if args.validar_localidades:
+            divergentes = validar_tabela(self.repositorio_ibge)
+            if divergentes:
+                logging.error(f"Estados divergentes da API de localidades: {divergentes}")
 
     def tratar_args(self):
         """
         Processa os argumentos de linha de comando previamente analisados,
         aplicando as funções de tratamento e validando os dados.
         Prepara as listas de parâmetros para as consultas à API.
+
+        Grafias de um mesmo nome ('joão', 'JOÃO', 'Joao') são reduzidas ao nome canônico pelo `IndiceNomes`
+        antes do planejamento, e os nomes canônicos são divididos em lotes pelo `PlanejadorLotes`;
+        sem nomes, é usado o lote [None] (ranking geral).
         """
-        self.nomes = [[self.tratar_nome(nome) for nome in self.nomes_argumento or ['']]]
+        self.indice_nomes = IndiceNomes(self.nomes_argumento or [])
+        nomes = self.indice_nomes.canonicos()
+        colapsados = self.indice_nomes.total_grafias - len(nomes)
+        if colapsados:
+            metricas.incrementar("nomes_colapsados", colapsados)
+            logging.info(f"{colapsados} grafias repetidas reduzidas a {len(nomes)} nomes canônicos")
+        self.nomes = self.planejador.planejar(nomes) or [[None]]
         self.localidades = [self.tratar_localidade(loc) for loc in self.localidade_argumento or ['BR']]
         self.sexos = [self.tratar_sexo(sexo) for sexo in self.sexo_argumento or ['-']]
-        self.decadas = [self.tratar_decada(decada) for decada in self.decada_argumento or ['']]
+        decadas = [self.tratar_decada(decada) for decada in self.decada_argumento or []]
+        if self.intervalo_decadas_argumento:
+            decadas += self.tratar_intervalo_decadas(self.intervalo_decadas_argumento)
+        self.decadas = list(dict.fromkeys(decadas)) or [None]
+
+    @staticmethod
+    def converter_resposta(combinacao, resposta, decadas=None):
+        """
+        Transforma a resposta da API para uma combinação de parâmetros em uma lista de `Item`.
+
+        Args:
+            combinacao (tuple): Tupla contendo (nomes, localidade, sexo, decada).
+            resposta (list of dict): Resposta da API do IBGE para a combinação.
+            decadas (list of int, opcional): Para consultas de nomes, décadas para as quais gerar itens
+                a partir da mesma resposta. Se None, usa apenas a década da combinação.
+
+        Returns:
+            list of Item: Lista de objetos `Item` com os dados da resposta.
+
+        Observações:
+            - Se 'nomes' for [None], a resposta é a do ranking geral.
+            - Cada item retornado pela API de ranking é transformado em uma instância de `Item`.
+            - Na API de nomes, os períodos de cada nome são indexados uma única vez (`IndicePeriodos`)
+              e geram um `Item` por década pedida.
+            - O tempo de conversão e a quantidade de itens criados são registrados em `src.Metricas.metricas`.
+        """
+        with metricas.cronometrar("conversao"):
+            itens = Main._converter_itens(combinacao, resposta, decadas)
+        metricas.incrementar("itens_convertidos", len(itens))
+        return itens
+
+    @staticmethod
+    def _converter_itens(combinacao, resposta, decadas):
+        nomes, localidade, sexo, decada = combinacao
+        itens = []
+        if len(nomes) == 1 and nomes[0] is None:
+            for dado in resposta[0]["res"]:
+                item = Item(
+                    nome=dado["nome"],
+                    localidade=localidade,
+                    sexo=sexo,
+                    decada=decada,
+                    frequencia=dado["frequencia"]
+                )
+                itens.append(item)
+        else:
+            for dado in resposta:
+                indice = IndicePeriodos(dado["res"])
+                for decada_item in (decadas if decadas is not None else [decada]):
+                    item = Item(
+                        nome=dado["nome"],
+                        sexo=sexo,
+                        localidade=localidade,
+                        decada=decada_item,
+                        resposta_api=indice
+                    )
+                    itens.append(item)
+        return itens
 
     @staticmethod
     def processar_combinacao(combinacao):
@@ -198,37 +519,16 @@ class Main:
         repositorio = RepositorioIBGE()
         try:
             resposta = repositorio.obter_ranking(nomes, localidade, sexo, decada)
-            itens = []
-            if len(nomes) == 1 and nomes[0] is None:
-                for dado in resposta[0]["res"]:
-                    item = Item(
-                        nome=dado["nome"],
-                        localidade=localidade,
-                        sexo=sexo,
-                        decada=decada,
-                        frequencia=dado["frequencia"]
-                    )
-                    itens.append(item)
-            else:
-                for dado in resposta:
-                    item = Item(
-                        nome=dado["nome"],
-                        sexo=sexo,
-                        localidade=localidade,
-                        decada=decada,
-                        resposta_api=dado["res"]
-                    )
-                    itens.append(item)
-            return itens
+            return Main.converter_resposta(combinacao, resposta)
         except Exception as e:
             logging.error(f"Erro ao processar a combinação {combinacao}: {e}")
             return []
 
     def mult_ranking(self, nomes, localidades, sexos, decadas):
         """
-        Executa consultas paralelas à API do IBGE para todas as combinações possíveis
-        dos parâmetros fornecidos. Coleta todos os itens resultantes, elimina duplicatas
-        e os insere no banco de dados em uma única operação.
+        Executa consultas concorrentes à API do IBGE para todas as combinações possíveis
+        dos parâmetros fornecidos, gravando os resultados no banco de dados à medida que cada
+        combinação termina.
 
         Args:
             nomes (list of list of str): Lista de listas de nomes a serem consultados.
@@ -236,40 +536,312 @@ class Main:
             sexos (list of str): Lista de sexos ('M', 'F' ou '-') para a consulta.
             decadas (list of int): Lista de décadas (ex: 1990) para a consulta.
 
+        Returns:
+            dict: Resumo da execução do `PipelineRanking` (combinações, falhas, itens, gravações).
+
         Observações:
-            - Utiliza multiprocessing para executar as consultas em paralelo.
-            - Deduplica os itens em memória usando a chave única gerada por cada `Item`.
-            - Armazena os itens únicos no ranking e no banco de dados.
+            - Utiliza um único event loop (`AsyncRepositorioIBGE`) com no máximo `self.concorrencia`
+              requisições simultâneas, todas compartilhando o transporte HTTP do processo (`Transporte.compartilhado`),
+              cujo reaproveitamento de conexões é registrado nas métricas.
+            - Um `LimitadorAdaptativo` ajusta a concorrência efetiva conforme as respostas da API
+              (reduz em 429/5xx e tempos esgotados, cresce enquanto a latência está abaixo de `self.latencia_alvo`)
+              e respeita `self.taxa_maxima`.
+            - Respostas presentes no cache local não geram requisições.
+            - Os itens são deduplicados, adicionados ao ranking e gravados em micro-lotes pelo `PipelineRanking`,
+              sem esperar pelas demais combinações. No ranking, cada item aparece sob todas as grafias originais
+              do seu nome canônico (`adicionar_ao_ranking`); o banco recebe apenas o nome canônico.
+            - Registra em `self.nomes_sem_resultado` os nomes sem nenhuma linha em todas as combinações,
+              com cada nome canônico substituído pelas grafias originais (`self.indice_nomes`).
+            - Lotes de nomes são consultados uma única vez por (localidade, sexo), já que a API de nomes
+              retorna todos os períodos; os itens de cada década são gerados localmente.
+              Apenas o ranking geral ([None]) é consultado uma vez por década.
+            - As combinações de ranking geral consultadas e gravadas com sucesso são registradas no banco
+              (`registrar_rankings`).
+            - No modo incremental (`self.incremental`), apenas os nomes ausentes ou desatualizados no banco
+              são consultados (ver `combinacoes_pendentes`), e rankings gerais registrados há no máximo
+              `self.idade_maxima` segundos são lidos do banco (ver `combinacoes_ranking_pendentes`).
+        """
+        lotes_ranking = [lote for lote in nomes if len(lote) == 1 and lote[0] is None]
+        lotes_nomes = [lote for lote in nomes if not (len(lote) == 1 and lote[0] is None)]
+        if self.incremental and lotes_nomes:
+            combinacoes_nomes = self.combinacoes_pendentes(lotes_nomes, localidades, sexos, decadas)
+        else:
+            combinacoes_nomes = list(product(lotes_nomes, localidades, sexos, [None]))
+        if self.incremental and lotes_ranking:
+            combinacoes_ranking = self.combinacoes_ranking_pendentes(localidades, sexos, decadas)
+        else:
+            combinacoes_ranking = list(product(lotes_ranking, localidades, sexos, decadas))
+        return self.processar_combinacoes(combinacoes_nomes + combinacoes_ranking, decadas)
+
+    def processar_combinacoes(self, combinacoes, decadas):
+        """
+        Consulta a API para as combinações fornecidas pelo `PipelineRanking`, adicionando os itens ao ranking
+        e gravando-os no banco (ver `mult_ranking`).
+
+        Combinações que falharem, na consulta à API ou na gravação no banco, são repetidas em até
+        `self.novas_tentativas` rodadas ao final da passagem principal. As que falharem em todas ficam em `self.falhas` e, se `self.arquivo_falhas` estiver definido, são gravadas
+        nesse manifesto para uma execução posterior com `--repetir-falhas`.
+
+        Args:
+            combinacoes (list of tuple): Tuplas (nomes, localidade, sexo, decada).
+            decadas (list of int): Décadas para as quais gerar itens a partir das respostas de nomes.
+
+        Returns:
+            dict: Resumo da execução do `PipelineRanking`.
+        """
+        concorrencia = max(1, min(len(combinacoes), self.concorrencia))
+        repositorio = AsyncRepositorioIBGE(
+            concorrencia=concorrencia,
+            repositorio=RepositorioIBGE(
+                tamanho_pool=concorrencia,
+                cache=self.cache,
+                url=self.repositorio_ibge.url,
+                limitador=LimitadorAdaptativo(
+                    taxa=self.taxa_maxima,
+                    concorrencia_maxima=concorrencia,
+                    latencia_alvo=self.latencia_alvo
+                ),
+                timeout=self.repositorio_ibge.timeout
+            )
+        )
+        nomes_consultados = {}
+        nomes_encontrados = set()
+        rankings_consultados = []
+        sem_resultado = []
+
+        def registrar_resposta(combinacao, resposta):
+            lote, localidade, sexo, decada = combinacao
+            if len(lote) == 1 and lote[0] is None:
+                rankings_consultados.append((localidade, sexo, decada))
+                return
+            for nome, dado in self.planejador.mapear_resposta(lote, resposta).items():
+                nomes_consultados[nome] = True
+                if dado is not None:
+                    nomes_encontrados.add(nome)
+                    if self.intervalos_soma:
+                        self.registrar_somas_intervalo(dado, localidade, sexo)
+                else:
+                    sem_resultado.append((combinacao, normalizar_chave(nome)))
+
+        def converter(combinacao, resposta):
+            lote = combinacao[0]
+            if len(lote) == 1 and lote[0] is None:
+                return self.converter_resposta(combinacao, resposta)
+            return self.converter_resposta(combinacao, resposta, decadas)
+
+        pipeline = PipelineRanking(
+            repositorio,
+            converter=converter,
+            gravar=None if self.sem_banco else self.gravar_itens,
+            ao_item=self.adicionar_ao_ranking,
+            ao_resposta=registrar_resposta,
+            novas_tentativas=self.novas_tentativas
+        )
+        # O transporte só existe se alguma consulta não foi servida pelo cache. O repositório com limitador usa
+        # o transporte compartilhado que não repete respostas de sobrecarga.
+        transporte = Transporte.existente(repetir_sobrecarga=False)
+        conexoes_antes = transporte.estatisticas() if transporte is not None else {}
+        try:
+            resumo = pipeline.processar(combinacoes)
+        finally:
+            repositorio.fechar()
+        transporte = Transporte.existente(repetir_sobrecarga=False)
+        if transporte is not None:
+            conexoes = transporte.estatisticas()
+            for chave in ("conexoes_novas", "conexoes_reutilizadas"):
+                metricas.incrementar(chave, max(0, conexoes[chave] - conexoes_antes.get(chave, 0)))
+        # Só são registrados os rankings cujos itens chegaram ao banco; os demais são consultados de novo
+        # na próxima execução incremental.
+        rankings_gravados = [(localidade, sexo, decada) for localidade, sexo, decada in rankings_consultados
+                             if pipeline.estados.get(((None,), localidade, sexo, decada)) != FALHA]
+        if rankings_gravados and not self.sem_banco:
+            self.postgre.registrar_rankings(rankings_gravados)
+        nomes_sem_linhas = [(nome, combinacao[1], combinacao[2]) for combinacao, nome in sem_resultado
+                            if pipeline.estados.get(PipelineRanking.chave_combinacao(combinacao)) != FALHA]
+        if nomes_sem_linhas and not self.sem_banco:
+            self.postgre.registrar_nomes_sem_resultado(nomes_sem_linhas)
+        self.nomes_sem_resultado = self.indice_nomes.expandir(
+            nome for nome in nomes_consultados if nome not in nomes_encontrados)
+        self.falhas = pipeline.falhas()
+        if self.falhas:
+            logging.error(f"{len(self.falhas)} combinações falharam após {self.novas_tentativas} rodadas de novas "
+                          f"tentativas" + (f"; gravadas em '{self.arquivo_falhas}'" if self.arquivo_falhas else ""))
+            if self.arquivo_falhas:
+                salvar_manifesto_falhas(self.arquivo_falhas, self.falhas, decadas)
+        logging.info(f"Banco de dados: {resumo.get('inseridos', 0)} inseridos, {resumo.get('atualizados', 0)} "
+                     f"atualizados, {resumo.get('inalterados', 0)} inalterados")
+        return resumo
+
+    def repetir_falhas_anteriores(self):
+        """
+        Repete as combinações registradas no manifesto `self.arquivo_falhas` por uma execução anterior.
+        O manifesto é removido se todas forem concluídas, ou regravado apenas com as que voltarem a falhar.
+
+        Returns:
+            dict: Resumo da execução do `PipelineRanking`, ou dicionário vazio se não houver manifesto.
+        """
+        if not self.arquivo_falhas or not os.path.exists(self.arquivo_falhas):
+            logging.error(f"Manifesto de falhas não encontrado: '{self.arquivo_falhas}'")
+            return {}
+        combinacoes, decadas = ler_manifesto_falhas(self.arquivo_falhas)
+        resumo = self.processar_combinacoes(combinacoes, decadas)
+        if not self.falhas:
+            os.remove(self.arquivo_falhas)
+        return resumo
+
+    def ingerir(self, caminho_checkpoint, nomes_extras=()):
+        """
+        Percorre todo o espaço nome x UF x sexo x década da API do IBGE e grava o resultado no banco
+        (ver `src.Ingestao.IngestaoCompleta`), retomando do checkpoint se ele já existir.
+
+        Args:
+            caminho_checkpoint (str): Arquivo de checkpoint da ingestão.
+            nomes_extras (iterable of str, opcional): Nomes consultados além dos descobertos nos rankings.
+
+        Returns:
+            dict: Resumo da ingestão.
         """
-        combinacoes = list(product(nomes, localidades, sexos, decadas))
-        num_processos = min(len(combinacoes), os.cpu_count())
-        with Pool(processes=num_processos) as pool:
-            todos_itens = pool.map(self.processar_combinacao, combinacoes)
+        repositorio = AsyncRepositorioIBGE(
+            concorrencia=self.concorrencia,
+            repositorio=RepositorioIBGE(
+                tamanho_pool=self.concorrencia,
+                cache=self.cache,
+                url=self.repositorio_ibge.url,
+                limitador=LimitadorAdaptativo(
+                    taxa=self.taxa_maxima,
+                    concorrencia_maxima=self.concorrencia,
+                    latencia_alvo=self.latencia_alvo
+                ),
+                timeout=self.repositorio_ibge.timeout
+            )
+        )
+        try:
+            with Checkpoint(caminho_checkpoint) as checkpoint:
+                ingestao = IngestaoCompleta(repositorio, self.converter_resposta, self.gravar_itens,
+                                            checkpoint, self.planejador,
+                                            registrar_rankings=self.postgre.registrar_rankings)
+                return ingestao.executar(nomes_extras)
+        finally:
+            repositorio.fechar()
+
+    def combinacoes_pendentes(self, lotes_nomes, localidades, sexos, decadas):
+        """
+        Separa, para cada (localidade, sexo), os nomes que precisam ser consultados na API dos que já estão
+        no banco com todas as décadas pedidas e atualizados há no máximo `self.idade_maxima` segundos.
+
+        Os nomes atualizados são adicionados ao ranking a partir do banco; os demais são replanejados em lotes.
+        Nomes para os quais a API não retornou linha há no máximo `self.idade_maxima` segundos
+        (`nomes_sem_resultado_atualizados`) também não são consultados, e não geram itens.
 
-        # Achatar a lista de listas em uma única lista
-        itens_para_inserir = [item for sublist in todos_itens for item in sublist]
+        Args:
+            lotes_nomes (list of list of str): Lotes de nomes a serem consultados.
+            localidades (list of str): Localidades (IDs ou 'BR').
+            sexos (list of str): Sexos ('M', 'F' ou '-').
+            decadas (list of int): Décadas pedidas (None para todas as décadas).
+
+        Returns:
+            list of tuple: Combinações (lote, localidade, sexo, None) que ainda precisam ir à API.
+        """
+        chaves = {nome: normalizar_chave(nome) for lote in lotes_nomes for nome in lote}
+        linhas = self.postgre.buscar_atualizados(set(chaves.values()), localidades, sexos, decadas, self.idade_maxima)
+        frequencias = {(nome, localidade, sexo, decada): frequencia
+                       for nome, localidade, sexo, decada, frequencia in linhas}
+        sem_resultado = self.postgre.nomes_sem_resultado_atualizados(set(chaves.values()), localidades, sexos,
+                                                                     self.idade_maxima)
+        combinacoes = []
+        servidos = 0
+        for localidade, sexo in product(localidades, sexos):
+            pendentes = []
+            for nome, chave in chaves.items():
+                chaves_linhas = [(chave, localidade, sexo, decada) for decada in decadas]
+                if not all(chave_linha in frequencias for chave_linha in chaves_linhas):
+                    if (chave, localidade, sexo) in sem_resultado:
+                        servidos += 1
+                    else:
+                        pendentes.append(nome)
+                    continue
+                for chave_linha in chaves_linhas:
+                    self.adicionar_ao_ranking(Item(nome=chave, localidade=localidade, sexo=sexo,
+                                                   decada=chave_linha[3], frequencia=frequencias[chave_linha]))
+                servidos += 1
+            combinacoes.extend(product(self.planejador.planejar(pendentes), [localidade], [sexo], [None]))
+        metricas.incrementar("incremental_nomes_banco", servidos)
+        logging.info(f"Modo incremental: {servidos} consultas de nomes servidas pelo banco, "
+                     f"{len(combinacoes)} lotes enviados à API")
+        return combinacoes
+
+    def combinacoes_ranking_pendentes(self, localidades, sexos, decadas):
+        """
+        Lê do banco os rankings gerais registrados há no máximo `self.idade_maxima` segundos, adicionando-os
+        ao ranking, e retorna as combinações de ranking geral que ainda precisam ir à API.
 
-        # Deduplicar itens usando get_unique_key
-        itens_unicos = {}
-        for item in itens_para_inserir:
-            chave = item.get_unique_key()
-            if chave not in itens_unicos:
-                itens_unicos[chave] = item
-                self.ranking.adicionar_item(item)
+        Args:
+            localidades (list of str): Localidades (IDs ou 'BR').
+            sexos (list of str): Sexos ('M', 'F' ou '-').
+            decadas (list of int): Décadas pedidas (None para todas as décadas).
 
-        # Inserir todos os itens únicos no banco de dados de uma vez
-        self.postgre.insert_data(list(itens_unicos.values()))
+        Returns:
+            list of tuple: Combinações ([None], localidade, sexo, decada) a consultar na API.
+        """
+        atualizados = self.postgre.rankings_atualizados(localidades, sexos, decadas, self.idade_maxima)
+        if atualizados:
+            self.ranking.carregar_do_banco(
+                self.postgre,
+                localidades={localidade for localidade, _, _ in atualizados},
+                sexos={sexo for _, sexo, _ in atualizados},
+                decadas={decada for _, _, decada in atualizados},
+                limite=TAMANHO_RANKING,
+                por_grupo=True,
+                grupos=atualizados
+            )
+        metricas.incrementar("incremental_rankings_banco", len(atualizados))
+        return [([None], localidade, sexo, decada) for localidade, sexo, decada in product(localidades, sexos, decadas)
+                if (localidade, sexo, decada) not in atualizados]
+
+    def emitir_metricas(self):
+        """
+        Grava o resumo de métricas da execução no formato escolhido em `--metricas`, se houver.
+        """
+        if self.formato_metricas is None:
+            return
+        conteudo = metricas.prometheus() if self.formato_metricas == "prometheus" else metricas.json() + "\n"
+        if self.arquivo_metricas:
+            with open(self.arquivo_metricas, "w", encoding="utf-8") as arquivo:
+                arquivo.write(conteudo)
+        else:
+            sys.stderr.write(conteudo)
 
 
 if __name__ == "__main__":
     start_time = time()
     main = Main()
     main.args()
-    main.tratar_args()
-    main.mult_ranking(main.nomes, main.localidades, main.sexos, main.decadas)
-    main.ranking.ordenar_ranking()
-    main.ranking.exibir_ranking()
-    main.postgre.close()
+    if main.checkpoint_ingestao:
+        main.ingerir(main.checkpoint_ingestao, main.nomes_argumento or [])
+    else:
+        if main.repetir_falhas:
+            main.repetir_falhas_anteriores()
+        else:
+            main.tratar_args()
+            main.mult_ranking(main.nomes, main.localidades, main.sexos, main.decadas)
+        main.ranking.ordenar_ranking()
+        main.ranking.exportar(main.formato_saida, main.arquivo_saida)
+        if main.somas_intervalo:
+            main.exibir_somas_intervalo()
+        if main.nomes_sem_resultado:
+            logging.warning(f"Nomes sem resultado na API do IBGE: {', '.join(main.nomes_sem_resultado)}")
+    main.fechar_banco()
+    if main.cache is not None:
+        main.cache.fechar()
     end_time = time()
     total_time = end_time - start_time
-    print(f"Tempo total de execução: {total_time} segundos")
+    metricas.registrar_tempo("execucao", total_time)
+    metricas.registrar_tempo("importacao", TEMPO_IMPORTACAO)
+    if TEMPO_IMPORTACAO > ORCAMENTO_IMPORTACAO:
+        logging.warning(f"Importação dos módulos levou {TEMPO_IMPORTACAO * 1000:.0f} ms, acima da meta de "
+                        f"{ORCAMENTO_IMPORTACAO * 1000:.0f} ms")
+    main.emitir_metricas()
+    # Na saída de erro, para não misturar o texto ao ranking exportado em CSV, JSONL ou Parquet na saída padrão.
+    print(f"Tempo total de execução: {total_time} segundos", file=sys.stderr)
+    if main.falhas:
+        sys.exit(1)
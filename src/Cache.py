@@ -0,0 +1,227 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.Decodificador import codificar, decodificar
+
+
+class CacheRespostas:
+    """
+    Cache persistente para as respostas da API do IBGE, com duas camadas:
+    uma LRU em memória, consultada primeiro, e um banco SQLite local que sobrevive entre execuções do `main.py`.
+
+    As entradas são identificadas pelo endpoint consultado e pelos parâmetros `localidade`, `sexo` e `decada`
+    normalizados. Cada endpoint tem seu próprio tempo de validade (TTL) e o tamanho total do disco é limitado,
+    removendo as entradas acessadas há mais tempo quando o limite é ultrapassado.
+
+    Atributos:
+        caminho (str): Caminho do arquivo SQLite usado como armazenamento em disco.
+        ttls (dict): Mapeamento de prefixo de endpoint para TTL em segundos.
+        ttl_padrao (int): TTL, em segundos, para endpoints sem prefixo configurado.
+        tamanho_maximo (int): Tamanho máximo, em bytes, das respostas armazenadas em disco.
+        itens_memoria (int): Número máximo de respostas mantidas na camada em memória.
+    """
+
+    TTLS_PADRAO = {
+        "v2/censos/nomes": 30 * 24 * 3600,
+        "v1/localidades": 180 * 24 * 3600,
+    }
+
+    def __init__(self, caminho=None, ttls=None, ttl_padrao=7 * 24 * 3600,
+                 tamanho_maximo=256 * 1024 * 1024, itens_memoria=1024):
+        """
+        Inicializa o cache, criando o arquivo SQLite e a tabela de respostas se necessário.
+
+        Args:
+            caminho (str, opcional): Caminho do arquivo SQLite. Se None, usa a variável de ambiente
+                `IBGE_CACHE_DIR` ou `~/.cache/ibge`, com o arquivo `respostas.sqlite3`.
+            ttls (dict, opcional): TTLs por prefixo de endpoint, somados aos de `TTLS_PADRAO`.
+            ttl_padrao (int, opcional): TTL para endpoints sem prefixo configurado. Padrão é 7 dias.
+            tamanho_maximo (int, opcional): Limite em bytes do armazenamento em disco. Padrão é 256 MiB.
+            itens_memoria (int, opcional): Capacidade da camada LRU em memória. Padrão é 1024.
+        """
+        if caminho is None:
+            diretorio = os.environ.get("IBGE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "ibge")
+            os.makedirs(diretorio, exist_ok=True)
+            caminho = os.path.join(diretorio, "respostas.sqlite3")
+        self.caminho = caminho
+        self.ttls = dict(self.TTLS_PADRAO, **(ttls or {}))
+        self.ttl_padrao = ttl_padrao
+        self.tamanho_maximo = tamanho_maximo
+        self.itens_memoria = itens_memoria
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+
+        self.conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute('''
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                valor BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                expira_em REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            )
+        ''')
+        self.conexao.execute("CREATE INDEX IF NOT EXISTS respostas_acessado_em ON respostas (acessado_em)")
+        self.conexao.commit()
+        self._tamanho_total = self.conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+
+    @staticmethod
+    def gerar_chave(endpoint, parametros=None):
+        """
+        Gera a chave de cache para um endpoint e seus parâmetros.
+
+        Args:
+            endpoint (str): URL ou caminho do endpoint consultado.
+            parametros (dict, opcional): Parâmetros da consulta. Valores None são ignorados.
+
+        Returns:
+            str: Chave que independe da ordem dos parâmetros e do tipo (int ou str) dos seus valores.
+        """
+        parametros = parametros or {}
+        normalizados = "&".join(
+            f"{chave}={str(valor).upper()}" for chave, valor in sorted(parametros.items()) if valor is not None
+        )
+        return f"{endpoint}?{normalizados}"
+
+    def ttl(self, endpoint):
+        """
+        Retorna o TTL, em segundos, do endpoint, usando o prefixo configurado mais longo que o contém.
+
+        Args:
+            endpoint (str): URL ou caminho do endpoint.
+
+        Returns:
+            int: TTL em segundos.
+        """
+        prefixos = [prefixo for prefixo in self.ttls if prefixo in endpoint]
+        if not prefixos:
+            return self.ttl_padrao
+        return self.ttls[max(prefixos, key=len)]
+
+    def obter(self, endpoint, parametros=None):
+        """
+        Busca uma resposta válida no cache, primeiro em memória e depois em disco.
+
+        Args:
+            endpoint (str): URL ou caminho do endpoint consultado.
+            parametros (dict, opcional): Parâmetros da consulta.
+
+        Returns:
+            object ou None: Resposta armazenada ou None se não houver entrada válida.
+        """
+        chave = self.gerar_chave(endpoint, parametros)
+        agora = time.time()
+        with self._trava:
+            entrada = self._memoria.get(chave)
+            if entrada is not None:
+                expira_em, valor = entrada
+                if expira_em > agora:
+                    self._memoria.move_to_end(chave)
+                    return valor
+                del self._memoria[chave]
+
+            linha = self.conexao.execute(
+                "SELECT valor, expira_em FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            valor_serializado, expira_em = linha
+            if expira_em <= agora:
+                self._remover(chave)
+                return None
+            self.conexao.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+            self.conexao.commit()
+            valor = decodificar(valor_serializado)
+            self._guardar_em_memoria(chave, expira_em, valor)
+            return valor
+
+    def guardar(self, endpoint, parametros, valor):
+        """
+        Armazena uma resposta no cache, em memória e em disco, aplicando o TTL do endpoint.
+
+        Args:
+            endpoint (str): URL ou caminho do endpoint consultado.
+            parametros (dict): Parâmetros da consulta.
+            valor (object): Resposta serializável em JSON.
+        """
+        chave = self.gerar_chave(endpoint, parametros)
+        agora = time.time()
+        expira_em = agora + self.ttl(endpoint)
+        valor_serializado = codificar(valor)
+        with self._trava:
+            self._guardar_em_memoria(chave, expira_em, valor)
+            try:
+                anterior = self.conexao.execute("SELECT tamanho FROM respostas WHERE chave = ?", (chave,)).fetchone()
+                self.conexao.execute(
+                    "INSERT OR REPLACE INTO respostas (chave, valor, tamanho, expira_em, acessado_em) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (chave, valor_serializado, len(valor_serializado), expira_em, agora)
+                )
+                self.conexao.commit()
+                self._tamanho_total += len(valor_serializado) - (anterior[0] if anterior else 0)
+                if self._tamanho_total > self.tamanho_maximo:
+                    self._despejar()
+            except sqlite3.Error as e:
+                logging.error(f"Erro ao gravar resposta no cache em disco: {e}")
+
+    def limpar(self):
+        """
+        Remove todas as entradas do cache, em memória e em disco.
+        """
+        with self._trava:
+            self._memoria.clear()
+            self.conexao.execute("DELETE FROM respostas")
+            self.conexao.commit()
+            self._tamanho_total = 0
+
+    def fechar(self):
+        """
+        Encerra a conexão com o armazenamento em disco.
+        """
+        self.conexao.close()
+
+    def _guardar_em_memoria(self, chave, expira_em, valor):
+        """
+        Insere uma entrada na camada em memória, descartando as menos usadas recentemente se necessário.
+        """
+        self._memoria[chave] = (expira_em, valor)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.itens_memoria:
+            self._memoria.popitem(last=False)
+
+    def _remover(self, chave):
+        """
+        Remove uma entrada do armazenamento em disco.
+        """
+        linha = self.conexao.execute("SELECT tamanho FROM respostas WHERE chave = ?", (chave,)).fetchone()
+        if linha:
+            self.conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            self.conexao.commit()
+            self._tamanho_total -= linha[0]
+
+    def _despejar(self):
+        """
+        Remove entradas expiradas e, em seguida, as acessadas há mais tempo até o disco voltar ao limite.
+        """
+        self.conexao.execute("DELETE FROM respostas WHERE expira_em <= ?", (time.time(),))
+        # Recalcula o total, já que outros processos podem ter escrito no mesmo arquivo.
+        self._tamanho_total = self.conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        excedente = self._tamanho_total - self.tamanho_maximo
+        if excedente > 0:
+            removidos = 0
+            chaves = []
+            for chave, tamanho in self.conexao.execute("SELECT chave, tamanho FROM respostas ORDER BY acessado_em"):
+                if removidos >= excedente:
+                    break
+                chaves.append((chave,))
+                removidos += tamanho
+            self.conexao.executemany("DELETE FROM respostas WHERE chave = ?", chaves)
+            self._tamanho_total -= removidos
+            for (chave,) in chaves:
+                self._memoria.pop(chave, None)
+        self.conexao.commit()
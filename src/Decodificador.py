@@ -0,0 +1,58 @@
+import json
+
+# Bibliotecas opcionais de JSON, da mais rápida para a mais lenta. A biblioteca padrão é usada se nenhuma
+# estiver instalada; todas produzem os mesmos objetos (dict, list, str, int, float, bool e None).
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if msgspec is not None:
+    BIBLIOTECA = "msgspec"
+    _decodificador = msgspec.json.Decoder()
+    _codificador = msgspec.json.Encoder()
+
+    def decodificar(conteudo):
+        """
+        Decodifica um documento JSON (bytes ou str) em objetos Python.
+        """
+        return _decodificador.decode(conteudo)
+
+    def codificar(valor):
+        """
+        Serializa um objeto Python em JSON, como bytes UTF-8 sem escapar caracteres não ASCII.
+        """
+        return _codificador.encode(valor)
+elif orjson is not None:
+    BIBLIOTECA = "orjson"
+
+    def decodificar(conteudo):
+        """
+        Decodifica um documento JSON (bytes ou str) em objetos Python.
+        """
+        return orjson.loads(conteudo)
+
+    def codificar(valor):
+        """
+        Serializa um objeto Python em JSON, como bytes UTF-8 sem escapar caracteres não ASCII.
+        """
+        return orjson.dumps(valor)
+else:
+    BIBLIOTECA = "json"
+
+    def decodificar(conteudo):
+        """
+        Decodifica um documento JSON (bytes ou str) em objetos Python.
+        """
+        return json.loads(conteudo)
+
+    def codificar(valor):
+        """
+        Serializa um objeto Python em JSON, como bytes UTF-8 sem escapar caracteres não ASCII.
+        """
+        return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
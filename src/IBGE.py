@@ -1,7 +1,34 @@
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import logging
+import os
+import time
+from src.Limitador import STATUS_SOBRECARGA, interpretar_retry_after
+from src.Metricas import metricas
+from src.Transporte import Transporte
+from src.Decodificador import decodificar
+
+# URL base da API do IBGE. Pode ser substituída pela variável de ambiente IBGE_API_URL
+# (por exemplo, para apontar para o servidor simulado dos benchmarks).
+URL_PADRAO = "https://servicodados.ibge.gov.br/api/"
+
+# Quantidade de nomes retornados pela API de ranking para cada localidade, sexo e década.
+TAMANHO_RANKING = 20
+
+
+class SobrecargaAPI(Exception):
+    """
+    Resposta de sobrecarga (429/5xx) que deve ser repetida depois de `espera` segundos. Levantada apenas quando
+    quem chamou pediu para aguardar por conta própria (parâmetro `tentativa`), como faz o `AsyncRepositorioIBGE`.
+
+    Atributos:
+        espera (float): Segundos a aguardar antes da nova tentativa.
+    """
+
+    def __init__(self, espera):
+        super().__init__(f"API sobrecarregada; nova tentativa em {espera:.2f} s")
+        self.espera = espera
 
 
 class RepositorioIBGE:
@@ -13,22 +40,63 @@ class RepositorioIBGE:
     realizar requisições HTTP e tratar as respostas da API do IBGE.
     """
 
-    def __init__(self):
+    def __init__(self, tamanho_pool=10, cache=None, url=None, limitador=None, tentativas_sobrecarga=3, transporte=None,
+                 timeout=None):
         """
-        Inicializa uma instância de RepositorioIBGE, configurando uma sessão HTTP com políticas de reconexão
-        para garantir resiliência em caso de falhas temporárias na conexão.
+        Inicializa uma instância de RepositorioIBGE. Por padrão as requisições usam o transporte HTTP
+        compartilhado pelo processo (`Transporte.compartilhado`), de modo que conexões abertas por um
+        repositório são reaproveitadas pelos demais.
+
+        O transporte (e com ele o `requests`) só é carregado na primeira requisição; consultas servidas
+        inteiramente pelo cache não pagam esse custo.
+
+        Args:
+            tamanho_pool (int, opcional): Número mínimo de conexões mantidas abertas por host no transporte
+                compartilhado. Deve acompanhar a quantidade de requisições simultâneas. Padrão é 10.
+            cache (CacheRespostas, opcional): Cache de respostas consultado antes de cada requisição.
+                Se None, todas as consultas vão à rede.
+            url (str, opcional): URL base da API. Se None, usa a variável de ambiente `IBGE_API_URL` ou `URL_PADRAO`.
+            limitador (LimitadorAdaptativo, opcional): Limitador de taxa e concorrência compartilhado pelas requisições.
+                Se None, as requisições não são limitadas e respostas 429/5xx não são repetidas.
+            tentativas_sobrecarga (int, opcional): Novas tentativas após respostas 429/5xx quando há limitador. Padrão é 3.
+            transporte (Transporte, opcional): Transporte HTTP próprio. Se None, usa o compartilhado pelo processo
+                (com limitador, o transporte compartilhado que não repete respostas de sobrecarga).
+            timeout (tuple, opcional): (segundos para conectar, segundos por leitura) de cada requisição.
+                Se None, usa o tempo máximo do transporte.
 
         Atributos:
-            sessao (requests.Session): Sessão HTTP configurada para reutilização de conexões e políticas de reconexão.
+            transporte (Transporte): Transporte HTTP (sessão, pool de conexões e tempos máximos).
+            sessao (requests.Session): Sessão HTTP do transporte.
             url (str): URL base da API do IBGE.
+            cache (CacheRespostas ou None): Cache de respostas da API.
+            limitador (LimitadorAdaptativo ou None): Limitador adaptativo das requisições.
+            tentativas_sobrecarga (int): Novas tentativas após respostas 429/5xx.
+            timeout (tuple ou None): Tempos máximos de conexão e leitura das requisições.
         """
-        politica_reconexao = Retry(total=3, backoff_factor=1)
-        adaptador = HTTPAdapter(max_retries=politica_reconexao)
+        self._transporte = transporte
+        self.tamanho_pool = tamanho_pool
+        self.timeout = timeout
+        self.url = url or os.environ.get("IBGE_API_URL") or URL_PADRAO
+        self.cache = cache
+        self.limitador = limitador
+        self.tentativas_sobrecarga = tentativas_sobrecarga
 
-        self.sessao = requests.Session()
-        self.sessao.mount("https://", adaptador)
-        self.sessao.timeout = 5
-        self.url = "https://servicodados.ibge.gov.br/api/"
+    @property
+    def transporte(self):
+        """
+        Transporte HTTP das requisições, obtido na primeira utilização.
+        """
+        if self._transporte is None:
+            # Com limitador, a sobrecarga (429/5xx) é tratada só por ele: o urllib3 não a repete por conta própria.
+            self._transporte = Transporte.compartilhado(self.tamanho_pool, repetir_sobrecarga=self.limitador is None)
+        return self._transporte
+
+    @property
+    def sessao(self):
+        """
+        Sessão HTTP do transporte.
+        """
+        return self.transporte.sessao
 
     def construir_API(self, nomes):
         """
@@ -50,16 +118,18 @@ class RepositorioIBGE:
             nomes_concatenados = "|".join(nomes)
             return self.url + f"v2/censos/nomes/{nomes_concatenados}"
 
-    def consumir_API(self, nomes=None, localidade=None, sexo=None, decada=None):
+    def consumir_API(self, nomes=None, localidade=None, sexo=None, decada=None, tentativa=None):
         """
         Realiza uma consulta à API do IBGE, retornando o ranking ou a frequência de nomes
-        com base nos parâmetros fornecidos.
+        com base nos parâmetros fornecidos. Se houver um cache configurado, a resposta é servida
+        a partir dele quando disponível e armazenada nele após cada requisição bem-sucedida.
 
         Args:
             nomes (list of str, opcional): Lista de nomes para consulta. Se None, obtém o ranking geral.
             localidade (str, opcional): ID numérico da localidade (estado) para filtrar a consulta. Se None, considera todo o Brasil.
             sexo (str, opcional): Sexo ('M', 'F' ou '-') para filtrar a consulta. Se None, considera ambos os sexos.
             decada (int, opcional): Década (formato YYYY) para filtrar a consulta. Se None, considera todas as décadas.
+            tentativa (int, opcional): Ver `_requisitar`.
 
         Returns:
             list of dict: Lista de dicionários com os dados retornados pela API.
@@ -85,15 +155,20 @@ class RepositorioIBGE:
         endpoint = self.construir_API(nomes)
         parametros = {"localidade": localidade, "sexo": sexo, "decada": decada}
         parametros = {chave: valor for chave, valor in parametros.items() if valor is not None}
-        try:
-            resposta = self.sessao.get(endpoint, params=parametros)
-            resposta.raise_for_status()
-            return resposta.json()
-        except Exception as e:
-            logging.error(f"Erro durante a solicitação HTTP: {str(e)}")
-            raise
+        recurso = "ranking" if endpoint.endswith("/ranking") else "nomes"
+        # Uma nova tentativa após sobrecarga já consultou o cache na primeira.
+        if self.cache is not None and not tentativa:
+            dados = self.cache.obter(endpoint, parametros)
+            if dados is not None:
+                metricas.incrementar("cache_acertos", recurso=recurso)
+                return dados
+            metricas.incrementar("cache_falhas", recurso=recurso)
+        dados = self._requisitar(recurso, endpoint, tentativa, params=parametros)
+        if self.cache is not None:
+            self.cache.guardar(endpoint, parametros, dados)
+        return dados
 
-    def obter_ranking(self, nome=None, localidade=None, sexo=None, decada=None):
+    def obter_ranking(self, nome=None, localidade=None, sexo=None, decada=None, tentativa=None):
         """
         Obtém o ranking ou frequência de nomes diretamente da API, usando os parâmetros fornecidos.
 
@@ -102,6 +177,7 @@ class RepositorioIBGE:
             localidade (str, opcional): ID numérico da localidade (estado) para a consulta. Se None, considera todo o Brasil.
             sexo (str, opcional): Sexo ('M', 'F' ou '-') para a consulta. Se None, considera ambos os sexos.
             decada (int, opcional): Década (formato YYYY) para a consulta. Se None, considera todas as décadas.
+            tentativa (int, opcional): Ver `_requisitar`.
 
         Returns:
             list of dict: Lista de dicionários com os dados retornados pela API.
@@ -118,14 +194,15 @@ class RepositorioIBGE:
             nomes = [nome]
         else:
             nomes = nome
-        return self.consumir_API(nomes, localidade, sexo, decada)
+        return self.consumir_API(nomes, localidade, sexo, decada, tentativa)
 
-    def obter_informacoes_estado(self, sigla_id):
+    def obter_informacoes_estado(self, sigla_id, tentativa=None):
         """
         Obtém informações detalhadas de um estado brasileiro a partir de sua sigla (e.g., 'SP') ou ID numérico.
 
         Args:
             sigla_id (str ou int): Sigla (duas letras) ou ID numérico do estado brasileiro.
+            tentativa (int, opcional): Ver `_requisitar`.
 
         Returns:
             dict: Dicionário contendo as informações do estado, como 'id', 'nome', 'sigla', etc.
@@ -141,11 +218,213 @@ class RepositorioIBGE:
         if isinstance(sigla_id, str):
             sigla_id = sigla_id.upper()
 
+        endpoint = self.url + f"v1/localidades/estados/{sigla_id}"
+        if self.cache is not None and not tentativa:
+            dados = self.cache.obter(endpoint)
+            if dados is not None:
+                metricas.incrementar("cache_acertos", recurso="localidades")
+                return dados
+            metricas.incrementar("cache_falhas", recurso="localidades")
+        dados = self._requisitar("localidades", endpoint, tentativa)
+        if self.cache is not None:
+            self.cache.guardar(endpoint, None, dados)
+        return dados
+
+    def _requisitar(self, recurso, endpoint, tentativa=None, **kwargs):
+        """
+        Faz a requisição GET e decodifica a resposta JSON com `src.Decodificador` (msgspec ou orjson,
+        se instalados), registrando em `src.Metricas.metricas`
+        a latência (incluindo as novas tentativas), os bytes recebidos, o código HTTP e as novas tentativas.
+
+        Com um limitador configurado, respostas 429/5xx são repetidas até `tentativas_sobrecarga` vezes.
+        Por padrão a espera entre as tentativas é feita aqui, na thread que chamou. Com `tentativa` informado,
+        é feita uma única requisição e a sobrecarga é devolvida como `SobrecargaAPI`, para que quem chamou
+        aguarde sem ocupar uma vaga de concorrência e repita a chamada com `tentativa + 1`.
+
+        Args:
+            recurso (str): Rótulo do tipo de consulta nas métricas ('ranking', 'nomes' ou 'localidades').
+            endpoint (str): URL completa da requisição.
+            tentativa (int ou None, opcional): Novas tentativas por sobrecarga já feitas por quem chamou.
+            **kwargs: Argumentos repassados a `Transporte.get`.
+
+        Returns:
+            list ou dict: Dados decodificados da resposta.
+
+        Raises:
+            SobrecargaAPI: Se `tentativa` for informado e a resposta de sobrecarga puder ser repetida.
+            requests.exceptions.HTTPError: Se a resposta HTTP indicar um erro.
+            Exception: Para outros erros durante a solicitação HTTP.
+        """
+        adiar = tentativa is not None
+        tentativa = tentativa or 0
         try:
-            endpoint = self.url + f"v1/localidades/estados/{sigla_id}"
-            resposta = self.sessao.get(endpoint)
-            resposta.raise_for_status()
-            return resposta.json()
+            while True:
+                resposta = self._enviar(recurso, endpoint, **kwargs)
+                if (self.limitador is not None and resposta.status_code in STATUS_SOBRECARGA
+                        and tentativa < self.tentativas_sobrecarga):
+                    tentativa += 1
+                    metricas.incrementar("requisicoes_repetidas", recurso=recurso, status=resposta.status_code)
+                    espera = self.limitador.espera_nova_tentativa(tentativa)
+                    if adiar:
+                        raise SobrecargaAPI(espera)
+                    time.sleep(espera)
+                    continue
+                resposta.raise_for_status()
+                with metricas.cronometrar("decodificacao", recurso=recurso):
+                    return decodificar(resposta.content)
+        except SobrecargaAPI:
+            raise
         except Exception as e:
+            metricas.incrementar("requisicoes_erros", recurso=recurso, erro=type(e).__name__)
             logging.error(f"Erro durante a solicitação HTTP: {str(e)}")
             raise
+
+    def _enviar(self, recurso, endpoint, **kwargs):
+        """
+        Envia uma única requisição GET, respeitando o limitador (se houver) e informando a ele o resultado.
+        """
+        import requests
+
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        if self.limitador is not None:
+            self.limitador.adquirir()
+        sobrecarga = False
+        espera = None
+        inicio = time.perf_counter()
+        try:
+            resposta = self.transporte.get(endpoint, **kwargs)
+            latencia = time.perf_counter() - inicio
+            metricas.registrar_tempo("requisicao", latencia, recurso=recurso)
+            self._registrar_resposta(recurso, resposta)
+            if resposta.status_code in STATUS_SOBRECARGA:
+                sobrecarga = True
+                espera = interpretar_retry_after(resposta.headers.get("Retry-After"))
+            return resposta
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            sobrecarga = True
+            raise
+        finally:
+            if self.limitador is not None:
+                self.limitador.liberar(time.perf_counter() - inicio, sobrecarga=sobrecarga, espera=espera)
+
+    @staticmethod
+    def _registrar_resposta(recurso, resposta):
+        """
+        Registra o código HTTP, o tamanho do corpo e as novas tentativas feitas pelo `Retry` para uma resposta.
+        """
+        from urllib3.util import Retry
+
+        status = getattr(resposta, "status_code", None)
+        if isinstance(status, int):
+            metricas.incrementar("respostas", recurso=recurso, status=status)
+        conteudo = getattr(resposta, "content", None)
+        if isinstance(conteudo, (bytes, bytearray)):
+            metricas.incrementar("bytes_recebidos", len(conteudo), recurso=recurso)
+        tentativas = getattr(getattr(resposta, "raw", None), "retries", None)
+        if isinstance(tentativas, Retry) and tentativas.history:
+            metricas.incrementar("novas_tentativas", len(tentativas.history), recurso=recurso)
+
+
+class AsyncRepositorioIBGE:
+    """
+    Versão assíncrona do RepositorioIBGE, pensada para disparar muitas consultas de uma vez
+    (por exemplo, todo o produto cartesiano nomes x localidades x sexos x décadas) em um único event loop.
+
+    Todas as consultas compartilham um único `RepositorioIBGE`, e portanto um único transporte HTTP e seu pool
+    de conexões. As chamadas bloqueantes do `requests` são despachadas para um executor de threads, e um
+    semáforo limita quantas ficam em andamento ao mesmo tempo. A espera entre as novas tentativas após
+    sobrecarga é feita no event loop, fora do semáforo, de modo que não ocupa vagas das demais consultas.
+
+    Atributos:
+        concorrencia (int): Número máximo de requisições simultâneas.
+        repositorio (RepositorioIBGE): Repositório síncrono usado para as requisições.
+    """
+
+    def __init__(self, concorrencia=16, repositorio=None):
+        """
+        Inicializa o repositório assíncrono.
+
+        Args:
+            concorrencia (int, opcional): Número máximo de requisições simultâneas. Padrão é 16.
+            repositorio (RepositorioIBGE, opcional): Repositório síncrono a ser reutilizado. Se None,
+                um novo é criado sobre o transporte compartilhado, com o pool ampliado para `concorrencia`.
+
+        Raises:
+            ValueError: Se `concorrencia` for menor que 1.
+        """
+        if concorrencia < 1:
+            raise ValueError("A concorrência deve ser de pelo menos 1 requisição.")
+        self.concorrencia = concorrencia
+        self.repositorio = repositorio or RepositorioIBGE(tamanho_pool=concorrencia)
+        self._executor = ThreadPoolExecutor(max_workers=concorrencia)
+        self._semaforo = None
+
+    async def _executar(self, funcao, *args):
+        """
+        Executa uma função bloqueante do repositório síncrono no executor, respeitando o limite de concorrência.
+        Após uma resposta de sobrecarga, a vaga é devolvida durante a espera e a função é chamada de novo.
+        """
+        if self._semaforo is None:
+            # Criado sob demanda para ficar associado ao event loop em execução.
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+        loop = asyncio.get_running_loop()
+        tentativa = 0
+        while True:
+            try:
+                async with self._semaforo:
+                    return await loop.run_in_executor(self._executor, partial(funcao, *args, tentativa=tentativa))
+            except SobrecargaAPI as e:
+                tentativa += 1
+                await asyncio.sleep(e.espera)
+
+    async def obter_ranking(self, nome=None, localidade=None, sexo=None, decada=None):
+        """
+        Versão assíncrona de `RepositorioIBGE.obter_ranking`.
+
+        Returns:
+            list of dict: Lista de dicionários com os dados retornados pela API.
+        """
+        return await self._executar(self.repositorio.obter_ranking, nome, localidade, sexo, decada)
+
+    async def obter_informacoes_estado(self, sigla_id):
+        """
+        Versão assíncrona de `RepositorioIBGE.obter_informacoes_estado`.
+
+        Returns:
+            dict: Dicionário contendo as informações do estado.
+        """
+        return await self._executar(self.repositorio.obter_informacoes_estado, sigla_id)
+
+    async def obter_rankings(self, combinacoes):
+        """
+        Consulta a API para todas as combinações fornecidas, com no máximo `concorrencia` requisições simultâneas.
+
+        Args:
+            combinacoes (iterable of tuple): Tuplas (nomes, localidade, sexo, decada).
+
+        Returns:
+            list: Para cada combinação, na mesma ordem, a resposta da API ou a exceção levantada ao consultá-la.
+        """
+        tarefas = [self.obter_ranking(*combinacao) for combinacao in combinacoes]
+        return await asyncio.gather(*tarefas, return_exceptions=True)
+
+    def executar(self, combinacoes):
+        """
+        Atalho síncrono para `obter_rankings`, executando-o em um novo event loop.
+
+        Args:
+            combinacoes (iterable of tuple): Tuplas (nomes, localidade, sexo, decada).
+
+        Returns:
+            list: Respostas ou exceções, na mesma ordem das combinações.
+        """
+        self._semaforo = None
+        return asyncio.run(self.obter_rankings(combinacoes))
+
+    def fechar(self):
+        """
+        Encerra o executor de threads. As conexões do transporte continuam abertas para as próximas consultas
+        do processo; use `Transporte.fechar` para encerrá-las.
+        """
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+import os
+from itertools import product
+
+from src.Localidades import ESTADOS
+from src.Lotes import normalizar_chave
+from src.Metricas import metricas
+
+# Espaço percorrido pela ingestão completa: Brasil e cada unidade federativa, os dois sexos e o total,
+# e as décadas do censo (None é o total de todas as décadas).
+LOCALIDADES_INGESTAO = ["BR"] + [str(id_estado) for id_estado in ESTADOS]
+SEXOS_INGESTAO = ["-", "M", "F"]
+DECADAS_INGESTAO = [None] + list(range(1930, 2010, 10))
+
+
+class Checkpoint:
+    """
+    Registro em disco das consultas já concluídas por uma ingestão, para que ela possa ser retomada
+    após uma interrupção sem repetir o que já foi gravado no banco.
+
+    O arquivo é em JSON Lines, com uma linha por consulta concluída, acrescentada (e enviada ao disco) somente
+    depois que os itens da consulta foram gravados. Uma última linha incompleta, deixada por uma queda durante a
+    escrita, é ignorada na leitura.
+
+    Atributos:
+        caminho (str): Caminho do arquivo.
+        rankings_concluidos (set of tuple): Combinações (localidade, sexo, decada) de ranking geral já gravadas.
+        nomes_concluidos (set of tuple): Combinações (nome, localidade, sexo) de nomes já gravadas.
+        nomes_descobertos (dict): Nomes encontrados nos rankings, na ordem em que apareceram (valores None).
+    """
+
+    def __init__(self, caminho):
+        """
+        Abre o checkpoint, carregando as consultas registradas por execuções anteriores.
+
+        Args:
+            caminho (str): Caminho do arquivo. É criado se não existir.
+        """
+        self.caminho = caminho
+        self.rankings_concluidos = set()
+        self.nomes_concluidos = set()
+        self.nomes_descobertos = {}
+        linha = "\n"
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as arquivo:
+                for numero, linha in enumerate(arquivo, start=1):
+                    try:
+                        self._carregar(json.loads(linha))
+                    except (ValueError, KeyError, TypeError):
+                        logging.warning(f"Linha {numero} do checkpoint '{caminho}' ignorada por estar incompleta.")
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+        if not linha.endswith("\n"):
+            # Termina a linha incompleta para que o próximo registro não seja emendado a ela.
+            self._arquivo.write("\n")
+
+    def _carregar(self, registro):
+        if registro["tipo"] == "ranking":
+            self.rankings_concluidos.add((registro["localidade"], registro["sexo"], registro["decada"]))
+            for nome in registro["nomes"]:
+                self.nomes_descobertos[nome] = None
+        else:
+            for nome in registro["nomes"]:
+                self.nomes_concluidos.add((nome, registro["localidade"], registro["sexo"]))
+
+    def registrar_ranking(self, localidade, sexo, decada, nomes):
+        """
+        Registra um ranking geral concluído e os nomes (normalizados) encontrados nele.
+        """
+        registro = {"tipo": "ranking", "localidade": localidade, "sexo": sexo, "decada": decada, "nomes": list(nomes)}
+        self._escrever(registro)
+        self._carregar(registro)
+
+    def registrar_nomes(self, nomes, localidade, sexo):
+        """
+        Registra a consulta concluída de um lote de nomes (normalizados) para uma localidade e sexo.
+        """
+        registro = {"tipo": "nomes", "localidade": localidade, "sexo": sexo, "nomes": list(nomes)}
+        self._escrever(registro)
+        self._carregar(registro)
+
+    def _escrever(self, registro):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        """
+        Fecha o arquivo do checkpoint.
+        """
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.fechar()
+
+
+class IngestaoCompleta:
+    """
+    Percorre todo o espaço nome x localidade x sexo x década da API de nomes do IBGE e grava o resultado no banco,
+    para que rankings, históricos e comparações de nomes possam ser respondidos localmente (`Postgre.buscar`).
+
+    Etapas:
+        1. Rankings gerais de cada localidade, sexo e década, que também servem para descobrir os nomes.
+        2. Para cada localidade e sexo, os nomes descobertos (e os nomes extras informados), em lotes do
+           `PlanejadorLotes`. A API de nomes devolve todos os períodos, então os itens de cada década
+           são gerados a partir de uma única resposta.
+
+    Cada consulta é gravada e então registrada no `Checkpoint`; uma nova execução com o mesmo checkpoint
+    retoma de onde a anterior parou. Consultas que falharem não são registradas e são repetidas na próxima execução.
+    No máximo `repositorio.concorrencia` consultas ficam em andamento ao mesmo tempo.
+
+    Atributos:
+        repositorio (AsyncRepositorioIBGE): Repositório assíncrono usado nas consultas.
+        converter (callable): Função (combinacao, resposta, decadas) -> lista de `Item`, como `Main.converter_resposta`.
+        gravar (callable): Função bloqueante que grava uma lista de `Item` e levanta uma exceção se a gravação
+            falhar, como `PoolPostgre.upsert_data` com `levantar=True`. Uma consulta só é registrada no checkpoint
+            depois que `gravar` retorna.
+        registrar_rankings (callable ou None): Função bloqueante chamada com [(localidade, sexo, decada)] depois que
+            um ranking geral é gravado, como `PoolPostgre.registrar_rankings`, para que o modo incremental
+            sirva do banco os rankings ingeridos.
+        checkpoint (Checkpoint): Registro das consultas concluídas.
+        planejador (PlanejadorLotes): Divide os nomes em lotes para a API de nomes.
+        localidades (list of str): Localidades percorridas ('BR' ou IDs).
+        sexos (list of str): Sexos percorridos ('M', 'F' ou '-').
+        decadas (list of int): Décadas percorridas (None para o total).
+    """
+
+    def __init__(self, repositorio, converter, gravar, checkpoint, planejador,
+                 localidades=None, sexos=None, decadas=None, registrar_rankings=None):
+        """
+        Inicializa a ingestão. Localidades, sexos e décadas não informados usam `LOCALIDADES_INGESTAO`,
+        `SEXOS_INGESTAO` e `DECADAS_INGESTAO`.
+        """
+        self.repositorio = repositorio
+        self.converter = converter
+        self.gravar = gravar
+        self.registrar_rankings = registrar_rankings
+        self.checkpoint = checkpoint
+        self.planejador = planejador
+        self.localidades = localidades or LOCALIDADES_INGESTAO
+        self.sexos = sexos or SEXOS_INGESTAO
+        self.decadas = decadas or DECADAS_INGESTAO
+
+    def executar(self, nomes_extras=()):
+        """
+        Executa a ingestão em um novo event loop.
+
+        Args:
+            nomes_extras (iterable of str, opcional): Nomes consultados além dos descobertos nos rankings.
+
+        Returns:
+            dict: Resumo com as contagens 'consultas', 'puladas', 'falhas', 'itens' e 'nomes',
+            somadas às contagens retornadas por `gravar`.
+        """
+        return asyncio.run(self._executar(nomes_extras))
+
+    async def _executar(self, nomes_extras):
+        self._resumo = {"consultas": 0, "puladas": 0, "falhas": 0, "itens": 0}
+        combinacoes = list(product(self.localidades, self.sexos, self.decadas))
+        pendentes = [([None], localidade, sexo, decada) for localidade, sexo, decada in combinacoes
+                     if (localidade, sexo, decada) not in self.checkpoint.rankings_concluidos]
+        self._resumo["puladas"] += len(combinacoes) - len(pendentes)
+        await self._processar(pendentes)
+
+        nomes = dict(self.checkpoint.nomes_descobertos)
+        for nome in nomes_extras:
+            nomes.setdefault(normalizar_chave(nome), None)
+        self._resumo["nomes"] = len(nomes)
+        await self._processar(self._combinacoes_nomes(nomes))
+        logging.info(f"Ingestão: {self._resumo['consultas']} consultas, {self._resumo['puladas']} retomadas do "
+                     f"checkpoint, {self._resumo['falhas']} falhas, {self._resumo['itens']} itens gravados")
+        return self._resumo
+
+    def _combinacoes_nomes(self, nomes):
+        """
+        Gera, sob demanda, os lotes de nomes ainda não registrados no checkpoint para cada localidade e sexo.
+        """
+        for localidade, sexo in product(self.localidades, self.sexos):
+            pendentes = [nome for nome in nomes if (nome, localidade, sexo) not in self.checkpoint.nomes_concluidos]
+            self._resumo["puladas"] += len(nomes) - len(pendentes)
+            for lote in self.planejador.planejar(pendentes):
+                yield lote, localidade, sexo, None
+
+    async def _processar(self, combinacoes):
+        pendentes = iter(combinacoes)
+        await asyncio.gather(*(self._consumir(pendentes) for _ in range(self.repositorio.concorrencia)))
+
+    async def _consumir(self, pendentes):
+        """
+        Consulta, grava e registra no checkpoint as combinações do iterador compartilhado até esgotá-lo.
+        """
+        loop = asyncio.get_running_loop()
+        for combinacao in pendentes:
+            lote, localidade, sexo, decada = combinacao
+            ranking = len(lote) == 1 and lote[0] is None
+            self._resumo["consultas"] += 1
+            try:
+                resposta = await self.repositorio.obter_ranking(*combinacao)
+                itens = self.converter(combinacao, resposta, None if ranking else self.decadas)
+                totais = await loop.run_in_executor(None, self.gravar, itens)
+                if ranking and self.registrar_rankings is not None:
+                    await loop.run_in_executor(None, self.registrar_rankings, [(localidade, sexo, decada)])
+            except Exception as e:
+                logging.error(f"Erro ao ingerir a combinação {combinacao}: {e}")
+                self._resumo["falhas"] += 1
+                metricas.incrementar("ingestao_falhas")
+                continue
+            self._resumo["itens"] += len(itens)
+            for chave, valor in (totais or {}).items():
+                self._resumo[chave] = self._resumo.get(chave, 0) + valor
+            if ranking:
+                nomes = [normalizar_chave(item.nome) for item in itens]
+                self.checkpoint.registrar_ranking(localidade, sexo, decada, nomes)
+            else:
+                self.checkpoint.registrar_nomes([normalizar_chave(nome) for nome in lote], localidade, sexo)
+            metricas.incrementar("ingestao_consultas", tipo="ranking" if ranking else "nomes")
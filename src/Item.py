@@ -1,7 +1,15 @@
+import json
+import sys
+from array import array
+from bisect import bisect_right
+
+
 class Item:
     """
     Representa um registro individual no ranking de nomes do IBGE, contendo informações detalhadas sobre o nome, frequência, localidade, sexo e década.
 
+    A classe usa `__slots__` para não criar um `__dict__` por instância.
+
     Atributos:
         nome (str): Nome consultado.
         sexo (str ou None): Sexo associado ao nome ('M', 'F' ou '-'). Pode ser None se não especificado.
@@ -10,6 +18,8 @@ class Item:
         frequencia (int): Frequência do nome, calculada com base na resposta da API ou fornecida diretamente.
     """
 
+    __slots__ = ("nome", "sexo", "localidade", "decada", "frequencia")
+
     def __init__(self, nome, sexo=None, localidade=None, frequencia=None, resposta_api=None, decada=None):
         """
         Inicializa uma instância da classe Item com os dados fornecidos. Se a frequência não for fornecida, ela é calculada a partir da resposta da API.
@@ -19,7 +29,7 @@ class Item:
             sexo (str, opcional): Sexo associado ao nome ('M', 'F' ou '-'). Padrão é None.
             localidade (str, opcional): Localidade (ID ou sigla) onde o nome foi consultado. Padrão é None.
             frequencia (int, opcional): Frequência do nome. Se fornecida, será usada diretamente; caso contrário, será calculada a partir de `resposta_api`. Padrão é None.
-            resposta_api (list de dict, opcional): Lista de dicionários contendo os dados de frequência retornados pela API do IBGE. Necessário se `frequencia` não for fornecida. Padrão é None.
+            resposta_api (list de dict ou IndicePeriodos, opcional): Lista de dicionários contendo os dados de frequência retornados pela API do IBGE, ou um `IndicePeriodos` já construído a partir dela (útil ao gerar itens de várias décadas a partir da mesma resposta). Necessário se `frequencia` não for fornecida. Padrão é None.
             decada (int, opcional): Década de referência para a frequência do nome. Se None, a frequência total será calculada. Padrão é None.
 
         Raises:
@@ -36,6 +46,19 @@ class Item:
         else:
             raise ValueError("É necessário fornecer 'frequencia' ou 'resposta_api' para calcular a frequência.")
 
+    def __repr__(self):
+        return (f"Item(nome={self.nome!r}, sexo={self.sexo!r}, localidade={self.localidade!r}, "
+                f"decada={self.decada!r}, frequencia={self.frequencia!r})")
+
+    def chave(self):
+        """
+        Retorna a chave única do item como tupla, mais barata de gerar e comparar que `get_unique_key`.
+
+        Returns:
+            tuple: Tupla (`nome`, `localidade`, `sexo`, `decada`).
+        """
+        return (self.nome, self.localidade, self.sexo, self.decada)
+
     def get_unique_key(self):
         """
         Gera uma chave única baseada nos atributos do item, útil para identificação ou deduplicação.
@@ -50,7 +73,8 @@ class Item:
         Calcula a frequência do nome com base na resposta da API do IBGE.
 
         Args:
-            resposta_API (list de dict): Lista de dicionários contendo os períodos e frequências retornados pela API.
+            resposta_API (list de dict ou IndicePeriodos): Períodos e frequências retornados pela API,
+                ou o índice já construído a partir deles.
 
         Returns:
             int: Frequência calculada do nome para a década especificada ou frequência total se a década não for especificada.
@@ -60,19 +84,9 @@ class Item:
         """
         if resposta_API is None:
             raise ValueError("A 'resposta_API' não pode ser None ao calcular a frequência.")
-
-        if self.decada is None:
-            return sum(periodo['frequencia'] for periodo in resposta_API)
-        else:
-            for periodo in resposta_API:
-                if self.decada < 1930:
-                    if periodo["periodo"] == '1930[':
-                        return periodo['frequencia']
-                    else:
-                        continue  # Continua a busca até encontrar o período correto
-                if periodo["periodo"] == f"[{self.decada},{self.decada + 10}[":
-                    return periodo["frequencia"]
-            return 0  # Retorna 0 se a década não for encontrada nos dados
+        if not isinstance(resposta_API, IndicePeriodos):
+            resposta_API = IndicePeriodos(resposta_API)
+        return resposta_API.frequencia(self.decada)
 
     def exibir_informacoes(self):
         """
@@ -90,3 +104,374 @@ class Item:
         sexo = self.sexo or '-'
         frequencia = self.frequencia
         return f"{nome:<18}{local:<14}{sexo:<13}{decada:<16}{frequencia}"
+
+
+class ItemSomenteLeitura(Item):
+    """
+    `Item` reconstruído a partir de um `ItemBatch` para as visões de leitura (ver `Ranking.itens`).
+
+    Alterar um atributo levanta `AttributeError`: a alteração não chegaria ao lote colunar, de onde os
+    itens são reconstruídos, e seria perdida sem aviso.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def de_valores(cls, nome, localidade, sexo, decada, frequencia):
+        """
+        Cria o item a partir dos valores de cada coluna.
+        """
+        item = cls.__new__(cls)
+        for atributo, valor in zip(("nome", "localidade", "sexo", "decada", "frequencia"),
+                                   (nome, localidade, sexo, decada, frequencia)):
+            object.__setattr__(item, atributo, valor)
+        return item
+
+    def __setattr__(self, atributo, valor):
+        raise AttributeError("Os itens do ranking são somente leitura; use `Ranking.adicionar_item` para incluir "
+                             "um item com outros valores.")
+
+
+class IndicePeriodos:
+    """
+    Índice numérico dos períodos retornados pela API de nomes do IBGE.
+
+    Os textos de período ('1930[' para antes de 1930 e '[1930,1940[' para as demais décadas) são
+    interpretados uma única vez. As frequências ficam em ordem cronológica com somas acumuladas, de modo
+    que a frequência de uma década, o total e a soma de um intervalo de anos são obtidos sem percorrer a resposta.
+
+    Atributos:
+        inicios (list of int): Ano inicial de cada década presente na resposta, em ordem crescente.
+        frequencias (list of int): Frequência de cada década, na mesma ordem de `inicios`.
+        acumuladas (list of int): Somas acumuladas de `frequencias`, começando em 0.
+        limite_anterior (int ou None): Ano final do período aberto ('1930[' -> 1930), se presente.
+        frequencia_anterior (int): Frequência do período aberto, ou 0 se ausente.
+    """
+
+    __slots__ = ("inicios", "frequencias", "acumuladas", "limite_anterior", "frequencia_anterior",
+                 "_posicoes", "_outros")
+
+    def __init__(self, resposta_api):
+        """
+        Constrói o índice a partir da lista 'res' de uma resposta da API de nomes.
+
+        Args:
+            resposta_api (list de dict): Lista de dicionários com as chaves 'periodo' e 'frequencia'.
+                Períodos em formato desconhecido só são considerados no total.
+        """
+        decadas = {}
+        self.limite_anterior = None
+        self.frequencia_anterior = 0
+        self._outros = 0
+        for periodo in resposta_api:
+            texto = periodo["periodo"]
+            frequencia = periodo["frequencia"]
+            try:
+                if texto.startswith("["):
+                    inicio = int(texto[1:].split(",")[0])
+                    decadas[inicio] = decadas.get(inicio, 0) + frequencia
+                elif texto.endswith("["):
+                    self.limite_anterior = int(texto[:-1])
+                    self.frequencia_anterior += frequencia
+                else:
+                    raise ValueError(texto)
+            except ValueError:
+                self._outros += frequencia
+
+        self.inicios = sorted(decadas)
+        self.frequencias = [decadas[inicio] for inicio in self.inicios]
+        self.acumuladas = [0]
+        for frequencia in self.frequencias:
+            self.acumuladas.append(self.acumuladas[-1] + frequencia)
+        self._posicoes = {inicio: posicao for posicao, inicio in enumerate(self.inicios)}
+
+    def total(self):
+        """
+        Retorna a soma das frequências de todos os períodos.
+        """
+        return self.acumuladas[-1] + self.frequencia_anterior + self._outros
+
+    def frequencia(self, decada=None):
+        """
+        Retorna a frequência de uma década.
+
+        Args:
+            decada (int, opcional): Ano inicial da década (ex: 1990). Se None, retorna o total.
+                Décadas anteriores ao período aberto (ex: 1920, com '1930[') retornam a frequência desse período.
+
+        Returns:
+            int: Frequência da década, ou 0 se ela não estiver na resposta.
+        """
+        if decada is None:
+            return self.total()
+        if self.limite_anterior is not None and decada < self.limite_anterior:
+            return self.frequencia_anterior
+        posicao = self._posicoes.get(decada)
+        if posicao is None:
+            return 0
+        return self.frequencias[posicao]
+
+    def intervalo(self, inicio=None, fim=None):
+        """
+        Soma as frequências dos períodos que se sobrepõem ao intervalo de anos [inicio, fim].
+
+        Args:
+            inicio (int, opcional): Primeiro ano do intervalo. Se None, o intervalo não tem limite inferior.
+            fim (int, opcional): Último ano do intervalo. Se None, o intervalo não tem limite superior.
+
+        Returns:
+            int: Soma das frequências. Por exemplo, `intervalo(1970, 1999)` soma as décadas de 1970, 1980 e 1990.
+        """
+        primeiro = 0 if inicio is None else bisect_right(self.inicios, inicio - 10)
+        ultimo = len(self.inicios) if fim is None else bisect_right(self.inicios, fim)
+        soma = self.acumuladas[ultimo] - self.acumuladas[primeiro] if ultimo > primeiro else 0
+        if self.limite_anterior is not None and (inicio is None or inicio < self.limite_anterior):
+            soma += self.frequencia_anterior
+        return soma
+
+
+class _Vocabulario:
+    """
+    Dicionário de códigos inteiros para os valores repetidos de uma coluna (nomes, localidades, sexos).
+    """
+
+    __slots__ = ("valores", "codigos")
+
+    def __init__(self):
+        self.valores = []
+        self.codigos = {}
+
+    @staticmethod
+    def chave(valor):
+        # Localidades no formato da API de localidades são dicionários, que não podem ser chaves: usa-se o JSON
+        # deles como chave, mas o próprio dicionário é guardado como valor.
+        return json.dumps(valor, sort_keys=True, default=str) if isinstance(valor, dict) else valor
+
+    def codificar(self, valor):
+        chave = self.chave(valor)
+        codigo = self.codigos.get(chave)
+        if codigo is None:
+            if isinstance(valor, str):
+                valor = chave = sys.intern(valor)
+            codigo = len(self.valores)
+            self.valores.append(valor)
+            self.codigos[chave] = codigo
+        return codigo
+
+
+class ItemBatch:
+    """
+    Coleção colunar de itens do ranking, pensada para varreduras com milhões de linhas.
+
+    Em vez de um objeto por linha, cada coluna é um `array` de inteiros: nome, localidade e sexo são
+    códigos para vocabulários compartilhados, a década é um inteiro pequeno (`SEM_DECADA` quando não há década)
+    e a frequência é um inteiro de 64 bits. Ordenação, deduplicação e filtros operam diretamente sobre essas colunas
+    e retornam novos lotes que compartilham os mesmos vocabulários.
+
+    Atributos:
+        nomes (array): Código do nome de cada linha.
+        localidades (array): Código da localidade de cada linha.
+        sexos (array): Código do sexo de cada linha.
+        decadas (array): Década de cada linha, ou `SEM_DECADA`.
+        frequencias (array): Frequência de cada linha.
+    """
+
+    SEM_DECADA = -1
+    _COLUNAS = ("nomes", "localidades", "sexos", "decadas", "frequencias")
+
+    __slots__ = ("_vocabulario_nomes", "_vocabulario_localidades", "_vocabulario_sexos",
+                 "nomes", "localidades", "sexos", "decadas", "frequencias")
+
+    def __init__(self, vocabularios=None):
+        """
+        Inicializa um lote vazio.
+
+        Args:
+            vocabularios (tuple, opcional): Vocabulários (nomes, localidades, sexos) a compartilhar com outro lote.
+        """
+        if vocabularios is None:
+            vocabularios = (_Vocabulario(), _Vocabulario(), _Vocabulario())
+        self._vocabulario_nomes, self._vocabulario_localidades, self._vocabulario_sexos = vocabularios
+        self.nomes = array("I")
+        self.localidades = array("I")
+        self.sexos = array("I")
+        self.decadas = array("h")
+        self.frequencias = array("q")
+
+    @classmethod
+    def de_itens(cls, itens):
+        """
+        Cria um lote a partir de objetos `Item`.
+
+        Args:
+            itens (iterable of Item): Itens a serem convertidos.
+
+        Returns:
+            ItemBatch: Lote com uma linha por item, na mesma ordem.
+        """
+        lote = cls()
+        for item in itens:
+            lote.adicionar(item)
+        return lote
+
+    def adicionar(self, item):
+        """
+        Acrescenta um `Item` ao final do lote.
+
+        Args:
+            item (Item): Item a ser acrescentado. Uma localidade em dicionário é preservada (ver `linhas`).
+        """
+        self.adicionar_valores(item.nome, item.localidade, item.sexo, item.decada, item.frequencia)
+
+    def adicionar_valores(self, nome, localidade, sexo, decada, frequencia):
+        """
+        Acrescenta uma linha ao final do lote a partir dos valores de cada coluna.
+        """
+        self.nomes.append(self._vocabulario_nomes.codificar(nome))
+        self.localidades.append(self._vocabulario_localidades.codificar(localidade))
+        self.sexos.append(self._vocabulario_sexos.codificar(sexo))
+        self.decadas.append(self.SEM_DECADA if decada is None else decada)
+        self.frequencias.append(frequencia)
+
+    def __len__(self):
+        return len(self.frequencias)
+
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield self.item(indice)
+
+    def item(self, indice, somente_leitura=False):
+        """
+        Reconstrói o `Item` da linha indicada. Cada chamada cria um novo objeto.
+
+        Args:
+            indice (int): Posição da linha no lote.
+            somente_leitura (bool, opcional): Se True, retorna um `ItemSomenteLeitura`. Padrão é False.
+
+        Returns:
+            Item: Item com os valores da linha, com a localidade no valor original.
+        """
+        decada = self.decadas[indice]
+        valores = (self._vocabulario_nomes.valores[self.nomes[indice]],
+                   self._vocabulario_localidades.valores[self.localidades[indice]],
+                   self._vocabulario_sexos.valores[self.sexos[indice]],
+                   None if decada == self.SEM_DECADA else decada,
+                   self.frequencias[indice])
+        if somente_leitura:
+            return ItemSomenteLeitura.de_valores(*valores)
+        nome, localidade, sexo, decada, frequencia = valores
+        return Item(nome=nome, localidade=localidade, sexo=sexo, decada=decada, frequencia=frequencia)
+
+    def linhas(self):
+        """
+        Percorre o lote como tuplas (nome, localidade, sexo, decada, frequencia), sem criar objetos `Item`.
+
+        Returns:
+            iterator of tuple: Uma tupla por linha, na ordem do lote. A década é None quando a linha não tem década,
+            e localidades em dicionário são representadas pela sigla, como nas saídas do ranking.
+        """
+        nomes = self._vocabulario_nomes.valores
+        localidades = [localidade.get("sigla", "") if isinstance(localidade, dict) else localidade
+                       for localidade in self._vocabulario_localidades.valores]
+        sexos = self._vocabulario_sexos.valores
+        sem_decada = self.SEM_DECADA
+        for nome, localidade, sexo, decada, frequencia in zip(self.nomes, self.localidades, self.sexos,
+                                                              self.decadas, self.frequencias):
+            yield (nomes[nome], localidades[localidade], sexos[sexo],
+                   None if decada == sem_decada else decada, frequencia)
+
+    def para_itens(self):
+        """
+        Converte o lote em uma lista de objetos `Item`, para uso por código que espera itens individuais.
+
+        Returns:
+            list of Item: Itens na ordem do lote.
+        """
+        return list(self)
+
+    def selecionar(self, indices):
+        """
+        Cria um novo lote com as linhas indicadas, na ordem dada, compartilhando os vocabulários.
+
+        Args:
+            indices (iterable of int): Posições das linhas a manter.
+
+        Returns:
+            ItemBatch: Novo lote.
+        """
+        indices = list(indices)
+        lote = ItemBatch((self._vocabulario_nomes, self._vocabulario_localidades, self._vocabulario_sexos))
+        for coluna in self._COLUNAS:
+            origem = getattr(self, coluna)
+            getattr(lote, coluna).extend(origem[indice] for indice in indices)
+        return lote
+
+    def ordenar(self, decrescente=True):
+        """
+        Ordena o lote pela coluna de frequências. A ordenação é estável: empates mantêm a ordem original.
+
+        Args:
+            decrescente (bool, opcional): Se True (padrão), as maiores frequências vêm primeiro.
+
+        Returns:
+            ItemBatch: Novo lote ordenado.
+        """
+        return self.selecionar(self.ordem(decrescente))
+
+    def ordem(self, decrescente=True):
+        """
+        Calcula a permutação que ordena o lote pela frequência, sem reconstruir as colunas.
+
+        Returns:
+            list of int: Posições das linhas em ordem de frequência.
+        """
+        return sorted(range(len(self)), key=self.frequencias.__getitem__, reverse=decrescente)
+
+    def deduplicar(self):
+        """
+        Remove linhas com a mesma chave (nome, localidade, sexo, década), mantendo a primeira ocorrência.
+
+        Returns:
+            ItemBatch: Novo lote sem duplicatas.
+        """
+        vistos = set()
+        indices = []
+        for indice, chave in enumerate(zip(self.nomes, self.localidades, self.sexos, self.decadas)):
+            if chave not in vistos:
+                vistos.add(chave)
+                indices.append(indice)
+        return self.selecionar(indices)
+
+    def filtrar(self, nome=None, localidade=None, sexo=None, decada=None, frequencia_minima=None):
+        """
+        Seleciona as linhas que atendem a todos os critérios informados. Critérios None são ignorados.
+
+        Args:
+            nome (str, opcional): Nome exato.
+            localidade (str, opcional): Localidade exata.
+            sexo (str, opcional): Sexo exato.
+            decada (int, opcional): Década exata.
+            frequencia_minima (int, opcional): Frequência mínima (inclusiva).
+
+        Returns:
+            ItemBatch: Novo lote com as linhas selecionadas.
+        """
+        condicoes = []
+        for valor, vocabulario, coluna in ((nome, self._vocabulario_nomes, self.nomes),
+                                           (localidade, self._vocabulario_localidades, self.localidades),
+                                           (sexo, self._vocabulario_sexos, self.sexos)):
+            if valor is not None:
+                codigo = vocabulario.codigos.get(vocabulario.chave(valor))
+                if codigo is None:
+                    return self.selecionar([])
+                condicoes.append((coluna, codigo))
+        if decada is not None:
+            condicoes.append((self.decadas, decada))
+
+        indices = []
+        for indice in range(len(self)):
+            if frequencia_minima is not None and self.frequencias[indice] < frequencia_minima:
+                continue
+            if all(coluna[indice] == codigo for coluna, codigo in condicoes):
+                indices.append(indice)
+        return self.selecionar(indices)
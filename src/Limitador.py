@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+
+from src.Metricas import metricas
+
+# Códigos HTTP que indicam que o servidor está sobrecarregado ou limitando as requisições.
+STATUS_SOBRECARGA = frozenset({429, 500, 502, 503, 504})
+
+
+def interpretar_retry_after(valor, agora=None):
+    """
+    Converte o cabeçalho HTTP `Retry-After` em segundos de espera.
+
+    Args:
+        valor (str ou None): Valor do cabeçalho, em segundos (ex: '120') ou como data HTTP.
+        agora (float, opcional): Instante atual (epoch), usado para datas. Padrão é `time.time()`.
+
+    Returns:
+        float ou None: Segundos a aguardar (nunca negativos), ou None se o cabeçalho estiver ausente ou inválido.
+    """
+    if not valor:
+        return None
+    valor = str(valor).strip()
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    # Datas HTTP são raras no Retry-After; o módulo de e-mail só é importado quando uma aparece.
+    from email.utils import parsedate_to_datetime
+
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data is None:
+        return None
+    return max(0.0, data.timestamp() - (time.time() if agora is None else agora))
+
+
+class LimitadorAdaptativo:
+    """
+    Limitador compartilhado por todas as requisições à API do IBGE, combinando um balde de fichas
+    (taxa máxima de requisições por segundo) com um limite de concorrência ajustado no estilo AIMD:
+
+        - A cada resposta saudável (latência até `latencia_alvo`), o limite cresce 1/limite,
+          ou seja, cerca de uma requisição a mais por "janela" completa.
+        - Em sobrecarga (429, 5xx ou tempo esgotado), o limite é multiplicado por `fator_reducao`,
+          no máximo uma vez a cada `latencia_alvo` segundos para que uma rajada de erros conte como um único sinal.
+        - Um `Retry-After` suspende todas as novas requisições pelo tempo pedido pelo servidor.
+
+    É seguro para uso a partir de várias threads.
+
+    Atributos:
+        taxa (float ou None): Requisições por segundo permitidas. Se None, não há limite de taxa.
+        rajada (float): Capacidade do balde de fichas (requisições que podem sair de uma vez).
+        concorrencia_minima (int): Limite inferior de requisições simultâneas.
+        concorrencia_maxima (int): Limite superior de requisições simultâneas.
+        latencia_alvo (float): Latência, em segundos, abaixo da qual o limite pode crescer.
+        fator_reducao (float): Fator aplicado ao limite a cada sinal de sobrecarga.
+        espera_base (float): Espera, em segundos, antes da primeira nova tentativa após sobrecarga.
+        espera_maxima (float): Espera máxima, em segundos, entre novas tentativas.
+        limite (float): Limite de concorrência atual.
+    """
+
+    def __init__(self, taxa=None, rajada=None, concorrencia_inicial=None, concorrencia_minima=1,
+                 concorrencia_maxima=16, latencia_alvo=2.0, fator_reducao=0.5, espera_base=0.5, espera_maxima=30.0):
+        """
+        Inicializa o limitador. Ver a documentação da classe para o significado de cada parâmetro.
+
+        Args:
+            concorrencia_inicial (int, opcional): Limite de concorrência inicial. Se None, começa
+                na metade de `concorrencia_maxima`.
+            rajada (float, opcional): Capacidade do balde de fichas. Se None, igual a `taxa`.
+
+        Raises:
+            ValueError: Se os limites de concorrência forem inconsistentes, se `taxa` não for positiva
+                ou se `fator_reducao` não estiver entre 0 e 1.
+        """
+        if concorrencia_minima < 1 or concorrencia_maxima < concorrencia_minima:
+            raise ValueError("Os limites de concorrência devem satisfazer 1 <= mínima <= máxima.")
+        if taxa is not None and taxa <= 0:
+            raise ValueError("A taxa de requisições deve ser positiva.")
+        if not 0 < fator_reducao < 1:
+            raise ValueError("O fator de redução deve estar entre 0 e 1.")
+        if concorrencia_inicial is None:
+            concorrencia_inicial = concorrencia_maxima // 2
+        self.taxa = taxa
+        self.rajada = max(1.0, rajada if rajada is not None else (taxa or 1.0))
+        self.concorrencia_minima = concorrencia_minima
+        self.concorrencia_maxima = concorrencia_maxima
+        self.latencia_alvo = latencia_alvo
+        self.fator_reducao = fator_reducao
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.limite = float(min(concorrencia_maxima, max(concorrencia_minima, concorrencia_inicial)))
+        self._em_uso = 0
+        self._fichas = self.rajada
+        self._reabastecido_em = time.monotonic()
+        self._pausado_ate = 0.0
+        self._ultima_reducao = float("-inf")
+        self._condicao = threading.Condition()
+
+    def adquirir(self):
+        """
+        Aguarda até que uma nova requisição possa ser enviada: fora de uma pausa pedida pelo servidor,
+        com uma vaga de concorrência livre e com uma ficha disponível no balde.
+        """
+        with self._condicao:
+            while True:
+                agora = time.monotonic()
+                if agora < self._pausado_ate:
+                    self._condicao.wait(self._pausado_ate - agora)
+                    continue
+                if self._em_uso >= int(self.limite):
+                    self._condicao.wait()
+                    continue
+                if self.taxa is not None:
+                    self._fichas = min(self.rajada, self._fichas + (agora - self._reabastecido_em) * self.taxa)
+                    self._reabastecido_em = agora
+                    if self._fichas < 1:
+                        self._condicao.wait((1 - self._fichas) / self.taxa)
+                        continue
+                    self._fichas -= 1
+                self._em_uso += 1
+                return
+
+    def liberar(self, latencia=None, sobrecarga=False, espera=None):
+        """
+        Devolve a vaga de uma requisição terminada e ajusta o limite de concorrência.
+
+        Args:
+            latencia (float, opcional): Duração da requisição em segundos.
+            sobrecarga (bool, opcional): Se a requisição terminou com 429, 5xx ou tempo esgotado.
+            espera (float, opcional): Segundos pedidos pelo servidor em `Retry-After`.
+        """
+        with self._condicao:
+            self._em_uso -= 1
+            agora = time.monotonic()
+            if espera:
+                self._pausado_ate = max(self._pausado_ate, agora + espera)
+                metricas.incrementar("limitador_pausas")
+            if sobrecarga:
+                if agora - self._ultima_reducao >= self.latencia_alvo:
+                    self.limite = max(float(self.concorrencia_minima), self.limite * self.fator_reducao)
+                    self._ultima_reducao = agora
+                    metricas.incrementar("limitador_reducoes")
+            elif latencia is None or latencia <= self.latencia_alvo:
+                self.limite = min(float(self.concorrencia_maxima), self.limite + 1 / self.limite)
+            self._condicao.notify_all()
+
+    def espera_nova_tentativa(self, tentativa):
+        """
+        Calcula a espera antes de uma nova tentativa após sobrecarga: exponencial, limitada a `espera_maxima`
+        e com variação aleatória ("full jitter") para que as threads não voltem todas ao mesmo tempo.
+
+        Args:
+            tentativa (int): Número da nova tentativa, começando em 1.
+
+        Returns:
+            float: Segundos a aguardar.
+        """
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** (tentativa - 1)))
+
+    @property
+    def em_uso(self):
+        """
+        Quantidade de requisições em andamento.
+        """
+        with self._condicao:
+            return self._em_uso
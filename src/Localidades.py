@@ -0,0 +1,146 @@
+import logging
+
+# Tabela fixa das regiões e unidades federativas, no formato da API de localidades do IBGE.
+# Os códigos não mudam desde a criação do Tocantins (1988), por isso não precisam ser consultados a cada execução.
+REGIOES = {
+    1: {"id": 1, "sigla": "N", "nome": "Norte"},
+    2: {"id": 2, "sigla": "NE", "nome": "Nordeste"},
+    3: {"id": 3, "sigla": "SE", "nome": "Sudeste"},
+    4: {"id": 4, "sigla": "S", "nome": "Sul"},
+    5: {"id": 5, "sigla": "CO", "nome": "Centro-Oeste"},
+}
+
+ESTADOS = {
+    11: {"id": 11, "sigla": "RO", "nome": "Rondônia", "regiao": REGIOES[1]},
+    12: {"id": 12, "sigla": "AC", "nome": "Acre", "regiao": REGIOES[1]},
+    13: {"id": 13, "sigla": "AM", "nome": "Amazonas", "regiao": REGIOES[1]},
+    14: {"id": 14, "sigla": "RR", "nome": "Roraima", "regiao": REGIOES[1]},
+    15: {"id": 15, "sigla": "PA", "nome": "Pará", "regiao": REGIOES[1]},
+    16: {"id": 16, "sigla": "AP", "nome": "Amapá", "regiao": REGIOES[1]},
+    17: {"id": 17, "sigla": "TO", "nome": "Tocantins", "regiao": REGIOES[1]},
+    21: {"id": 21, "sigla": "MA", "nome": "Maranhão", "regiao": REGIOES[2]},
+    22: {"id": 22, "sigla": "PI", "nome": "Piauí", "regiao": REGIOES[2]},
+    23: {"id": 23, "sigla": "CE", "nome": "Ceará", "regiao": REGIOES[2]},
+    24: {"id": 24, "sigla": "RN", "nome": "Rio Grande do Norte", "regiao": REGIOES[2]},
+    25: {"id": 25, "sigla": "PB", "nome": "Paraíba", "regiao": REGIOES[2]},
+    26: {"id": 26, "sigla": "PE", "nome": "Pernambuco", "regiao": REGIOES[2]},
+    27: {"id": 27, "sigla": "AL", "nome": "Alagoas", "regiao": REGIOES[2]},
+    28: {"id": 28, "sigla": "SE", "nome": "Sergipe", "regiao": REGIOES[2]},
+    29: {"id": 29, "sigla": "BA", "nome": "Bahia", "regiao": REGIOES[2]},
+    31: {"id": 31, "sigla": "MG", "nome": "Minas Gerais", "regiao": REGIOES[3]},
+    32: {"id": 32, "sigla": "ES", "nome": "Espírito Santo", "regiao": REGIOES[3]},
+    33: {"id": 33, "sigla": "RJ", "nome": "Rio de Janeiro", "regiao": REGIOES[3]},
+    35: {"id": 35, "sigla": "SP", "nome": "São Paulo", "regiao": REGIOES[3]},
+    41: {"id": 41, "sigla": "PR", "nome": "Paraná", "regiao": REGIOES[4]},
+    42: {"id": 42, "sigla": "SC", "nome": "Santa Catarina", "regiao": REGIOES[4]},
+    43: {"id": 43, "sigla": "RS", "nome": "Rio Grande do Sul", "regiao": REGIOES[4]},
+    50: {"id": 50, "sigla": "MS", "nome": "Mato Grosso do Sul", "regiao": REGIOES[5]},
+    51: {"id": 51, "sigla": "MT", "nome": "Mato Grosso", "regiao": REGIOES[5]},
+    52: {"id": 52, "sigla": "GO", "nome": "Goiás", "regiao": REGIOES[5]},
+    53: {"id": 53, "sigla": "DF", "nome": "Distrito Federal", "regiao": REGIOES[5]},
+}
+
+
+def _montar_indice():
+    """
+    Monta o índice que associa sigla, ID e nome (em maiúsculas) de cada localidade ao seu registro.
+
+    Os estados são indexados por último para que, em caso de colisão de siglas
+    (como 'SE', que é tanto Sergipe quanto a região Sudeste), o estado prevaleça.
+    """
+    indice = {}
+    for localidade in list(REGIOES.values()) + list(ESTADOS.values()):
+        indice[str(localidade["id"])] = localidade
+        indice[localidade["sigla"]] = localidade
+        indice[localidade["nome"].upper()] = localidade
+    return indice
+
+
+_INDICE = _montar_indice()
+
+
+def buscar_localidade(sigla_id):
+    """
+    Busca uma região ou estado na tabela fixa a partir da sigla, do ID numérico ou do nome.
+
+    Args:
+        sigla_id (str ou int): Sigla (ex: 'SP'), ID (ex: 35 ou '35') ou nome (ex: 'São Paulo') da localidade.
+
+    Returns:
+        dict ou None: Registro da localidade, com 'id', 'sigla' e 'nome', ou None se não for encontrada.
+
+    Exemplos:
+        - `buscar_localidade('sp')` retorna o registro de São Paulo.
+        - `buscar_localidade(33)` retorna o registro do Rio de Janeiro.
+        - `buscar_localidade('SE')` retorna Sergipe; a região Sudeste é encontrada por `3` ou `'Sudeste'`.
+    """
+    if sigla_id is None:
+        return None
+    return _INDICE.get(str(sigla_id).strip().upper())
+
+
+# Código numérico do Brasil, usado no banco de dados no lugar da sigla 'BR' (os códigos do IBGE começam em 1).
+CODIGO_BRASIL = 0
+
+
+def codigo_localidade(localidade):
+    """
+    Converte uma localidade no código numérico compacto usado no banco de dados.
+
+    Args:
+        localidade (str, int, dict ou None): 'BR' ou None para o Brasil, ID, sigla, nome ou registro de uma localidade.
+
+    Returns:
+        int: `CODIGO_BRASIL` para o Brasil ou o ID da localidade no IBGE.
+
+    Raises:
+        ValueError: Se a localidade não for encontrada na tabela fixa.
+    """
+    if isinstance(localidade, dict):
+        return int(localidade["id"])
+    if localidade is None or str(localidade).strip().upper() == "BR":
+        return CODIGO_BRASIL
+    info_localidade = buscar_localidade(localidade)
+    if info_localidade is None:
+        raise ValueError(f"Localidade desconhecida: '{localidade}'")
+    return info_localidade["id"]
+
+
+def localidade_do_codigo(codigo):
+    """
+    Converte um código do banco de dados na representação usada pelo programa ('BR' ou o ID como texto).
+
+    Args:
+        codigo (int ou None): Código gravado no banco.
+
+    Returns:
+        str ou None: 'BR' para o Brasil, o ID como texto (ex: '35') ou None se o código for None.
+    """
+    if codigo is None:
+        return None
+    return "BR" if codigo == CODIGO_BRASIL else str(codigo)
+
+
+def validar_tabela(repositorio):
+    """
+    Compara a tabela fixa de estados com a API de localidades do IBGE.
+
+    Útil como verificação eventual, já que a tabela embutida substitui as consultas à rede no dia a dia.
+
+    Args:
+        repositorio (RepositorioIBGE): Repositório usado para consultar a API.
+
+    Returns:
+        list of int: IDs dos estados cuja sigla ou nome divergem da API. Lista vazia se a tabela estiver correta.
+    """
+    divergentes = []
+    for id_estado, estado in ESTADOS.items():
+        try:
+            info_estado = repositorio.obter_informacoes_estado(id_estado)
+        except Exception as e:
+            logging.error(f"Erro ao validar a localidade '{id_estado}': {e}")
+            divergentes.append(id_estado)
+            continue
+        if info_estado.get("sigla") != estado["sigla"] or info_estado.get("nome") != estado["nome"]:
+            divergentes.append(id_estado)
+    return divergentes
@@ -0,0 +1,130 @@
+from urllib.parse import quote
+
+from src.Normalizacao import normalizar_nome
+
+
+def normalizar_chave(nome):
+    """
+    Normaliza um nome para o formato em que a API do IBGE o devolve. Ver `src.Normalizacao.normalizar_nome`.
+
+    Args:
+        nome (str): Nome a ser normalizado.
+
+    Returns:
+        str: Nome normalizado (ex: 'joão ' -> 'JOAO').
+    """
+    return normalizar_nome(nome)
+
+
+class PlanejadorLotes:
+    """
+    Agrupa listas arbitrariamente grandes de nomes em lotes para a API de nomes do IBGE,
+    que aceita vários nomes separados por '|' em uma única requisição.
+
+    Cada lote respeita um tamanho máximo de URL (já codificada) e de quantidade de nomes,
+    e as linhas de cada resposta podem ser associadas de volta aos nomes pedidos.
+
+    Atributos:
+        url_base (str): Endpoint da API de nomes, ao qual os nomes do lote são concatenados.
+        limite_url (int): Comprimento máximo da URL codificada, sem os parâmetros de consulta.
+        max_nomes (int): Quantidade máxima de nomes por lote.
+    """
+
+    SEPARADOR_CODIFICADO = quote("|", safe="")
+
+    def __init__(self, url_base="https://servicodados.ibge.gov.br/api/v2/censos/nomes/", limite_url=2000, max_nomes=200):
+        """
+        Inicializa o planejador.
+
+        Args:
+            url_base (str, opcional): Endpoint da API de nomes. Padrão é o endpoint público do IBGE.
+            limite_url (int, opcional): Comprimento máximo da URL codificada. Padrão é 2000.
+            max_nomes (int, opcional): Quantidade máxima de nomes por lote. Padrão é 200.
+
+        Raises:
+            ValueError: Se `max_nomes` for menor que 1.
+        """
+        if max_nomes < 1:
+            raise ValueError("Cada lote deve poder conter pelo menos um nome.")
+        self.url_base = url_base
+        self.limite_url = limite_url
+        self.max_nomes = max_nomes
+
+    def planejar(self, nomes):
+        """
+        Divide os nomes em lotes, removendo nomes vazios e repetidos (após normalização) e preservando a ordem.
+
+        Args:
+            nomes (iterable of str): Nomes a serem consultados.
+
+        Returns:
+            list of list of str: Lotes de nomes. Um nome que sozinho excede o limite de URL forma um lote próprio.
+        """
+        lotes = []
+        lote_atual = []
+        comprimento_atual = len(self.url_base)
+        vistos = set()
+        for nome in nomes:
+            if not nome:
+                continue
+            chave = normalizar_chave(nome)
+            if not chave or chave in vistos:
+                continue
+            vistos.add(chave)
+
+            comprimento_nome = len(quote(nome, safe=""))
+            acrescimo = comprimento_nome + (len(self.SEPARADOR_CODIFICADO) if lote_atual else 0)
+            if lote_atual and (comprimento_atual + acrescimo > self.limite_url or len(lote_atual) >= self.max_nomes):
+                lotes.append(lote_atual)
+                lote_atual = []
+                comprimento_atual = len(self.url_base)
+                acrescimo = comprimento_nome
+            lote_atual.append(nome)
+            comprimento_atual += acrescimo
+        if lote_atual:
+            lotes.append(lote_atual)
+        return lotes
+
+    @staticmethod
+    def mapear_resposta(lote, resposta):
+        """
+        Associa cada nome do lote à linha correspondente da resposta da API.
+
+        Args:
+            lote (list of str): Nomes enviados na requisição.
+            resposta (list of dict): Resposta da API de nomes, com uma linha por nome encontrado.
+
+        Returns:
+            dict: Mapeamento de cada nome do lote para sua linha da resposta, ou None se a API não retornou linha para ele.
+        """
+        linhas = {normalizar_chave(dado["nome"]): dado for dado in resposta}
+        return {nome: linhas.get(normalizar_chave(nome)) for nome in lote}
+
+    @staticmethod
+    def nomes_ausentes(lote, resposta):
+        """
+        Retorna os nomes do lote para os quais a API não retornou nenhuma linha.
+
+        Args:
+            lote (list of str): Nomes enviados na requisição.
+            resposta (list of dict): Resposta da API de nomes.
+
+        Returns:
+            list of str: Nomes sem resultado, na ordem do lote.
+        """
+        mapeamento = PlanejadorLotes.mapear_resposta(lote, resposta)
+        return [nome for nome, dado in mapeamento.items() if dado is None]
+
+
+def ler_arquivo_nomes(caminho):
+    """
+    Lê uma lista de nomes de um arquivo de texto, um por linha, ignorando linhas vazias e comentários ('#').
+
+    Args:
+        caminho (str): Caminho do arquivo.
+
+    Returns:
+        list of str: Nomes lidos.
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        return [linha.strip() for linha in arquivo if linha.strip() and not linha.lstrip().startswith("#")]
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Metricas:
+    """
+    Registro de métricas do processo: contadores e tempos de cada etapa do fluxo
+    consulta -> conversão -> ranking -> gravação.
+
+    Cada métrica é identificada por um nome e por rótulos opcionais (ex: `status=200`). Os tempos guardam
+    quantidade, soma, mínimo, máximo e uma amostra das últimas observações, usada para os percentis.
+    Funções registradas com `adicionar_hook` são chamadas a cada observação, permitindo que quem usa
+    a biblioteca encaminhe as métricas para outro sistema.
+
+    Atributos:
+        tamanho_amostra (int): Quantidade de observações recentes guardadas por série de tempo.
+    """
+
+    PERCENTIS = (50, 95, 99)
+
+    def __init__(self, tamanho_amostra=2048):
+        """
+        Inicializa um registro vazio.
+
+        Args:
+            tamanho_amostra (int, opcional): Observações recentes guardadas por série de tempo. Padrão é 2048.
+        """
+        self.tamanho_amostra = tamanho_amostra
+        self._contadores = {}
+        self._tempos = {}
+        self._hooks = []
+        self._trava = threading.Lock()
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        """
+        Soma `valor` ao contador `nome` com os rótulos informados.
+        """
+        chave = self._chave(nome, rotulos)
+        with self._trava:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+        self._notificar("contador", nome, valor, rotulos)
+
+    def registrar_tempo(self, nome, segundos, **rotulos):
+        """
+        Registra uma observação de duração, em segundos, na série `nome` com os rótulos informados.
+        """
+        chave = self._chave(nome, rotulos)
+        with self._trava:
+            serie = self._tempos.get(chave)
+            if serie is None:
+                serie = self._tempos[chave] = {"quantidade": 0, "soma": 0.0, "minimo": segundos, "maximo": segundos,
+                                               "amostra": deque(maxlen=self.tamanho_amostra)}
+            serie["quantidade"] += 1
+            serie["soma"] += segundos
+            serie["minimo"] = min(serie["minimo"], segundos)
+            serie["maximo"] = max(serie["maximo"], segundos)
+            serie["amostra"].append(segundos)
+        self._notificar("tempo", nome, segundos, rotulos)
+
+    @contextmanager
+    def cronometrar(self, nome, **rotulos):
+        """
+        Mede a duração do bloco `with` e a registra na série `nome`, mesmo que o bloco levante uma exceção.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_tempo(nome, time.perf_counter() - inicio, **rotulos)
+
+    def adicionar_hook(self, funcao):
+        """
+        Registra uma função chamada a cada observação com os argumentos (tipo, nome, valor, rotulos),
+        onde tipo é 'contador' ou 'tempo'. Exceções levantadas pela função são ignoradas.
+        """
+        with self._trava:
+            self._hooks.append(funcao)
+
+    def remover_hook(self, funcao):
+        """
+        Remove uma função registrada com `adicionar_hook`.
+        """
+        with self._trava:
+            self._hooks.remove(funcao)
+
+    def zerar(self):
+        """
+        Descarta todos os contadores e tempos registrados (os hooks são mantidos).
+        """
+        with self._trava:
+            self._contadores.clear()
+            self._tempos.clear()
+
+    def contador(self, nome, **rotulos):
+        """
+        Retorna o valor atual de um contador, ou 0 se ele nunca foi incrementado.
+        """
+        with self._trava:
+            return self._contadores.get(self._chave(nome, rotulos), 0)
+
+    def tempo(self, nome, **rotulos):
+        """
+        Retorna (quantidade, soma em segundos) das observações de uma série de tempo, ou (0, 0.0) se não houver.
+        """
+        with self._trava:
+            serie = self._tempos.get(self._chave(nome, rotulos))
+            return (serie["quantidade"], serie["soma"]) if serie else (0, 0.0)
+
+    @staticmethod
+    def _chave(nome, rotulos):
+        return nome, tuple(sorted((rotulo, str(valor)) for rotulo, valor in rotulos.items()))
+
+    def resumo(self):
+        """
+        Retorna um retrato das métricas em formato serializável.
+
+        Returns:
+            dict: {'contadores': [...], 'tempos': [...]}, com uma entrada por nome e combinação de rótulos.
+            Os tempos incluem quantidade, soma, mínimo, máximo e os percentis de `PERCENTIS`.
+        """
+        with self._trava:
+            contadores = [{"nome": nome, "rotulos": dict(rotulos), "valor": valor}
+                          for (nome, rotulos), valor in sorted(self._contadores.items())]
+            tempos = []
+            for (nome, rotulos), serie in sorted(self._tempos.items(), key=lambda par: par[0]):
+                amostra = sorted(serie["amostra"])
+                entrada = {"nome": nome, "rotulos": dict(rotulos), "quantidade": serie["quantidade"],
+                           "soma": serie["soma"], "minimo": serie["minimo"], "maximo": serie["maximo"]}
+                for percentil in self.PERCENTIS:
+                    entrada[f"p{percentil}"] = amostra[min(len(amostra) - 1, int(len(amostra) * percentil / 100))]
+                tempos.append(entrada)
+        return {"contadores": contadores, "tempos": tempos}
+
+    def json(self):
+        """
+        Retorna o resumo das métricas serializado em JSON.
+        """
+        return json.dumps(self.resumo(), ensure_ascii=False, indent=2)
+
+    def prometheus(self, prefixo="ibge_"):
+        """
+        Retorna as métricas no formato de texto do Prometheus: contadores com sufixo `_total` e
+        tempos como `summary` em segundos.
+        """
+        linhas = []
+        resumo = self.resumo()
+        declarados = set()
+        for entrada in resumo["contadores"]:
+            nome = f"{prefixo}{entrada['nome']}_total"
+            if nome not in declarados:
+                linhas.append(f"# TYPE {nome} counter")
+                declarados.add(nome)
+            linhas.append(f"{nome}{self._rotulos_prometheus(entrada['rotulos'])} {entrada['valor']}")
+        for entrada in resumo["tempos"]:
+            nome = f"{prefixo}{entrada['nome']}_segundos"
+            if nome not in declarados:
+                linhas.append(f"# TYPE {nome} summary")
+                declarados.add(nome)
+            for percentil in self.PERCENTIS:
+                rotulos = dict(entrada["rotulos"], quantile=str(percentil / 100))
+                linhas.append(f"{nome}{self._rotulos_prometheus(rotulos)} {entrada[f'p{percentil}']}")
+            linhas.append(f"{nome}_sum{self._rotulos_prometheus(entrada['rotulos'])} {entrada['soma']}")
+            linhas.append(f"{nome}_count{self._rotulos_prometheus(entrada['rotulos'])} {entrada['quantidade']}")
+        return "\n".join(linhas) + "\n"
+
+    @staticmethod
+    def _rotulos_prometheus(rotulos):
+        if not rotulos:
+            return ""
+        pares = []
+        for chave, valor in sorted(rotulos.items()):
+            valor = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+            pares.append(f'{chave}="{valor}"')
+        return "{" + ",".join(pares) + "}"
+
+    def _notificar(self, tipo, nome, valor, rotulos):
+        for funcao in list(self._hooks):
+            try:
+                funcao(tipo, nome, valor, rotulos)
+            except Exception:
+                pass
+
+
+# Registro compartilhado por todo o processo.
+metricas = Metricas()
@@ -0,0 +1,102 @@
+import unicodedata
+
+
+def normalizar_nome(nome):
+    """
+    Converte um nome para a forma canônica em que a API do IBGE o indexa: sem acentos, em maiúsculas
+    e com os espaços internos reduzidos a um só.
+
+    Args:
+        nome (str): Nome a ser normalizado.
+
+    Returns:
+        str: Nome canônico (ex: '  joão ' -> 'JOAO', 'Maria  da Graça' -> 'MARIA DA GRACA').
+    """
+    decomposto = unicodedata.normalize("NFKD", str(nome).casefold())
+    sem_acentos = "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+    return " ".join(sem_acentos.split()).upper()
+
+
+class IndiceNomes:
+    """
+    Índice das grafias informadas pelo usuário para cada nome canônico.
+
+    Grafias que diferem apenas em acentos, maiúsculas ou espaços ('joão', 'JOÃO', 'Joao') são reduzidas a um
+    único nome canônico antes de planejar as consultas, de modo que cada nome é consultado uma única vez.
+    Os resultados por nome canônico podem depois ser associados de volta a todas as grafias originais.
+
+    Atributos:
+        grafias (dict): Nome canônico -> lista das grafias originais, na ordem em que apareceram.
+    """
+
+    def __init__(self, nomes=()):
+        """
+        Inicializa o índice, adicionando os nomes fornecidos.
+
+        Args:
+            nomes (iterable of str, opcional): Nomes informados pelo usuário. Nomes vazios são ignorados.
+        """
+        self.grafias = {}
+        for nome in nomes:
+            self.adicionar(nome)
+
+    def adicionar(self, nome):
+        """
+        Adiciona uma grafia ao índice.
+
+        Returns:
+            str ou None: Nome canônico da grafia, ou None se ela for vazia.
+        """
+        if nome is None:
+            return None
+        canonico = normalizar_nome(nome)
+        if not canonico:
+            return None
+        grafias = self.grafias.setdefault(canonico, [])
+        if nome not in grafias:
+            grafias.append(nome)
+        return canonico
+
+    def canonicos(self):
+        """
+        Retorna os nomes canônicos, na ordem em que apareceram pela primeira vez.
+        """
+        return list(self.grafias)
+
+    @property
+    def total_grafias(self):
+        """
+        Quantidade de grafias distintas adicionadas ao índice.
+        """
+        return sum(len(grafias) for grafias in self.grafias.values())
+
+    def expandir(self, nomes):
+        """
+        Substitui cada nome pelas grafias originais do seu nome canônico. Nomes ausentes do índice são mantidos.
+
+        Args:
+            nomes (iterable of str): Nomes canônicos (ou qualquer grafia deles).
+
+        Returns:
+            list of str: Grafias originais, na ordem dos nomes fornecidos.
+        """
+        expandidos = []
+        for nome in nomes:
+            expandidos.extend(self.grafias.get(normalizar_nome(nome), [nome]))
+        return expandidos
+
+    def distribuir(self, resultados):
+        """
+        Associa os resultados obtidos por nome canônico a cada grafia original.
+
+        Args:
+            resultados (dict): Nome canônico (ou qualquer grafia dele) -> resultado.
+
+        Returns:
+            dict: Grafia original -> resultado do seu nome canônico, para os nomes presentes em `resultados`.
+        """
+        distribuidos = {}
+        for nome, resultado in resultados.items():
+            for grafia in self.grafias.get(normalizar_nome(nome), [nome]):
+                distribuidos[grafia] = resultado
+        return distribuidos
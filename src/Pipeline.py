@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+import random
+from collections import OrderedDict
+
+from src.Metricas import metricas
+
+# Estados de cada combinação acompanhados pelo pipeline.
+PENDENTE = "pendente"
+OK = "ok"
+VAZIA = "vazia"
+FALHA = "falha"
+
+
+class PipelineRanking:
+    """
+    Pipeline produtor/consumidor que consulta a API do IBGE para um conjunto de combinações e grava os
+    resultados no banco à medida que cada combinação termina, em vez de esperar por todas.
+
+    Etapas:
+        1. Busca: até `concorrencia` combinações consultadas ao mesmo tempo, em qualquer ordem de término.
+        2. Conversão: cada resposta é transformada em objetos `Item`.
+        3. Deduplicação: itens repetidos são descartados com base em um conjunto limitado de chaves já vistas.
+        4. Gravação: os itens são agrupados em micro-lotes e enviados por uma fila limitada aos escritores,
+           que gravam em threads separadas. Quando a fila está cheia, a busca espera (contrapressão).
+           Se `gravar` levantar uma exceção, todas as combinações com itens no micro-lote passam a `FALHA`.
+        5. Novas tentativas: terminada a passagem principal (e gravados os lotes pendentes), as combinações que
+           falharam na consulta ou na gravação são consultadas novamente, até `novas_tentativas` rodadas, cada uma
+           com uma espera aleatória crescente por combinação. Assim uma falha não prende um buscador durante a
+           passagem principal.
+
+    O estado de cada combinação (`PENDENTE`, `OK`, `VAZIA` ou `FALHA`) fica em `estados`, de modo que uma resposta
+    vazia não se confunde com uma consulta que falhou; as que falharam em todas as tentativas estão em `falhas()`.
+
+    Atributos:
+        repositorio (AsyncRepositorioIBGE): Repositório assíncrono usado nas consultas.
+        converter (callable): Função (combinacao, resposta) -> lista de `Item`.
+        gravar (callable ou None): Função bloqueante que grava uma lista de `Item` e retorna um dicionário de contagens.
+            Deve levantar uma exceção se a gravação falhar (ex: `PoolPostgre.upsert_data` com `levantar=True`).
+        ao_item (callable ou None): Chamada para cada item novo (não duplicado), por exemplo `Ranking.adicionar_item`.
+        ao_resposta (callable ou None): Chamada com (combinacao, resposta) para cada combinação bem-sucedida.
+        tamanho_lote (int): Quantidade de itens por micro-lote de gravação.
+        capacidade_fila (int): Quantidade máxima de micro-lotes aguardando gravação.
+        max_vistos (int): Quantidade máxima de chaves mantidas para deduplicação.
+        escritores (int): Quantidade de escritores gravando em paralelo.
+        novas_tentativas (int): Rodadas de novas tentativas para as combinações que falharam.
+        espera_base (float): Espera máxima, em segundos, antes de cada combinação na primeira rodada
+            de novas tentativas; dobra a cada rodada.
+        estados (dict): Estado de cada combinação, indexado por `chave_combinacao`.
+    """
+
+    def __init__(self, repositorio, converter, gravar=None, ao_item=None, ao_resposta=None,
+                 tamanho_lote=1000, capacidade_fila=8, max_vistos=1_000_000, escritores=2,
+                 novas_tentativas=0, espera_base=1.0):
+        """
+        Inicializa o pipeline. Ver a documentação da classe para o significado de cada parâmetro.
+
+        Raises:
+            ValueError: Se `tamanho_lote`, `capacidade_fila`, `max_vistos` ou `escritores` forem menores que 1,
+                ou se `novas_tentativas` for negativo.
+        """
+        if min(tamanho_lote, capacidade_fila, max_vistos, escritores) < 1:
+            raise ValueError("Os limites do pipeline devem ser de pelo menos 1.")
+        if novas_tentativas < 0:
+            raise ValueError("A quantidade de novas tentativas não pode ser negativa.")
+        self.repositorio = repositorio
+        self.converter = converter
+        self.gravar = gravar
+        self.ao_item = ao_item
+        self.ao_resposta = ao_resposta
+        self.tamanho_lote = tamanho_lote
+        self.capacidade_fila = capacidade_fila
+        self.max_vistos = max_vistos
+        self.escritores = escritores
+        self.novas_tentativas = novas_tentativas
+        self.espera_base = espera_base
+        self.estados = {}
+        self._falhas = {}
+
+    @staticmethod
+    def chave_combinacao(combinacao):
+        """
+        Retorna uma chave hashable para a combinação (nomes, localidade, sexo, decada).
+        """
+        nomes, localidade, sexo, decada = combinacao
+        return tuple(nomes), localidade, sexo, decada
+
+    def falhas(self):
+        """
+        Retorna as combinações que falharam em todas as tentativas da última execução.
+
+        Returns:
+            list of tuple: Pares (combinacao, mensagem de erro), na ordem em que falharam pela primeira vez.
+        """
+        return list(self._falhas.values())
+
+    def processar(self, combinacoes):
+        """
+        Executa o pipeline em um novo event loop.
+
+        Args:
+            combinacoes (iterable of tuple): Tuplas (nomes, localidade, sexo, decada). Pode ser um gerador.
+
+        Returns:
+            dict: Resumo da execução (ver `executar`).
+        """
+        return asyncio.run(self.executar(combinacoes))
+
+    async def executar(self, combinacoes):
+        """
+        Executa o pipeline para todas as combinações.
+
+        Args:
+            combinacoes (iterable of tuple): Tuplas (nomes, localidade, sexo, decada). Pode ser um gerador;
+                as combinações são consumidas sob demanda.
+
+        Returns:
+            dict: Resumo com as contagens 'combinacoes', 'vazias', 'falhas' (após as novas tentativas), 'repetidas',
+            'itens', 'duplicados' e 'lotes', somadas às contagens retornadas por `gravar`
+            (por exemplo 'inseridos', 'atualizados', 'inalterados').
+        """
+        self._resumo = {"combinacoes": 0, "vazias": 0, "falhas": 0, "repetidas": 0, "itens": 0, "duplicados": 0,
+                        "lotes": 0}
+        self.estados = {}
+        self._falhas = {}
+        self._vistos = OrderedDict()
+        self._regravar = set()
+        self._lote = []
+        self._combinacoes_lote = {}
+        self._fila = asyncio.Queue(maxsize=self.capacidade_fila)
+        pendentes = iter(combinacoes)
+
+        escritores = [asyncio.create_task(self._escrever()) for _ in range(self.escritores)]
+        buscadores = [asyncio.create_task(self._buscar(pendentes)) for _ in range(self.repositorio.concorrencia)]
+        try:
+            await asyncio.gather(*buscadores)
+            await self._aguardar_gravacoes()
+            for rodada in range(1, self.novas_tentativas + 1):
+                if not self._falhas:
+                    break
+                repetir = iter([combinacao for combinacao, _ in self._falhas.values()])
+                self._resumo["repetidas"] += len(self._falhas)
+                metricas.incrementar("combinacoes_repetidas", len(self._falhas))
+                espera = self.espera_base * 2 ** (rodada - 1)
+                await asyncio.gather(*(self._buscar(repetir, espera) for _ in range(self.repositorio.concorrencia)))
+                await self._aguardar_gravacoes()
+        finally:
+            for _ in escritores:
+                await self._fila.put(None)
+            await asyncio.gather(*escritores)
+        self._resumo["falhas"] = len(self._falhas)
+        self._resumo["vazias"] = sum(estado == VAZIA for estado in self.estados.values())
+        return self._resumo
+
+    async def _buscar(self, pendentes, espera=None):
+        """
+        Consome combinações do iterador compartilhado até esgotá-lo, convertendo e enfileirando os itens.
+        Em uma rodada de novas tentativas (`espera` definida), aguarda um tempo aleatório entre 0 e `espera`
+        segundos antes de cada combinação, para que as repetições não cheguem à API todas de uma vez.
+        """
+        for combinacao in pendentes:
+            chave = self.chave_combinacao(combinacao)
+            if espera is None:
+                self._resumo["combinacoes"] += 1
+            else:
+                await asyncio.sleep(random.uniform(0, espera))
+            self.estados[chave] = PENDENTE
+            try:
+                resposta = await self.repositorio.obter_ranking(*combinacao)
+                itens = self.converter(combinacao, resposta)
+            except Exception as e:
+                logging.error(f"Erro ao processar a combinação {combinacao}: {e}")
+                self.estados[chave] = FALHA
+                self._falhas[chave] = (combinacao, f"{type(e).__name__}: {e}")
+                continue
+            self.estados[chave] = OK if itens else VAZIA
+            self._falhas.pop(chave, None)
+            if self.ao_resposta is not None:
+                self.ao_resposta(combinacao, resposta)
+            for item in itens:
+                chave_item = item.chave()
+                if self._registrar_visto(chave_item):
+                    self._resumo["duplicados"] += 1
+                    continue
+                if chave_item in self._regravar:
+                    # Item de um lote cuja gravação falhou: já foi contado e entregue a `ao_item`.
+                    self._regravar.discard(chave_item)
+                else:
+                    self._resumo["itens"] += 1
+                    if self.ao_item is not None:
+                        self.ao_item(item)
+                self._lote.append(item)
+                self._combinacoes_lote[chave] = combinacao
+                if len(self._lote) >= self.tamanho_lote:
+                    # Tempo bloqueado pela contrapressão: indica que a gravação é o gargalo.
+                    with metricas.cronometrar("espera_fila"):
+                        await self._enviar_lote()
+
+    async def _enviar_lote(self):
+        """
+        Envia o micro-lote atual aos escritores, junto com as combinações que têm itens nele.
+        """
+        lote, combinacoes = self._lote, self._combinacoes_lote
+        self._lote, self._combinacoes_lote = [], {}
+        await self._fila.put((lote, combinacoes))
+
+    async def _aguardar_gravacoes(self):
+        """
+        Envia o micro-lote incompleto e espera a gravação de todos os lotes da fila, para que as falhas de gravação
+        já estejam em `_falhas` ao decidir as novas tentativas.
+        """
+        if self._lote:
+            await self._enviar_lote()
+        await self._fila.join()
+
+    def _registrar_visto(self, chave):
+        """
+        Registra a chave no conjunto de vistos, descartando as mais antigas além de `max_vistos`.
+
+        Returns:
+            bool: True se a chave já havia sido vista.
+        """
+        if chave in self._vistos:
+            self._vistos.move_to_end(chave)
+            return True
+        self._vistos[chave] = None
+        if len(self._vistos) > self.max_vistos:
+            self._vistos.popitem(last=False)
+        return False
+
+    async def _escrever(self):
+        """
+        Grava os micro-lotes da fila até receber o sinal de término (None).
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            entrada = await self._fila.get()
+            if entrada is None:
+                self._fila.task_done()
+                return
+            lote, combinacoes = entrada
+            try:
+                self._resumo["lotes"] += 1
+                if self.gravar is None:
+                    continue
+                try:
+                    totais = await loop.run_in_executor(None, self.gravar, lote)
+                except Exception as e:
+                    logging.error(f"Erro ao gravar lote de {len(lote)} itens: {e}")
+                    metricas.incrementar("lotes_nao_gravados")
+                    self._registrar_falha_gravacao(lote, combinacoes, f"{type(e).__name__}: {e}")
+                    continue
+                for chave, valor in (totais or {}).items():
+                    self._resumo[chave] = self._resumo.get(chave, 0) + valor
+            finally:
+                self._fila.task_done()
+
+    def _registrar_falha_gravacao(self, lote, combinacoes, erro):
+        """
+        Marca como `FALHA` as combinações de um lote não gravado e libera seus itens da deduplicação,
+        para que sejam gravados de novo quando a combinação for repetida.
+        """
+        for item in lote:
+            chave_item = item.chave()
+            self._vistos.pop(chave_item, None)
+            self._regravar.add(chave_item)
+        for chave, combinacao in combinacoes.items():
+            self.estados[chave] = FALHA
+            self._falhas[chave] = (combinacao, erro)
+
+
+def salvar_manifesto_falhas(caminho, falhas, decadas=None):
+    """
+    Grava em JSON as combinações que falharam, para que uma execução posterior possa repeti-las.
+
+    Args:
+        caminho (str): Arquivo de destino.
+        falhas (list of tuple): Pares (combinacao, mensagem de erro), como retornados por `PipelineRanking.falhas`.
+        decadas (list of int, opcional): Décadas pedidas na execução, necessárias para converter as respostas de nomes.
+    """
+    manifesto = {
+        "decadas": decadas,
+        "combinacoes": [
+            {"nomes": list(nomes), "localidade": localidade, "sexo": sexo, "decada": decada, "erro": erro}
+            for (nomes, localidade, sexo, decada), erro in falhas
+        ]
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+
+
+def ler_manifesto_falhas(caminho):
+    """
+    Lê um manifesto gravado por `salvar_manifesto_falhas`.
+
+    Args:
+        caminho (str): Arquivo do manifesto.
+
+    Returns:
+        tuple: (combinacoes, decadas), com as combinações como tuplas (nomes, localidade, sexo, decada).
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        manifesto = json.load(arquivo)
+    combinacoes = [(entrada["nomes"], entrada["localidade"], entrada["sexo"], entrada["decada"])
+                   for entrada in manifesto["combinacoes"]]
+    return combinacoes, manifesto.get("decadas")
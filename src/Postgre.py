@@ -1,11 +1,107 @@
+import io
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import logging
+from src.Metricas import metricas
+from src.Localidades import CODIGO_BRASIL, ESTADOS, REGIOES, codigo_localidade, localidade_do_codigo
+
+
+def _sql_codigo_localidade(coluna):
+    """
+    Expressão SQL que converte a localidade gravada como texto ('BR', ID ou sigla) no código numérico.
+    """
+    casos = " ".join(f"WHEN '{estado['sigla']}' THEN {id_estado}" for id_estado, estado in ESTADOS.items())
+    return (f"CASE upper({coluna}) WHEN 'BR' THEN {CODIGO_BRASIL} {casos} "
+            f"ELSE NULLIF({coluna}, '')::SMALLINT END")
+
+
+# Migrações do esquema, aplicadas em ordem e registradas na tabela 'esquema_versao'.
+# Cada entrada é (versão, lista de comandos SQL); novas versões devem ser acrescentadas ao final.
+MIGRACOES = [
+    (1, ['''
+    CREATE TABLE IF NOT EXISTS nomes (
+        id SERIAL PRIMARY KEY,
+        nome VARCHAR(100),
+        localidade VARCHAR(100),
+        sexo VARCHAR(10),
+        decada VARCHAR(10),
+        frequencia INTEGER,
+        UNIQUE (nome, localidade, sexo, decada)
+    );
+    ''']),
+    # Data da última confirmação de cada linha pela API, usada pelo modo incremental.
+    (2, ['''
+    ALTER TABLE nomes ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now();
+    ''']),
+    # Leitura pelo banco: índice para rankings (ORDER BY frequencia DESC LIMIT n por localidade, sexo e década)
+    # e registro das consultas de ranking já gravadas por completo. Buscas por nome usam o índice da
+    # restrição UNIQUE, que começa por 'nome'.
+    (3, ['''
+    CREATE INDEX IF NOT EXISTS nomes_ranking_idx ON nomes (localidade, sexo, decada, frequencia DESC);
+    ''', '''
+    CREATE TABLE IF NOT EXISTS consultas_ranking (
+        localidade VARCHAR(100),
+        sexo VARCHAR(10),
+        decada VARCHAR(10),
+        atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (localidade, sexo, decada)
+    );
+    ''']),
+    # Esquema tipado: década como SMALLINT (NULL para todas as décadas, em vez do texto 'None') e localidade
+    # como código SMALLINT (0 para o Brasil). A chave única passa a tratar NULL como valor (requer PostgreSQL 15+).
+    (4, ['''
+    ALTER TABLE nomes DROP CONSTRAINT IF EXISTS nomes_nome_localidade_sexo_decada_key;
+    ''', f'''
+    ALTER TABLE nomes
+        ALTER COLUMN decada TYPE SMALLINT USING NULLIF(NULLIF(decada, 'None'), '')::SMALLINT,
+        ALTER COLUMN localidade TYPE SMALLINT USING {_sql_codigo_localidade('localidade')};
+    ''', '''
+    DELETE FROM nomes AS antiga USING nomes AS nova
+    WHERE antiga.id < nova.id AND antiga.nome = nova.nome AND antiga.sexo IS NOT DISTINCT FROM nova.sexo
+      AND antiga.localidade IS NOT DISTINCT FROM nova.localidade AND antiga.decada IS NOT DISTINCT FROM nova.decada;
+    ''', '''
+    ALTER TABLE nomes ADD CONSTRAINT nomes_chave UNIQUE NULLS NOT DISTINCT (nome, localidade, sexo, decada);
+    ''', '''
+    ALTER TABLE consultas_ranking DROP CONSTRAINT IF EXISTS consultas_ranking_pkey;
+    ''', f'''
+    ALTER TABLE consultas_ranking
+        ALTER COLUMN decada DROP NOT NULL,
+        ALTER COLUMN decada TYPE SMALLINT USING NULLIF(NULLIF(decada, 'None'), '')::SMALLINT,
+        ALTER COLUMN localidade TYPE SMALLINT USING {_sql_codigo_localidade('localidade')};
+    ''', '''
+    ALTER TABLE consultas_ranking ADD CONSTRAINT consultas_ranking_chave
+        UNIQUE NULLS NOT DISTINCT (localidade, sexo, decada);
+    ''']),
+    # Marcador negativo do modo incremental: nomes para os quais a API não retornou nenhuma linha em uma
+    # localidade e sexo. Sem ele, esses nomes nunca estariam atualizados no banco e iriam à API em toda execução.
+    (5, ['''
+    CREATE TABLE IF NOT EXISTS nomes_sem_resultado (
+        nome VARCHAR(100),
+        localidade SMALLINT,
+        sexo VARCHAR(10),
+        atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (nome, localidade, sexo)
+    );
+    ''']),
+]
+
+# Chave da trava consultiva usada para que processos concorrentes não apliquem as migrações ao mesmo tempo.
+CHAVE_TRAVA_MIGRACOES = 7_250_531
+
+# Bancos (host, porta, banco) cujo esquema já foi verificado neste processo.
+_esquemas_verificados = set()
+_trava_esquemas = threading.Lock()
+
 
 class Postgre:
     def __init__(self, host, port, database, user, password):
         """
-        Inicializa a conexão com o banco de dados PostgreSQL.
+        Inicializa a conexão com o banco de dados PostgreSQL e garante que o esquema esteja atualizado.
         """
         try:
             self.connection = psycopg2.connect(
@@ -21,22 +117,38 @@ class Postgre:
             logging.error(f"Erro ao conectar ao banco de dados PostgreSQL: {e}")
             raise
 
+    @classmethod
+    def de_conexao(cls, connection):
+        """
+        Cria uma instância a partir de uma conexão já aberta (por exemplo, emprestada de um pool),
+        sem abrir uma nova conexão nem verificar o esquema.
+        :param connection: Conexão psycopg2 aberta.
+        """
+        instancia = cls.__new__(cls)
+        instancia.connection = connection
+        instancia.cursor = connection.cursor()
+        return instancia
+
     def create_table(self):
         """
-        Cria a tabela 'nomes' se ela não existir, com uma restrição de unicidade.
+        Cria a tabela 'nomes' se ela não existir, com uma restrição de unicidade, aplicando em seguida
+        as migrações de esquema ainda não registradas em 'esquema_versao'.
         """
-        create_table_query = '''
-        CREATE TABLE IF NOT EXISTS nomes (
-            id SERIAL PRIMARY KEY,
-            nome VARCHAR(100),
-            localidade VARCHAR(100),
-            sexo VARCHAR(10),
-            decada VARCHAR(10),
-            frequencia INTEGER,
-            UNIQUE (nome, localidade, sexo, decada)
+        self.cursor.execute("SELECT pg_advisory_xact_lock(%s)", (CHAVE_TRAVA_MIGRACOES,))
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS esquema_versao (
+            versao INTEGER PRIMARY KEY,
+            aplicada_em TIMESTAMPTZ NOT NULL DEFAULT now()
         );
-        '''
-        self.cursor.execute(create_table_query)
+        ''')
+        self.cursor.execute("SELECT versao FROM esquema_versao")
+        aplicadas = {versao for (versao,) in self.cursor.fetchall()}
+        for versao, comandos in MIGRACOES:
+            if versao in aplicadas:
+                continue
+            for comando in comandos:
+                self.cursor.execute(comando)
+            self.cursor.execute("INSERT INTO esquema_versao (versao) VALUES (%s)", (versao,))
         self.connection.commit()
 
     def insert_data(self, items):
@@ -51,15 +163,293 @@ class Postgre:
         ON CONFLICT (nome, localidade, sexo, decada) DO NOTHING
         '''
         data = [
-            (item.nome, item.localidade, item.sexo, str(item.decada), item.frequencia)
+            (item.nome, codigo_localidade(item.localidade), item.sexo, item.decada, item.frequencia)
             for item in items
         ]
         try:
-            psycopg2.extras.execute_values(self.cursor, insert_query, data)
-            self.connection.commit()
+            with metricas.cronometrar("gravacao", operacao="insert"):
+                psycopg2.extras.execute_values(self.cursor, insert_query, data)
+                self.connection.commit()
+            metricas.incrementar("linhas_gravadas", len(data), operacao="insert")
+        except Exception as e:
+            metricas.incrementar("gravacoes_erros", operacao="insert")
+            logging.error(f"Erro ao inserir dados no PostgreSQL: {e}")
+            self.connection.rollback()
+
+    def upsert_data(self, items, tamanho_lote=50000, levantar=False):
+        """
+        Grava uma sequência (possivelmente muito grande) de objetos Item na tabela, atualizando a frequência
+        das linhas já existentes quando ela mudou. Todas as linhas recebidas, mudadas ou não, têm `atualizado_em`
+        renovado, já que acabaram de ser confirmadas pela API.
+
+        Os itens são consumidos em lotes de `tamanho_lote`: cada lote é enviado com `COPY ... FROM STDIN`
+        para uma tabela temporária de staging e depois mesclado em 'nomes' com
+        `INSERT ... ON CONFLICT ... DO UPDATE`. Cada lote é confirmado em sua própria transação.
+        :param items: Iterável de instâncias da classe Item (pode ser um gerador).
+        :param tamanho_lote: Quantidade máxima de itens enviados por COPY.
+        :param levantar: Se True, um erro de gravação é levantado (após desfazer o lote em andamento) em vez de
+            apenas registrado. Deve ser usado por quem só pode dar os itens como gravados após a confirmação.
+        :return: Dicionário com as contagens 'inseridos', 'atualizados' e 'inalterados'.
+        """
+        if tamanho_lote < 1:
+            raise ValueError("O tamanho do lote deve ser de pelo menos 1 item.")
+        totais = {"inseridos": 0, "atualizados": 0, "inalterados": 0}
+        iterador = iter(items)
+        try:
+            self.cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS nomes_staging (
+                nome VARCHAR(100),
+                localidade SMALLINT,
+                sexo VARCHAR(10),
+                decada SMALLINT,
+                frequencia INTEGER
+            ) ON COMMIT DELETE ROWS
+            ''')
+            while True:
+                lote = list(islice(iterador, tamanho_lote))
+                if not lote:
+                    break
+                inicio = time.perf_counter()
+                buffer = io.StringIO()
+                chaves = set()
+                for item in lote:
+                    valores = (item.nome, codigo_localidade(item.localidade), item.sexo, item.decada, item.frequencia)
+                    chaves.add(valores[:4])
+                    buffer.write(self._linha_copy(valores))
+                buffer.seek(0)
+                self.cursor.copy_expert(
+                    "COPY nomes_staging (nome, localidade, sexo, decada, frequencia) FROM STDIN", buffer
+                )
+                # Linhas confirmadas sem mudança só têm a data de atualização renovada.
+                self.cursor.execute('''
+                UPDATE nomes SET atualizado_em = now()
+                FROM nomes_staging s
+                WHERE nomes.nome = s.nome AND nomes.localidade = s.localidade
+                  AND nomes.sexo = s.sexo AND nomes.decada IS NOT DISTINCT FROM s.decada
+                  AND nomes.frequencia IS NOT DISTINCT FROM s.frequencia
+                ''')
+                self.cursor.execute('''
+                INSERT INTO nomes (nome, localidade, sexo, decada, frequencia)
+                SELECT DISTINCT ON (nome, localidade, sexo, decada) nome, localidade, sexo, decada, frequencia
+                FROM nomes_staging
+                ORDER BY nome, localidade, sexo, decada
+                ON CONFLICT (nome, localidade, sexo, decada) DO UPDATE
+                SET frequencia = EXCLUDED.frequencia, atualizado_em = now()
+                WHERE nomes.frequencia IS DISTINCT FROM EXCLUDED.frequencia
+                RETURNING (xmax = 0) AS inserido
+                ''')
+                resultados = self.cursor.fetchall()
+                inseridos = sum(1 for (inserido,) in resultados if inserido)
+                totais["inseridos"] += inseridos
+                totais["atualizados"] += len(resultados) - inseridos
+                totais["inalterados"] += len(chaves) - len(resultados)
+                self.connection.commit()
+                metricas.registrar_tempo("gravacao", time.perf_counter() - inicio, operacao="upsert")
+                metricas.incrementar("linhas_gravadas", len(resultados), operacao="upsert")
         except Exception as e:
+            metricas.incrementar("gravacoes_erros", operacao="upsert")
             logging.error(f"Erro ao inserir dados no PostgreSQL: {e}")
             self.connection.rollback()
+            if levantar:
+                raise
+        return totais
+
+    def buscar(self, nomes=None, localidades=None, sexos=None, decadas=None, idade_maxima=None,
+               limite=None, por_grupo=False):
+        """
+        Consulta a tabela 'nomes' em ordem decrescente de frequência. Filtros None são ignorados.
+        :param nomes: Nomes no formato da API (ex: 'MARIA').
+        :param localidades: Localidades ('BR' ou ID).
+        :param sexos: Sexos ('M', 'F' ou '-').
+        :param decadas: Décadas (int ou None para todas as décadas).
+        :param idade_maxima: Idade máxima das linhas, em segundos, segundo 'atualizado_em'.
+        :param limite: Quantidade máxima de linhas (ORDER BY frequencia DESC LIMIT).
+        :param por_grupo: Se True, o limite vale para cada (localidade, sexo, decada), como no ranking da API.
+        :return: Lista de tuplas (nome, localidade, sexo, decada, frequencia), com a localidade como 'BR' ou ID
+            e a década como int ou None.
+        """
+        condicoes = []
+        parametros = []
+        for coluna, valores in (("nome", nomes),
+                                ("localidade", None if localidades is None else map(codigo_localidade, localidades)),
+                                ("sexo", sexos)):
+            if valores is not None:
+                condicoes.append(f"{coluna} = ANY(%s)")
+                parametros.append(list(valores))
+        if decadas is not None:
+            condicoes.append(self._condicao_decadas(decadas, parametros))
+        if idade_maxima is not None:
+            condicoes.append("atualizado_em >= now() - %s * INTERVAL '1 second'")
+            parametros.append(idade_maxima)
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        if limite is not None and por_grupo:
+            consulta = f'''
+            SELECT nome, localidade, sexo, decada, frequencia FROM (
+                SELECT nome, localidade, sexo, decada, frequencia, ROW_NUMBER() OVER (
+                    PARTITION BY localidade, sexo, decada ORDER BY frequencia DESC NULLS LAST, nome
+                ) AS posicao
+                FROM nomes {onde}
+            ) AS ranking
+            WHERE posicao <= %s
+            ORDER BY localidade, sexo, decada, posicao
+            '''
+            parametros.append(limite)
+        else:
+            consulta = f"SELECT nome, localidade, sexo, decada, frequencia FROM nomes {onde} " \
+                       f"ORDER BY frequencia DESC NULLS LAST, nome"
+            if limite is not None:
+                consulta += " LIMIT %s"
+                parametros.append(limite)
+        self.cursor.execute(consulta, tuple(parametros))
+        return [
+            (nome, localidade_do_codigo(localidade), sexo, decada, frequencia)
+            for nome, localidade, sexo, decada, frequencia in self.cursor.fetchall()
+        ]
+
+    @staticmethod
+    def _condicao_decadas(decadas, parametros):
+        """
+        Monta a condição SQL para uma lista de décadas em que None representa todas as décadas (NULL no banco),
+        acrescentando os valores a `parametros`.
+        """
+        decadas = list(decadas)
+        parametros.append([decada for decada in decadas if decada is not None])
+        parametros.append(None in decadas)
+        return "(decada = ANY(%s) OR (%s AND decada IS NULL))"
+
+    def buscar_atualizados(self, nomes, localidades, sexos, decadas, idade_maxima):
+        """
+        Busca as linhas de 'nomes' confirmadas pela API há no máximo `idade_maxima` segundos. Ver `buscar`.
+        """
+        return self.buscar(nomes, localidades, sexos, decadas, idade_maxima=idade_maxima)
+
+    def registrar_rankings(self, combinacoes):
+        """
+        Registra que o ranking geral de cada combinação foi consultado e gravado, permitindo servi-lo do banco.
+        :param combinacoes: Iterável de tuplas (localidade, sexo, decada).
+        """
+        dados = [(codigo_localidade(localidade), sexo, decada) for localidade, sexo, decada in combinacoes]
+        if not dados:
+            return
+        try:
+            psycopg2.extras.execute_values(self.cursor, '''
+            INSERT INTO consultas_ranking (localidade, sexo, decada) VALUES %s
+            ON CONFLICT (localidade, sexo, decada) DO UPDATE SET atualizado_em = now()
+            ''', dados)
+            self.connection.commit()
+        except Exception as e:
+            logging.error(f"Erro ao registrar consultas de ranking no PostgreSQL: {e}")
+            self.connection.rollback()
+
+    def registrar_nomes_sem_resultado(self, combinacoes):
+        """
+        Registra que a API não retornou nenhuma linha para cada nome na localidade e sexo, permitindo que o modo
+        incremental não o consulte de novo enquanto o registro for recente.
+        :param combinacoes: Iterável de tuplas (nome normalizado, localidade, sexo).
+        """
+        dados = list({(nome, codigo_localidade(localidade), sexo) for nome, localidade, sexo in combinacoes})
+        if not dados:
+            return
+        try:
+            psycopg2.extras.execute_values(self.cursor, '''
+            INSERT INTO nomes_sem_resultado (nome, localidade, sexo) VALUES %s
+            ON CONFLICT (nome, localidade, sexo) DO UPDATE SET atualizado_em = now()
+            ''', dados)
+            self.connection.commit()
+        except Exception as e:
+            logging.error(f"Erro ao registrar nomes sem resultado no PostgreSQL: {e}")
+            self.connection.rollback()
+
+    def nomes_sem_resultado_atualizados(self, nomes, localidades, sexos, idade_maxima):
+        """
+        Retorna os nomes registrados sem resultado na API há no máximo `idade_maxima` segundos.
+        :return: Conjunto de tuplas (nome, localidade, sexo).
+        """
+        self.cursor.execute('''
+        SELECT nome, localidade, sexo FROM nomes_sem_resultado
+        WHERE nome = ANY(%s) AND localidade = ANY(%s) AND sexo = ANY(%s)
+          AND atualizado_em >= now() - %s * INTERVAL '1 second'
+        ''', (list(nomes), [codigo_localidade(localidade) for localidade in localidades], list(sexos), idade_maxima))
+        return {(nome, localidade_do_codigo(localidade), sexo) for nome, localidade, sexo in self.cursor.fetchall()}
+
+    def rankings_atualizados(self, localidades, sexos, decadas, idade_maxima):
+        """
+        Retorna as combinações cujo ranking geral foi gravado há no máximo `idade_maxima` segundos.
+        :return: Conjunto de tuplas (localidade, sexo, decada), com a década como int ou None.
+        """
+        parametros = [[codigo_localidade(localidade) for localidade in localidades], list(sexos)]
+        condicao_decadas = self._condicao_decadas(decadas, parametros)
+        parametros.append(idade_maxima)
+        self.cursor.execute(f'''
+        SELECT localidade, sexo, decada FROM consultas_ranking
+        WHERE localidade = ANY(%s) AND sexo = ANY(%s) AND {condicao_decadas}
+          AND atualizado_em >= now() - %s * INTERVAL '1 second'
+        ''', tuple(parametros))
+        return {(localidade_do_codigo(localidade), sexo, decada) for localidade, sexo, decada in self.cursor.fetchall()}
+
+    def particionar_por_localidade(self):
+        """
+        Converte a tabela 'nomes' em uma tabela particionada por lista de localidade, com uma partição para o Brasil,
+        uma para cada região e estado e uma partição padrão. Consultas e gravações de uma localidade passam a tocar
+        apenas a sua partição. A operação copia todas as linhas e é feita em uma única transação.
+
+        Tabelas particionadas não aceitam chave primária sem a coluna de partição, por isso a tabela convertida
+        mantém a coluna 'id' (com a mesma sequência) e usa a chave única (nome, localidade, sexo, decada).
+        :return: True se a tabela foi convertida, False se ela já era particionada.
+        """
+        self.cursor.execute("SELECT pg_advisory_xact_lock(%s)", (CHAVE_TRAVA_MIGRACOES,))
+        self.cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'nomes'::regclass")
+        if self.cursor.fetchone()[0] == "p":
+            self.connection.rollback()
+            return False
+        comandos = ['''
+        CREATE TABLE nomes_particionada (
+            id INTEGER NOT NULL DEFAULT nextval('nomes_id_seq'),
+            nome VARCHAR(100),
+            localidade SMALLINT,
+            sexo VARCHAR(10),
+            decada SMALLINT,
+            frequencia INTEGER,
+            atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+            CONSTRAINT nomes_particionada_chave UNIQUE NULLS NOT DISTINCT (nome, localidade, sexo, decada)
+        ) PARTITION BY LIST (localidade)
+        ''']
+        for codigo in [CODIGO_BRASIL] + list(REGIOES) + list(ESTADOS):
+            comandos.append(f"CREATE TABLE nomes_l{codigo} PARTITION OF nomes_particionada FOR VALUES IN ({codigo})")
+        comandos += [
+            "CREATE TABLE nomes_outras PARTITION OF nomes_particionada DEFAULT",
+            '''INSERT INTO nomes_particionada (id, nome, localidade, sexo, decada, frequencia, atualizado_em)
+            SELECT id, nome, localidade, sexo, decada, frequencia, atualizado_em FROM nomes''',
+            "ALTER SEQUENCE nomes_id_seq OWNED BY nomes_particionada.id",
+            "DROP TABLE nomes",
+            "ALTER TABLE nomes_particionada RENAME TO nomes",
+            "ALTER TABLE nomes RENAME CONSTRAINT nomes_particionada_chave TO nomes_chave",
+            "CREATE INDEX nomes_ranking_idx ON nomes (localidade, sexo, decada, frequencia DESC)",
+        ]
+        try:
+            for comando in comandos:
+                self.cursor.execute(comando)
+            self.connection.commit()
+        except Exception as e:
+            logging.error(f"Erro ao particionar a tabela nomes: {e}")
+            self.connection.rollback()
+            raise
+        return True
+
+    @staticmethod
+    def _linha_copy(valores):
+        """
+        Formata uma linha no formato texto do COPY, escapando os caracteres especiais e representando None como \\N.
+        """
+        campos = []
+        for valor in valores:
+            if valor is None:
+                campos.append("\\N")
+            else:
+                campos.append(
+                    str(valor).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+                )
+        return "\t".join(campos) + "\n"
 
     def close(self):
         """
@@ -67,3 +457,147 @@ class Postgre:
         """
         self.cursor.close()
         self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.close()
+
+
+class PoolPostgre:
+    """
+    Pool de conexões com o PostgreSQL, seguro para uso por várias threads.
+
+    Cada escritor obtém uma sessão (`with pool.sessao() as postgre:`), que empresta uma conexão do pool
+    apenas pelo tempo necessário para gravar seu lote e a devolve em seguida. O esquema é verificado
+    uma única vez por processo para cada banco, na criação do primeiro pool.
+
+    Atributos:
+        pool (psycopg2.pool.ThreadedConnectionPool): Pool de conexões subjacente.
+        max_conexoes (int): Número máximo de conexões abertas ao mesmo tempo.
+    """
+
+    def __init__(self, host, port, database, user, password, min_conexoes=1, max_conexoes=10):
+        """
+        Cria o pool de conexões e garante que o esquema esteja atualizado.
+        :param min_conexoes: Quantidade de conexões ociosas mantidas abertas no pool.
+        :param max_conexoes: Quantidade máxima de conexões abertas ao mesmo tempo.
+        """
+        try:
+            self.pool = psycopg2.pool.ThreadedConnectionPool(
+                min_conexoes,
+                max_conexoes,
+                host=host,
+                port=port,
+                database=database,
+                user=user,
+                password=password
+            )
+        except Exception as e:
+            logging.error(f"Erro ao conectar ao banco de dados PostgreSQL: {e}")
+            raise
+        self.max_conexoes = max_conexoes
+        # O ThreadedConnectionPool falha quando esgotado; o semáforo faz os escritores excedentes aguardarem.
+        self._vagas = threading.BoundedSemaphore(max_conexoes)
+
+        chave = (host, port, database)
+        with _trava_esquemas:
+            if chave not in _esquemas_verificados:
+                with self.sessao() as postgre:
+                    postgre.create_table()
+                _esquemas_verificados.add(chave)
+
+    @contextmanager
+    def sessao(self):
+        """
+        Empresta uma conexão do pool, aguardando se todas estiverem em uso.
+        Em caso de exceção, a transação em aberto é desfeita antes de a conexão voltar ao pool.
+        :return: Instância de Postgre associada à conexão emprestada.
+        """
+        with metricas.cronometrar("espera_conexao"):
+            self._vagas.acquire()
+        try:
+            connection = self.pool.getconn()
+            try:
+                postgre = Postgre.de_conexao(connection)
+                try:
+                    yield postgre
+                except Exception:
+                    connection.rollback()
+                    raise
+                finally:
+                    postgre.cursor.close()
+            finally:
+                self.pool.putconn(connection)
+        finally:
+            self._vagas.release()
+
+    def insert_data(self, items):
+        """
+        Insere uma lista de objetos Item usando uma conexão do pool. Ver `Postgre.insert_data`.
+        """
+        with self.sessao() as postgre:
+            postgre.insert_data(items)
+
+    def upsert_data(self, items, tamanho_lote=50000, levantar=False):
+        """
+        Grava objetos Item usando uma conexão do pool. Ver `Postgre.upsert_data`.
+        """
+        with self.sessao() as postgre:
+            return postgre.upsert_data(items, tamanho_lote, levantar)
+
+    def buscar(self, *args, **kwargs):
+        """
+        Consulta a tabela 'nomes' usando uma conexão do pool. Ver `Postgre.buscar`.
+        """
+        with self.sessao() as postgre:
+            return postgre.buscar(*args, **kwargs)
+
+    def buscar_atualizados(self, nomes, localidades, sexos, decadas, idade_maxima):
+        """
+        Busca linhas recentes usando uma conexão do pool. Ver `Postgre.buscar_atualizados`.
+        """
+        with self.sessao() as postgre:
+            return postgre.buscar_atualizados(nomes, localidades, sexos, decadas, idade_maxima)
+
+    def registrar_rankings(self, combinacoes):
+        """
+        Registra consultas de ranking usando uma conexão do pool. Ver `Postgre.registrar_rankings`.
+        """
+        with self.sessao() as postgre:
+            postgre.registrar_rankings(combinacoes)
+
+    def registrar_nomes_sem_resultado(self, combinacoes):
+        """
+        Registra nomes sem resultado usando uma conexão do pool. Ver `Postgre.registrar_nomes_sem_resultado`.
+        """
+        with self.sessao() as postgre:
+            postgre.registrar_nomes_sem_resultado(combinacoes)
+
+    def nomes_sem_resultado_atualizados(self, nomes, localidades, sexos, idade_maxima):
+        """
+        Consulta os nomes registrados sem resultado usando uma conexão do pool.
+        Ver `Postgre.nomes_sem_resultado_atualizados`.
+        """
+        with self.sessao() as postgre:
+            return postgre.nomes_sem_resultado_atualizados(nomes, localidades, sexos, idade_maxima)
+
+    def rankings_atualizados(self, localidades, sexos, decadas, idade_maxima):
+        """
+        Consulta os rankings gravados recentemente usando uma conexão do pool. Ver `Postgre.rankings_atualizados`.
+        """
+        with self.sessao() as postgre:
+            return postgre.rankings_atualizados(localidades, sexos, decadas, idade_maxima)
+
+    def close(self):
+        """
+        Encerra todas as conexões do pool.
+        """
+        self.pool.closeall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.close()
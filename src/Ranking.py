@@ -1,4 +1,129 @@
-import json
+import heapq
+import sys
+from collections.abc import Sequence
+
+from src.Item import Item, ItemBatch
+from src.Metricas import metricas
+from src.Saida import EscritorTabela, escrever_ranking
+
+
+class TopK:
+    """
+    Seleção incremental dos k maiores itens de um fluxo, opcionalmente por grupo (ex: top 20 por UF e década).
+
+    Cada grupo mantém um heap mínimo limitado a `k + deslocamento` entradas, de modo que cada item custa
+    O(log k) e a memória é O(k) por grupo, independentemente de quantos itens passam pelo fluxo.
+    Em empates, o item adicionado primeiro vence, como na ordenação estável de `Ranking.ordenar_ranking`.
+
+    Atributos:
+        k (int): Quantidade de itens retornados por grupo (tamanho da página).
+        por (str): Atributo do `Item` usado na ordenação decrescente (ex: 'frequencia').
+        agrupar_por (tuple of str): Atributos do `Item` que definem os grupos. Vazio para um único grupo.
+        deslocamento (int): Quantidade de itens do topo ignorados em cada grupo (início da página).
+    """
+
+    def __init__(self, k, por="frequencia", agrupar_por=None, deslocamento=0):
+        """
+        Inicializa uma seleção vazia.
+
+        Args:
+            k (int): Quantidade de itens por grupo.
+            por (str, opcional): Atributo usado na ordenação decrescente. Padrão é 'frequencia'.
+            agrupar_por (str ou list of str, opcional): Atributo(s) que definem os grupos (ex: 'localidade').
+            deslocamento (int, opcional): Itens do topo ignorados em cada grupo, para paginação. Padrão é 0.
+
+        Raises:
+            ValueError: Se `k` for menor que 1 ou `deslocamento` for negativo.
+        """
+        if k < 1 or deslocamento < 0:
+            raise ValueError("O top-k exige k >= 1 e deslocamento >= 0.")
+        if agrupar_por is None:
+            agrupar_por = ()
+        elif isinstance(agrupar_por, str):
+            agrupar_por = (agrupar_por,)
+        self.k = k
+        self.por = por
+        self.agrupar_por = tuple(agrupar_por)
+        self.deslocamento = deslocamento
+        self._capacidade = k + deslocamento
+        self._heaps = {}
+        self._sequencia = 0
+
+    def adicionar(self, item):
+        """
+        Considera um item para a seleção, descartando-o se não estiver entre os maiores do seu grupo.
+
+        Args:
+            item (Item): Item a ser considerado. Itens sem valor no atributo `por` ficam abaixo de todos os demais.
+        """
+        valor = getattr(item, self.por)
+        entrada = ((valor is not None, 0 if valor is None else valor), -self._sequencia, item)
+        self._sequencia += 1
+        grupo = tuple(self._valor_grupo(getattr(item, atributo)) for atributo in self.agrupar_por)
+        heap = self._heaps.get(grupo)
+        if heap is None:
+            heap = self._heaps[grupo] = []
+        if len(heap) < self._capacidade:
+            heapq.heappush(heap, entrada)
+        elif entrada > heap[0]:
+            heapq.heapreplace(heap, entrada)
+
+    def grupos(self):
+        """
+        Retorna a página selecionada de cada grupo.
+
+        Returns:
+            dict: Mapeamento da tupla de valores de `agrupar_por` para a lista de itens do grupo em ordem decrescente,
+            com os grupos na ordem em que apareceram pela primeira vez.
+        """
+        fim = self.deslocamento + self.k
+        return {grupo: [entrada[2] for entrada in sorted(heap, reverse=True)[self.deslocamento:fim]]
+                for grupo, heap in self._heaps.items()}
+
+    def resultado(self):
+        """
+        Retorna a página selecionada de todos os grupos em uma única lista.
+
+        Returns:
+            list of Item: Itens de cada grupo em ordem decrescente, grupo após grupo.
+        """
+        return [item for itens in self.grupos().values() for item in itens]
+
+    @staticmethod
+    def _valor_grupo(valor):
+        # Localidades em dicionário (formato da API de localidades) são agrupadas pela sigla.
+        return valor.get("sigla") if isinstance(valor, dict) else valor
+
+
+class VisaoItens(Sequence):
+    """
+    Visão somente leitura dos itens de um `Ranking`, reconstruídos a partir do lote colunar.
+
+    Os itens são `ItemSomenteLeitura`: a mesma visão devolve sempre os mesmos objetos, mas eles não podem ser
+    alterados, já que a alteração não chegaria ao lote. A visão é igual a qualquer sequência com os mesmos objetos.
+    """
+
+    __slots__ = ("_itens",)
+
+    def __init__(self, itens):
+        self._itens = tuple(itens)
+
+    def __getitem__(self, indice):
+        return self._itens[indice]
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __eq__(self, outro):
+        if isinstance(outro, Sequence) and not isinstance(outro, str):
+            return list(self._itens) == list(outro)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"VisaoItens({list(self._itens)!r})"
+
 
 class Ranking:
     """
@@ -6,15 +131,41 @@ class Ranking:
     Fornece funcionalidades para adicionar itens ao ranking, ordenar o ranking com base na frequência dos nomes
     e exibir os resultados formatados no console.
 
+    Os itens são armazenados em formato colunar (`ItemBatch`), e os objetos `Item` só são
+    reconstruídos quando o atributo `itens` é acessado. Com `top` definido, o ranking guarda apenas os
+    maiores itens à medida que eles chegam (`TopK`), em vez de todos.
+
     Atributos:
-        itens (list of Item): Lista que armazena os itens adicionados ao ranking.
+        lote (ItemBatch): Armazenamento colunar dos itens do ranking.
+        itens (VisaoItens): Visão somente leitura dos itens do ranking, na ordem atual.
+        selecao (TopK ou None): Seleção incremental dos maiores itens, quando o ranking é limitado a um top-k.
     """
 
-    def __init__(self):
+    def __init__(self, top=None, por="frequencia", agrupar_por=None, deslocamento=0):
+        """
+        Inicializa uma instância da classe Ranking, criando um lote vazio para armazenar os itens do ranking.
+
+        Args:
+            top (int, opcional): Se definido, mantém apenas os `top` maiores itens (por grupo). Se None, mantém todos.
+            por (str, opcional): Atributo usado para escolher os maiores itens. Padrão é 'frequencia'.
+            agrupar_por (str ou list of str, opcional): Atributo(s) para um top-k por grupo (ex: 'localidade').
+            deslocamento (int, opcional): Itens do topo ignorados em cada grupo, para paginação. Padrão é 0.
+        """
+        self.lote = ItemBatch()
+        self._itens = None
+        self.selecao = TopK(top, por, agrupar_por, deslocamento) if top is not None else None
+        self._selecao_pendente = False
+
+    @property
+    def itens(self):
         """
-        Inicializa uma instância da classe Ranking, criando uma lista vazia para armazenar os itens do ranking.
+        Visão somente leitura dos itens do ranking, reconstruída a partir do lote colunar e reaproveitada
+        (com os mesmos objetos) até a próxima alteração do ranking. Para mudar um item, adicione um novo.
         """
-        self.itens = []
+        self._sincronizar_selecao()
+        if self._itens is None:
+            self._itens = VisaoItens(self.lote.item(indice, somente_leitura=True) for indice in range(len(self.lote)))
+        return self._itens
 
     def adicionar_item(self, item):
         """
@@ -23,29 +174,118 @@ class Ranking:
         Args:
             item (Item): Instância da classe `Item` a ser adicionada ao ranking.
         """
-        self.itens.append(item)
+        if self.selecao is not None:
+            self.selecao.adicionar(item)
+            self._selecao_pendente = True
+        else:
+            self.lote.adicionar(item)
+        self._itens = None
+
+    def carregar_do_banco(self, banco, nomes=None, localidades=None, sexos=None, decadas=None,
+                          limite=None, por_grupo=False, idade_maxima=None, grupos=None):
+        """
+        Adiciona ao ranking as linhas gravadas no banco, já em ordem decrescente de frequência.
+
+        Args:
+            banco (Postgre ou PoolPostgre): Banco consultado com `buscar`.
+            nomes, localidades, sexos, decadas (list, opcional): Filtros da consulta. None não filtra.
+            limite (int, opcional): Quantidade máxima de linhas (no total, ou por grupo com `por_grupo`).
+            por_grupo (bool, opcional): Se True, o limite vale para cada (localidade, sexo, década).
+            idade_maxima (float, opcional): Idade máxima das linhas, em segundos.
+            grupos (set of tuple, opcional): Se informado, apenas as linhas cujo (localidade, sexo, década)
+                está no conjunto são adicionadas. Útil quando os filtros por coluna selecionam grupos a mais.
+
+        Returns:
+            int: Quantidade de itens adicionados.
+        """
+        linhas = banco.buscar(nomes, localidades, sexos, decadas, idade_maxima=idade_maxima,
+                              limite=limite, por_grupo=por_grupo)
+        adicionados = 0
+        for nome, localidade, sexo, decada, frequencia in linhas:
+            if grupos is not None and (localidade, sexo, decada) not in grupos:
+                continue
+            self.adicionar_item(Item(nome=nome, localidade=localidade, sexo=sexo, decada=decada, frequencia=frequencia))
+            adicionados += 1
+        return adicionados
+
+    def top(self, k, por="frequencia", agrupar_por=None, deslocamento=0):
+        """
+        Retorna os `k` maiores itens do ranking sem ordená-lo por completo (O(n log k)).
+
+        Args:
+            k (int): Quantidade de itens por grupo.
+            por (str, opcional): Atributo usado na ordenação decrescente. Padrão é 'frequencia'.
+            agrupar_por (str ou list of str, opcional): Atributo(s) para um top-k por grupo
+                (ex: 'localidade', 'decada' ou 'sexo').
+            deslocamento (int, opcional): Itens do topo ignorados em cada grupo, para paginação. Padrão é 0.
+
+        Returns:
+            list of Item: Itens selecionados em ordem decrescente, grupo após grupo.
+
+        Exemplos:
+            - `ranking.top(20)` retorna os 20 nomes mais frequentes.
+            - `ranking.top(10, agrupar_por='localidade', deslocamento=10)` retorna a segunda página de 10 de cada UF.
+        """
+        self._sincronizar_selecao()
+        selecao = TopK(k, por, agrupar_por, deslocamento)
+        with metricas.cronometrar("ordenacao"):
+            for item in self.lote:
+                selecao.adicionar(item)
+        return selecao.resultado()
+
+    def _sincronizar_selecao(self):
+        """
+        Materializa no lote a seleção top-k acumulada desde a última consulta, já em ordem decrescente.
+        """
+        if self._selecao_pendente:
+            self.lote = ItemBatch.de_itens(self.selecao.resultado())
+            self._selecao_pendente = False
+            self._itens = None
 
     def ordenar_ranking(self):
         """
         Ordena os itens do ranking em ordem decrescente com base na frequência dos nomes.
 
-        A ordenação é feita in-place, modificando a lista `self.itens` diretamente.
+        A ordenação é feita diretamente sobre a coluna numérica de frequências e é estável:
+        itens com a mesma frequência mantêm a ordem em que foram adicionados.
+        Em um ranking limitado a um top-k, os itens já estão na ordem da seleção (grupo após grupo).
         """
-        self.itens.sort(key=lambda item: item.frequencia, reverse=True)
+        self._sincronizar_selecao()
+        if self.selecao is not None:
+            return
+        with metricas.cronometrar("ordenacao"):
+            self.lote = self.lote.ordenar()
+        self._itens = None
 
-    def exibir_ranking(self):
+    def exibir_ranking(self, saida=None):
         """
         Exibe o ranking formatado no console, mostrando as informações de cada item em colunas alinhadas.
 
+        As linhas são formatadas em blocos e escritas de uma vez (`EscritorTabela`), em vez de um `print` por item.
+
         O cabeçalho inclui as colunas:
             - Nome
             - Localidade
             - Sexo
             - Década
             - Frequência
+
+        Args:
+            saida (fluxo de texto, opcional): Destino da tabela. Se None, usa a saída padrão.
+        """
+        self._sincronizar_selecao()
+        EscritorTabela(saida or sys.stdout).escrever(self.lote)
+
+    def exportar(self, formato="tabela", caminho=None):
+        """
+        Escreve o ranking em um formato legível por outras ferramentas.
+
+        Args:
+            formato (str, opcional): 'tabela', 'csv', 'jsonl' ou 'parquet' (requer `pyarrow`). Padrão é 'tabela'.
+            caminho (str, opcional): Arquivo de destino. Se None, usa a saída padrão.
+
+        Returns:
+            int: Quantidade de linhas escritas.
         """
-        cabecalho = f"{'Nome':<15}{'Localidade':<15}{'Sexo':<15}{'Década':<15}{'Frequência'}"
-        print(cabecalho)
-        print('-' * len(cabecalho))
-        for item in self.itens:
-            print(item.exibir_informacoes())
+        self._sincronizar_selecao()
+        return escrever_ranking(self.lote, formato, caminho)
@@ -0,0 +1,237 @@
+import csv
+import importlib.util
+import json
+import sys
+from contextlib import contextmanager
+from itertools import islice
+
+from src.Item import ItemBatch
+
+# O pacote opcional `pyarrow` é pesado; ele só é importado quando um arquivo Parquet é de fato escrito.
+PYARROW_DISPONIVEL = importlib.util.find_spec("pyarrow") is not None
+
+COLUNAS = ("nome", "localidade", "sexo", "decada", "frequencia")
+
+
+def _linhas(fonte):
+    """
+    Percorre um `ItemBatch` ou uma sequência de `Item` como tuplas (nome, localidade, sexo, decada, frequencia).
+    Localidades em dicionário são representadas pela sigla.
+    """
+    if isinstance(fonte, ItemBatch):
+        yield from fonte.linhas()
+        return
+    for item in fonte:
+        localidade = item.localidade
+        if isinstance(localidade, dict):
+            localidade = localidade.get("sigla", "")
+        yield item.nome, localidade, item.sexo, item.decada, item.frequencia
+
+
+def _blocos(fonte, tamanho_bloco):
+    linhas = _linhas(fonte)
+    while True:
+        bloco = list(islice(linhas, tamanho_bloco))
+        if not bloco:
+            return
+        yield bloco
+
+
+class EscritorRanking:
+    """
+    Base dos escritores de ranking. As linhas são formatadas em blocos de `tamanho_bloco` e cada bloco
+    é enviado ao destino em uma única escrita, em vez de uma chamada de E/S por linha.
+
+    Atributos:
+        destino: Fluxo de saída (texto para tabela, CSV e JSON Lines; binário para Parquet).
+        tamanho_bloco (int): Quantidade de linhas formatadas por escrita.
+    """
+
+    binario = False
+    disponivel = True
+
+    def __init__(self, destino, tamanho_bloco=10000):
+        """
+        Inicializa o escritor.
+
+        Args:
+            destino: Fluxo de saída já aberto.
+            tamanho_bloco (int, opcional): Quantidade de linhas por escrita. Padrão é 10000.
+
+        Raises:
+            ValueError: Se `tamanho_bloco` for menor que 1.
+        """
+        if tamanho_bloco < 1:
+            raise ValueError("O bloco de escrita deve ter pelo menos uma linha.")
+        self.destino = destino
+        self.tamanho_bloco = tamanho_bloco
+
+    def escrever(self, fonte):
+        """
+        Escreve todas as linhas da fonte no destino.
+
+        Args:
+            fonte (ItemBatch ou iterable of Item): Itens do ranking, na ordem em que devem ser escritos.
+
+        Returns:
+            int: Quantidade de linhas escritas (sem contar cabeçalhos).
+        """
+        self._iniciar()
+        total = 0
+        for bloco in _blocos(fonte, self.tamanho_bloco):
+            self._escrever_bloco(bloco)
+            total += len(bloco)
+        self._finalizar()
+        return total
+
+    def _iniciar(self):
+        pass
+
+    def _escrever_bloco(self, bloco):
+        raise NotImplementedError
+
+    def _finalizar(self):
+        pass
+
+
+class EscritorTabela(EscritorRanking):
+    """
+    Tabela com colunas alinhadas, no mesmo formato de `Ranking.exibir_ranking` e `Item.exibir_informacoes`.
+    """
+
+    CABECALHO = f"{'Nome':<15}{'Localidade':<15}{'Sexo':<15}{'Década':<15}{'Frequência'}"
+    FORMATO_LINHA = "{:<18}{:<14}{:<13}{:<16}{}".format
+
+    def _iniciar(self):
+        self.destino.write(f"{self.CABECALHO}\n{'-' * len(self.CABECALHO)}\n")
+
+    def _escrever_bloco(self, bloco):
+        formatar = self.FORMATO_LINHA
+        self.destino.write("".join(
+            formatar(nome, localidade or "", sexo or "-", decada if decada else "Geral", frequencia) + "\n"
+            for nome, localidade, sexo, decada, frequencia in bloco
+        ))
+
+
+class EscritorCSV(EscritorRanking):
+    """
+    CSV com cabeçalho e uma coluna por campo. Linhas sem década têm a coluna 'decada' vazia.
+    """
+
+    def _iniciar(self):
+        self._csv = csv.writer(self.destino, lineterminator="\n")
+        self._csv.writerow(COLUNAS)
+
+    def _escrever_bloco(self, bloco):
+        self._csv.writerows(bloco)
+
+
+class EscritorJSONL(EscritorRanking):
+    """
+    JSON Lines: um objeto por linha, com as chaves de `COLUNAS`. Linhas sem década têm 'decada' nulo.
+    """
+
+    def _escrever_bloco(self, bloco):
+        serializar = json.dumps
+        self.destino.write("".join(
+            serializar(dict(zip(COLUNAS, linha)), ensure_ascii=False) + "\n" for linha in bloco
+        ))
+
+
+class EscritorParquet(EscritorRanking):
+    """
+    Arquivo Parquet com um grupo de linhas por bloco. Requer o pacote opcional `pyarrow`.
+    """
+
+    binario = True
+    disponivel = PYARROW_DISPONIVEL
+
+    def __init__(self, destino, tamanho_bloco=100000):
+        """
+        Inicializa o escritor. Ver `EscritorRanking`.
+
+        Raises:
+            ImportError: Se o pacote `pyarrow` não estiver instalado.
+        """
+        if not self.disponivel:
+            raise ImportError("O formato parquet requer o pacote opcional 'pyarrow'.")
+        super().__init__(destino, tamanho_bloco)
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pyarrow = pyarrow
+        self._esquema = pyarrow.schema([
+            ("nome", pyarrow.string()),
+            ("localidade", pyarrow.string()),
+            ("sexo", pyarrow.string()),
+            ("decada", pyarrow.int16()),
+            ("frequencia", pyarrow.int64()),
+        ])
+        self._escritor = None
+
+    def _iniciar(self):
+        self._escritor = self._pyarrow.parquet.ParquetWriter(self.destino, self._esquema)
+
+    def _escrever_bloco(self, bloco):
+        colunas = [list(coluna) for coluna in zip(*bloco)]
+        colunas[1] = [None if localidade is None else str(localidade) for localidade in colunas[1]]
+        self._escritor.write_table(self._pyarrow.Table.from_arrays(colunas, schema=self._esquema))
+
+    def _finalizar(self):
+        self._escritor.close()
+
+
+ESCRITORES = {
+    "tabela": EscritorTabela,
+    "csv": EscritorCSV,
+    "jsonl": EscritorJSONL,
+    "parquet": EscritorParquet,
+}
+
+
+@contextmanager
+def abrir_saida(caminho=None, binario=False):
+    """
+    Abre o destino de um escritor: o arquivo indicado, com buffer grande, ou a saída padrão.
+
+    Args:
+        caminho (str, opcional): Arquivo de destino. Se None ou '-', usa a saída padrão.
+        binario (bool, opcional): Se True, abre o destino em modo binário.
+    """
+    if caminho in (None, "-"):
+        yield sys.stdout.buffer if binario else sys.stdout
+        sys.stdout.flush()
+        return
+    if binario:
+        arquivo = open(caminho, "wb", buffering=1 << 20)
+    else:
+        arquivo = open(caminho, "w", encoding="utf-8", newline="", buffering=1 << 20)
+    with arquivo:
+        yield arquivo
+
+
+def escrever_ranking(fonte, formato="tabela", caminho=None, tamanho_bloco=None):
+    """
+    Escreve um ranking no formato e destino indicados.
+
+    Args:
+        fonte (ItemBatch ou iterable of Item): Itens do ranking, na ordem desejada.
+        formato (str, opcional): Uma das chaves de `ESCRITORES`. Padrão é 'tabela'.
+        caminho (str, opcional): Arquivo de destino. Se None, usa a saída padrão.
+        tamanho_bloco (int, opcional): Linhas por escrita. Se None, usa o padrão do escritor.
+
+    Returns:
+        int: Quantidade de linhas escritas.
+
+    Raises:
+        ValueError: Se o formato não for conhecido.
+        ImportError: Se o formato depender de um pacote opcional ausente.
+    """
+    classe = ESCRITORES.get(formato)
+    if classe is None:
+        raise ValueError(f"Formato de saída desconhecido: '{formato}'")
+    if not classe.disponivel:
+        raise ImportError(f"O formato {formato} requer um pacote opcional que não está instalado (pyarrow).")
+    with abrir_saida(caminho, classe.binario) as destino:
+        escritor = classe(destino) if tamanho_bloco is None else classe(destino, tamanho_bloco)
+        return escritor.escrever(fonte)
@@ -0,0 +1,555 @@
+"""
+Serviço HTTP de longa duração para consultas de ranking e de nomes, para outros serviços que hoje executam
+`python main.py` a cada consulta.
+
+Uso:
+    python -m src.Servidor --porta 8080
+    curl 'http://127.0.0.1:8080/ranking?local=SP,RJ&sexo=F&decada=1990&top=10'
+    curl 'http://127.0.0.1:8080/nomes?nomes=joão,maria&local=SP'
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from itertools import product
+from urllib.parse import parse_qs, urlsplit
+
+from main import Main
+from src.Cache import CacheRespostas
+from src.Decodificador import codificar
+from src.IBGE import AsyncRepositorioIBGE, RepositorioIBGE
+from src.Item import IndicePeriodos
+from src.Limitador import LimitadorAdaptativo
+from src.Localidades import buscar_localidade
+from src.Metricas import metricas
+from src.Normalizacao import IndiceNomes
+from src.Pipeline import PipelineRanking
+from src.Ranking import Ranking
+from src.Saida import COLUNAS
+
+# Parâmetros aceitos nas consultas, com os mesmos nomes das opções da linha de comando. Cada parâmetro pode
+# ser repetido ou receber vários valores separados por vírgula (ex: 'local=SP,RJ').
+PARAMETROS = ("nomes", "local", "sexo", "decada", "decada-range", "top", "agrupar-por", "deslocamento", "intervalo")
+AGRUPAMENTOS = ("localidade", "decada", "sexo")
+
+MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+           502: "Bad Gateway"}
+TAMANHO_MAXIMO_CABECALHO = 64 * 1024
+
+
+def _inteiro(valores, parametro):
+    if not valores.get(parametro):
+        return None
+    try:
+        valor = int(valores[parametro][-1])
+    except ValueError:
+        raise ValueError(f"O parâmetro '{parametro}' deve ser um número inteiro.")
+    if valor < 0:
+        raise ValueError(f"O parâmetro '{parametro}' não pode ser negativo.")
+    return valor
+
+
+def ler_parametros(consulta):
+    """
+    Valida a query string de uma consulta e a converte nos parâmetros usados pelo `Main`.
+
+    Ao contrário da linha de comando, valores inválidos não são substituídos por padrões: a consulta é recusada.
+
+    Args:
+        consulta (str): Query string (ex: 'nomes=ana,maria&local=SP&decada-range=1980:2000').
+
+    Returns:
+        dict: 'nomes' (grafias informadas), 'localidades' (IDs ou 'BR'), 'sexos', 'decadas' (None para o total),
+        'top', 'agrupar_por', 'deslocamento' e 'intervalos' (tuplas (inicio, fim) de anos, sem arredondar).
+
+    Raises:
+        ValueError: Se um parâmetro for desconhecido ou tiver valor inválido.
+    """
+    valores = {}
+    for parametro, lista in parse_qs(consulta).items():
+        if parametro not in PARAMETROS:
+            raise ValueError(f"Parâmetro desconhecido: '{parametro}'")
+        valores[parametro] = [parte.strip() for valor in lista for parte in valor.split(",") if parte.strip()]
+
+    localidades = []
+    for localidade in valores.get("local") or ["BR"]:
+        if localidade.upper() == "BR":
+            localidades.append("BR")
+            continue
+        info_localidade = buscar_localidade(localidade)
+        if not info_localidade:
+            raise ValueError(f"Localidade com ID ou sigla '{localidade}' não encontrada.")
+        localidades.append(str(info_localidade["id"]))
+
+    sexos = [sexo.upper() for sexo in valores.get("sexo") or ["-"]]
+    for sexo in sexos:
+        if sexo not in ("M", "F", "-"):
+            raise ValueError(f"A letra '{sexo}' não corresponde a nenhum sexo válido.")
+
+    decadas = []
+    try:
+        for decada in valores.get("decada", []):
+            decadas.append(int(decada) // 10 * 10)
+    except ValueError:
+        raise ValueError(f"Década inválida: '{decada}'")
+    for intervalo in valores.get("decada-range", []):
+        try:
+            inicio, fim = sorted(int(ano) // 10 * 10 for ano in intervalo.split(":"))
+        except ValueError:
+            raise ValueError(f"Intervalo de décadas inválido: '{intervalo}'")
+        decadas.extend(range(inicio, fim + 10, 10))
+    intervalos = []
+    for intervalo in valores.get("intervalo", []):
+        try:
+            intervalos.append(tuple(sorted(int(ano) for ano in intervalo.split(":"))))
+        except ValueError:
+            raise ValueError(f"Intervalo de anos inválido: '{intervalo}'")
+        if len(intervalos[-1]) != 2:
+            raise ValueError(f"Intervalo de anos inválido: '{intervalo}'")
+
+    agrupar_por = valores.get("agrupar-por") or None
+    for atributo in agrupar_por or []:
+        if atributo not in AGRUPAMENTOS:
+            raise ValueError(f"Não é possível agrupar por '{atributo}'; use {', '.join(AGRUPAMENTOS)}.")
+
+    return {
+        "nomes": valores.get("nomes", []),
+        "localidades": list(dict.fromkeys(localidades)),
+        "sexos": list(dict.fromkeys(sexos)),
+        "decadas": list(dict.fromkeys(decadas)) or [None],
+        "top": _inteiro(valores, "top"),
+        "agrupar_por": agrupar_por,
+        "deslocamento": _inteiro(valores, "deslocamento") or 0,
+        "intervalos": list(dict.fromkeys(intervalos))
+    }
+
+
+class ErroConsulta(Exception):
+    """
+    Falha ao obter da API do IBGE uma ou mais combinações de uma consulta.
+    """
+
+
+class CacheResultados:
+    """
+    Cache em memória dos resultados de consultas, com expiração e despejo LRU, que também coalesce consultas
+    idênticas em andamento: enquanto uma consulta é calculada, as requisições com a mesma chave aguardam
+    o mesmo cálculo em vez de repetir as chamadas à API.
+
+    Falhas não são guardadas; a próxima requisição com a mesma chave calcula o resultado de novo.
+
+    Atributos:
+        ttl (float): Segundos durante os quais um resultado é servido do cache.
+        max_entradas (int): Quantidade máxima de resultados guardados.
+    """
+
+    def __init__(self, ttl=60, max_entradas=1024):
+        """
+        Inicializa o cache vazio.
+
+        Args:
+            ttl (float, opcional): Validade de cada resultado, em segundos. Padrão é 60.
+            max_entradas (int, opcional): Resultados guardados antes de descartar os menos usados. Padrão é 1024.
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._em_andamento = {}
+
+    def __len__(self):
+        return len(self._entradas)
+
+    async def obter(self, chave, calcular):
+        """
+        Retorna o resultado guardado para `chave`, ou o calcula com `calcular()` (uma corrotina) e o guarda.
+
+        Args:
+            chave (hashable): Identificação da consulta.
+            calcular (callable): Função sem argumentos que retorna a corrotina que calcula o resultado.
+
+        Returns:
+            Resultado da consulta.
+
+        Raises:
+            Exception: A exceção levantada por `calcular`, repassada a todas as requisições que a aguardavam.
+        """
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            expira_em, resultado = entrada
+            if expira_em > time.monotonic():
+                self._entradas.move_to_end(chave)
+                metricas.incrementar("servidor_cache", resultado="acerto")
+                return resultado
+            del self._entradas[chave]
+
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is not None:
+            metricas.incrementar("servidor_cache", resultado="coalescida")
+        else:
+            metricas.incrementar("servidor_cache", resultado="falta")
+            tarefa = asyncio.ensure_future(calcular())
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda concluida: self._concluir(chave, concluida))
+        # A tarefa é protegida para que o cancelamento de uma requisição (cliente desconectado) não interrompa
+        # as demais que aguardam o mesmo resultado.
+        return await asyncio.shield(tarefa)
+
+    def _concluir(self, chave, tarefa):
+        self._em_andamento.pop(chave, None)
+        if tarefa.cancelled() or tarefa.exception() is not None:
+            return
+        self._entradas[chave] = (time.monotonic() + self.ttl, tarefa.result())
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def limpar(self):
+        """
+        Remove todos os resultados guardados. Cálculos em andamento não são afetados.
+        """
+        self._entradas.clear()
+
+
+class ServidorConsultas:
+    """
+    Servidor HTTP assíncrono (HTTP/1.1 com keep-alive) que responde às consultas da linha de comando sem
+    os custos de cada execução de `main.py`: o transporte HTTP compartilhado, o pool do banco e o cache
+    de respostas ficam abertos entre as requisições, e os resultados são guardados em um `CacheResultados`.
+
+    Rotas (somente GET, parâmetros como em `ler_parametros`):
+        /ranking: Ranking dos nomes (ou o ranking geral, sem 'nomes'), em ordem decrescente de frequência.
+            Resposta: {"itens": [{nome, localidade, sexo, decada, frequencia}, ...], "sem_resultado": [...]}.
+        /nomes: Frequência de cada nome informado, na grafia da consulta, na ordem das décadas pedidas.
+            'nomes' é obrigatório; 'top', 'agrupar-por' e 'deslocamento' são ignorados.
+            Resposta: {"nomes": {grafia: [{localidade, sexo, decada, frequencia}, ...]}, "sem_resultado": [...]}.
+            Com 'intervalo=YYYY:YYYY', a resposta inclui também a frequência somada em cada intervalo de anos:
+            {"intervalos": {grafia: [{localidade, sexo, inicio, fim, frequencia}, ...]}}.
+        /metricas: Métricas do processo no formato de texto do Prometheus.
+
+    Consultas à API que falharem respondem 502 e não são guardadas no cache.
+
+    Atributos:
+        main (Main): Instância usada para planejar, converter e gravar as consultas.
+        host (str): Endereço de escuta.
+        porta (int): Porta de escuta (a porta escolhida pelo sistema, se 0, depois de `iniciar`).
+        concorrencia (int): Número máximo de requisições simultâneas à API do IBGE, somando todas as consultas.
+        conexoes_banco (int): Conexões do pool do banco, todas mantidas abertas entre as requisições.
+        resultados (CacheResultados): Resultados das consultas recentes.
+        repositorio (AsyncRepositorioIBGE ou None): Repositório compartilhado pelas consultas, criado em `iniciar`.
+    """
+
+    def __init__(self, main=None, host="127.0.0.1", porta=8080, concorrencia=16, ttl=60, max_entradas=1024,
+                 conexoes_banco=4):
+        """
+        Inicializa o servidor, sem abrir conexões.
+
+        Args:
+            main (Main, opcional): Instância já configurada (cache, banco, `sem_banco`, limites). Se None, cria uma.
+            host (str, opcional): Endereço de escuta. Padrão é '127.0.0.1'.
+            porta (int, opcional): Porta de escuta. Se 0, uma porta livre é escolhida. Padrão é 8080.
+            concorrencia (int, opcional): Requisições simultâneas à API. Padrão é 16.
+            ttl (float, opcional): Validade dos resultados em memória, em segundos. Padrão é 60.
+            max_entradas (int, opcional): Resultados guardados em memória. Padrão é 1024.
+            conexoes_banco (int, opcional): Conexões do pool do banco, abertas em `iniciar`. Padrão é 4.
+                Ignorado se o pool de `main` já tiver sido criado.
+        """
+        self.main = main or Main()
+        self.host = host
+        self.porta = porta
+        self.concorrencia = concorrencia
+        self.conexoes_banco = conexoes_banco
+        self.resultados = CacheResultados(ttl=ttl, max_entradas=max_entradas)
+        self.repositorio = None
+        self._servidor = None
+
+    async def iniciar(self):
+        """
+        Abre o transporte HTTP e, se o banco for usado, o pool do banco com todas as `conexoes_banco` conexões
+        (aplicando as migrações uma única vez), e começa a aceitar conexões.
+        """
+        self.repositorio = AsyncRepositorioIBGE(
+            concorrencia=self.concorrencia,
+            repositorio=RepositorioIBGE(
+                tamanho_pool=self.concorrencia,
+                cache=self.main.cache,
+                url=self.main.repositorio_ibge.url,
+                limitador=LimitadorAdaptativo(
+                    taxa=self.main.taxa_maxima,
+                    concorrencia_maxima=self.concorrencia,
+                    latencia_alvo=self.main.latencia_alvo
+                ),
+                timeout=self.main.repositorio_ibge.timeout
+            )
+        )
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self.repositorio.repositorio.transporte)
+        if not self.main.sem_banco:
+            # Todas as conexões ficam abertas: com o mínimo padrão do `Main`, as sessões simultâneas das
+            # requisições abririam e fechariam conexões a cada gravação.
+            self.main.conexoes_banco = (self.conexoes_banco, self.conexoes_banco)
+            await loop.run_in_executor(None, lambda: self.main.postgre)
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta,
+                                                    limit=TAMANHO_MAXIMO_CABECALHO)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        logging.info(f"Servidor de consultas em http://{self.host}:{self.porta}/")
+
+    async def servir(self):
+        """
+        Inicia o servidor e atende requisições até ser cancelado, fechando os recursos ao final.
+        """
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.fechar()
+
+    async def fechar(self):
+        """
+        Para de aceitar conexões e fecha o executor, o pool do banco e o cache de respostas.
+        """
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        if self.repositorio is not None:
+            self.repositorio.fechar()
+            self.repositorio = None
+        self.main.fechar_banco()
+        if self.main.cache is not None:
+            self.main.cache.fechar()
+
+    async def _atender(self, leitor, escritor):
+        """
+        Atende as requisições de uma conexão, em sequência, até o cliente fechá-la ou pedir o fechamento.
+        """
+        try:
+            while True:
+                try:
+                    cabecalho = await leitor.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                try:
+                    metodo, alvo, versao = linhas[0].split(" ")
+                except ValueError:
+                    escritor.write(self._montar_resposta(400, {"erro": "Linha de requisição inválida."}, False))
+                    await escritor.drain()
+                    return
+                cabecalhos = {}
+                for linha in linhas[1:]:
+                    if ":" in linha:
+                        nome, valor = linha.split(":", 1)
+                        cabecalhos[nome.strip().lower()] = valor.strip()
+                try:
+                    tamanho_corpo = int(cabecalhos.get("content-length") or 0)
+                    if tamanho_corpo < 0:
+                        raise ValueError
+                except ValueError:
+                    # Sem um tamanho válido não é possível saber onde a próxima requisição começa.
+                    escritor.write(self._montar_resposta(400, {"erro": "Content-Length inválido."}, False))
+                    await escritor.drain()
+                    return
+                if tamanho_corpo:
+                    await leitor.readexactly(tamanho_corpo)
+                conexao = cabecalhos.get("connection", "").lower()
+                manter = conexao != "close" if versao == "HTTP/1.1" else conexao == "keep-alive"
+
+                status, corpo = await self.responder(metodo, alvo)
+                escritor.write(self._montar_resposta(status, corpo, manter))
+                await escritor.drain()
+                if not manter:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            escritor.close()
+
+    @staticmethod
+    def _montar_resposta(status, corpo, manter):
+        if isinstance(corpo, bytes):
+            tipo = "application/json; charset=utf-8"
+        elif isinstance(corpo, str):
+            corpo, tipo = corpo.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            corpo, tipo = codificar(corpo), "application/json; charset=utf-8"
+        return (f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}\r\n"
+                f"Content-Type: {tipo}\r\n"
+                f"Content-Length: {len(corpo)}\r\n"
+                f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n").encode("latin-1") + corpo
+
+    async def responder(self, metodo, alvo):
+        """
+        Responde a uma requisição, sem depender da conexão por onde ela chegou.
+
+        Args:
+            metodo (str): Método HTTP.
+            alvo (str): Caminho com a query string (ex: '/ranking?local=SP').
+
+        Returns:
+            tuple: (status, corpo), com o corpo em bytes (JSON já serializado), str (texto) ou dict (JSON).
+        """
+        inicio = time.perf_counter()
+        url = urlsplit(alvo)
+        rota = url.path.rstrip("/") or "/"
+        if rota not in ("/ranking", "/nomes", "/metricas"):
+            status, corpo = 404, {"erro": f"Rota não encontrada: '{url.path}'"}
+        elif metodo != "GET":
+            status, corpo = 405, {"erro": f"Método não permitido: '{metodo}'"}
+        elif rota == "/metricas":
+            status, corpo = 200, metricas.prometheus()
+        else:
+            try:
+                parametros = ler_parametros(url.query)
+                if rota == "/nomes" and not parametros["nomes"]:
+                    raise ValueError("Informe ao menos um nome em 'nomes'.")
+                resultado = await self.resultados.obter(
+                    self._chave(rota, parametros), lambda: self._consultar(rota, parametros))
+                status, corpo = 200, self._corpo(rota, parametros, resultado)
+            except ValueError as e:
+                status, corpo = 400, {"erro": str(e)}
+            except ErroConsulta as e:
+                status, corpo = 502, {"erro": str(e)}
+            except Exception as e:
+                logging.error(f"Erro ao responder '{alvo}': {e}")
+                status, corpo = 500, {"erro": "Erro interno ao processar a consulta."}
+        metricas.incrementar("servidor_requisicoes", rota=rota, status=status)
+        metricas.registrar_tempo("servidor_requisicao", time.perf_counter() - inicio, rota=rota)
+        return status, corpo
+
+    @staticmethod
+    def _chave(rota, parametros):
+        """
+        Chave do `CacheResultados` para uma consulta. No ranking, grafias de um mesmo nome compartilham a chave
+        (o resultado guardado usa os nomes canônicos; ver `_corpo`); em /nomes, as grafias fazem parte da resposta
+        e portanto da chave.
+        """
+        nomes = IndiceNomes(parametros["nomes"]).canonicos() if rota == "/ranking" else parametros["nomes"]
+        return (rota, tuple(nomes), tuple(parametros["localidades"]), tuple(parametros["sexos"]),
+                tuple(parametros["decadas"]), parametros["top"], tuple(parametros["agrupar_por"] or ()),
+                parametros["deslocamento"], tuple(parametros["intervalos"]) if rota == "/nomes" else ())
+
+    @staticmethod
+    def _corpo(rota, parametros, resultado):
+        """
+        Monta o corpo da resposta a partir do resultado guardado. No ranking, os nomes sem resultado são
+        devolvidos nas grafias desta requisição, que podem diferir das da requisição que calculou o resultado.
+        """
+        if rota != "/ranking":
+            return resultado
+        itens, sem_resultado = resultado
+        sem_resultado = IndiceNomes(parametros["nomes"]).expandir(sem_resultado)
+        return b'{"itens":' + itens + b',"sem_resultado":' + codificar(sem_resultado) + b'}'
+
+    async def _consultar(self, rota, parametros):
+        """
+        Consulta a API (ou o cache de respostas) para os parâmetros, como `Main.mult_ranking`, e serializa a resposta.
+        No ranking, retorna os itens já serializados e os nomes canônicos sem resultado, para que o resultado
+        possa ser compartilhado por grafias diferentes; em /nomes, retorna o corpo completo.
+
+        Raises:
+            ErroConsulta: Se alguma combinação falhar.
+        """
+        indice = IndiceNomes(parametros["nomes"])
+        decadas = parametros["decadas"]
+        lotes = self.main.planejador.planejar(indice.canonicos()) or [[None]]
+        combinacoes = []
+        for lote in lotes:
+            if len(lote) == 1 and lote[0] is None:
+                combinacoes.extend(product([lote], parametros["localidades"], parametros["sexos"], decadas))
+            else:
+                combinacoes.extend(product([lote], parametros["localidades"], parametros["sexos"], [None]))
+
+        if rota == "/ranking" and parametros["top"] is not None:
+            ranking = Ranking(top=parametros["top"], agrupar_por=parametros["agrupar_por"],
+                              deslocamento=parametros["deslocamento"])
+        else:
+            ranking = Ranking()
+        nomes_encontrados = set()
+        intervalos = parametros["intervalos"] if rota == "/nomes" else []
+        somas = {}
+
+        def registrar_resposta(combinacao, resposta):
+            lote, localidade, sexo, _ = combinacao
+            if len(lote) == 1 and lote[0] is None:
+                return
+            for nome, dado in self.main.planejador.mapear_resposta(lote, resposta).items():
+                if dado is None:
+                    continue
+                nomes_encontrados.add(nome)
+                if intervalos:
+                    periodos = IndicePeriodos(dado["res"])
+                    somas.setdefault(nome, []).extend(
+                        {"localidade": localidade, "sexo": sexo, "inicio": inicio, "fim": fim,
+                         "frequencia": periodos.intervalo(inicio, fim)} for inicio, fim in intervalos)
+
+        def converter(combinacao, resposta):
+            lote = combinacao[0]
+            if len(lote) == 1 and lote[0] is None:
+                return self.main.converter_resposta(combinacao, resposta)
+            return self.main.converter_resposta(combinacao, resposta, decadas)
+
+        pipeline = PipelineRanking(
+            self.repositorio,
+            converter=converter,
+            gravar=None if self.main.sem_banco else self.main.gravar_itens,
+            ao_item=ranking.adicionar_item,
+            ao_resposta=registrar_resposta
+        )
+        await pipeline.executar(combinacoes)
+        falhas = pipeline.falhas()
+        if falhas:
+            raise ErroConsulta(f"{len(falhas)} de {len(combinacoes)} consultas à API do IBGE falharam: {falhas[0][1]}")
+        canonicos_sem_resultado = [nome for nome in indice.canonicos() if nome not in nomes_encontrados]
+
+        if rota == "/ranking":
+            ranking.ordenar_ranking()
+            return codificar([dict(zip(COLUNAS, linha)) for linha in ranking.lote.linhas()]), canonicos_sem_resultado
+        por_nome = {}
+        for nome, localidade, sexo, decada, frequencia in ranking.lote.linhas():
+            por_nome.setdefault(nome, []).append(
+                {"localidade": localidade, "sexo": sexo, "decada": decada, "frequencia": frequencia})
+        corpo = {"nomes": indice.distribuir(por_nome), "sem_resultado": indice.expandir(canonicos_sem_resultado)}
+        if intervalos:
+            for linhas in somas.values():
+                linhas.sort(key=lambda linha: (linha["localidade"], linha["sexo"], linha["inicio"], linha["fim"]))
+            corpo["intervalos"] = indice.distribuir(somas)
+        return codificar(corpo)
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description="Serviço HTTP de consultas ao ranking de nomes do IBGE")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=8080, help="Porta de escuta (padrão: 8080)")
+    parser.add_argument("--concorrencia", type=int, default=16,
+                        help="Número máximo de requisições simultâneas à API, somando todas as consultas (padrão: 16)")
+    parser.add_argument("--taxa-maxima", type=float,
+                        help="Número máximo de requisições por segundo à API (padrão: sem limite)")
+    parser.add_argument("--ttl", type=float, default=60,
+                        help="Segundos durante os quais um resultado é servido da memória (padrão: 60)")
+    parser.add_argument("--max-resultados", type=int, default=1024,
+                        help="Quantidade máxima de resultados guardados em memória (padrão: 1024)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Não usa o cache local de respostas da API")
+    parser.add_argument("--sem-banco", action="store_true",
+                        help="Não grava no banco os resultados consultados na API")
+    parser.add_argument("--conexoes-banco", type=int, default=4,
+                        help="Conexões com o banco mantidas abertas entre as requisições (padrão: 4)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = argumentos()
+    main = Main()
+    main.sem_banco = args.sem_banco
+    main.taxa_maxima = args.taxa_maxima
+    if not args.sem_cache:
+        main.cache = CacheRespostas()
+        main.repositorio_ibge.cache = main.cache
+    servidor = ServidorConsultas(main, host=args.host, porta=args.porta, concorrencia=args.concorrencia,
+                                 ttl=args.ttl, max_entradas=args.max_resultados, conexoes_banco=args.conexoes_banco)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
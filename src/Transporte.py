@@ -0,0 +1,164 @@
+import os
+import threading
+
+# Tempos máximos, em segundos, para abrir a conexão (TCP + TLS) e para aguardar cada leitura da resposta.
+TIMEOUT_CONEXAO = 5.0
+TIMEOUT_LEITURA = 30.0
+
+
+class Transporte:
+    """
+    Camada de transporte HTTP das consultas à API do IBGE: uma `requests.Session` com pool de conexões
+    persistentes (keep-alive), respostas comprimidas (gzip) e tempos máximos de conexão e leitura
+    aplicados em todas as requisições.
+
+    Reaproveitar a mesma sessão evita um novo aperto de mão TCP/TLS a cada consulta. Por isso o processo
+    compartilha uma única instância (ver `Transporte.compartilhado`), usada por todos os `RepositorioIBGE`
+    que não recebem um transporte próprio. O `requests` só é importado ao criar o primeiro transporte.
+
+    Falhas de conexão e de leitura são repetidas pelo `Retry` do urllib3. Respostas 429/503 com `Retry-After`
+    também são, exceto com `repetir_sobrecarga=False`: nesse modo, usado pelos repositórios com
+    `LimitadorAdaptativo`, a sobrecarga chega a quem chamou e é tratada apenas pelo limitador.
+
+    Atributos:
+        sessao (requests.Session): Sessão HTTP com o adaptador montado para http e https.
+        tamanho_pool (int): Conexões mantidas abertas por host.
+        timeout (tuple): (segundos para conectar, segundos para cada leitura).
+        repetir_sobrecarga (bool): Se o `Retry` do urllib3 repete respostas de sobrecarga.
+    """
+
+    _compartilhados = {}
+    _pid_compartilhado = None
+    _trava_compartilhado = threading.Lock()
+
+    def __init__(self, tamanho_pool=10, timeout_conexao=TIMEOUT_CONEXAO, timeout_leitura=TIMEOUT_LEITURA,
+                 repetir_sobrecarga=True):
+        """
+        Inicializa o transporte.
+
+        Args:
+            tamanho_pool (int, opcional): Conexões mantidas abertas por host. Deve acompanhar a quantidade
+                de requisições simultâneas. Padrão é 10.
+            timeout_conexao (float, opcional): Segundos para estabelecer a conexão. Padrão é `TIMEOUT_CONEXAO`.
+            timeout_leitura (float, opcional): Segundos de espera por cada leitura. Padrão é `TIMEOUT_LEITURA`.
+            repetir_sobrecarga (bool, opcional): Se False, o urllib3 não repete respostas 429/503, deixando a
+                sobrecarga para o limitador de quem chamou. Padrão é True.
+
+        Raises:
+            ValueError: Se `tamanho_pool` for menor que 1.
+        """
+        import requests
+
+        if tamanho_pool < 1:
+            raise ValueError("O pool de conexões deve ter pelo menos uma conexão.")
+        self.sessao = requests.Session()
+        self.sessao.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        self.timeout = (timeout_conexao, timeout_leitura)
+        self.repetir_sobrecarga = repetir_sobrecarga
+        self.tamanho_pool = 0
+        self._trava = threading.Lock()
+        self.ajustar_pool(tamanho_pool)
+
+    @classmethod
+    def compartilhado(cls, tamanho_pool=10, repetir_sobrecarga=True):
+        """
+        Retorna o transporte compartilhado pelo processo, criando-o na primeira chamada. Há um transporte
+        compartilhado para cada valor de `repetir_sobrecarga`.
+
+        O pool só cresce: se `tamanho_pool` for maior que o atual, ele é ampliado. Em um processo filho
+        (por exemplo, um worker de `multiprocessing`), um novo transporte é criado, já que conexões
+        abertas não podem ser compartilhadas entre processos.
+
+        Args:
+            tamanho_pool (int, opcional): Conexões por host necessárias a quem chama. Padrão é 10.
+            repetir_sobrecarga (bool, opcional): Ver `Transporte.__init__`. Padrão é True.
+
+        Returns:
+            Transporte: Instância compartilhada.
+        """
+        with cls._trava_compartilhado:
+            if cls._pid_compartilhado != os.getpid():
+                cls._compartilhados = {}
+                cls._pid_compartilhado = os.getpid()
+            transporte = cls._compartilhados.get(repetir_sobrecarga)
+            if transporte is None:
+                transporte = cls._compartilhados[repetir_sobrecarga] = cls(
+                    tamanho_pool, repetir_sobrecarga=repetir_sobrecarga)
+            elif tamanho_pool > transporte.tamanho_pool:
+                transporte.ajustar_pool(tamanho_pool)
+            return transporte
+
+    @classmethod
+    def existente(cls, repetir_sobrecarga=True):
+        """
+        Retorna o transporte compartilhado pelo processo, ou None se ele ainda não tiver sido criado.
+        """
+        with cls._trava_compartilhado:
+            if cls._pid_compartilhado != os.getpid():
+                return None
+            return cls._compartilhados.get(repetir_sobrecarga)
+
+    def ajustar_pool(self, tamanho_pool):
+        """
+        Monta um novo adaptador com `tamanho_pool` conexões por host. As conexões abertas no adaptador
+        anterior são descartadas, por isso o ajuste deve ser feito antes de uma rodada de consultas.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+
+        with self._trava:
+            if tamanho_pool == self.tamanho_pool:
+                return
+            anterior = self.sessao.adapters.get("https://")
+            if self.repetir_sobrecarga:
+                repeticoes = Retry(total=3, backoff_factor=1)
+            else:
+                # Apenas falhas de conexão e de leitura; 429/503 (com ou sem Retry-After) voltam a quem chamou.
+                repeticoes = Retry(total=3, backoff_factor=1, status_forcelist=(), respect_retry_after_header=False)
+            adaptador = HTTPAdapter(
+                max_retries=repeticoes,
+                pool_connections=tamanho_pool,
+                pool_maxsize=tamanho_pool
+            )
+            self.sessao.mount("https://", adaptador)
+            self.sessao.mount("http://", adaptador)
+            self.tamanho_pool = tamanho_pool
+            if anterior is not None:
+                anterior.close()
+
+    def get(self, url, **kwargs):
+        """
+        Envia uma requisição GET pela sessão, aplicando `self.timeout` se nenhum tempo máximo for informado.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.sessao.get(url, **kwargs)
+
+    def estatisticas(self):
+        """
+        Retorna o reaproveitamento de conexões desde a criação (ou o último ajuste) do pool.
+
+        Returns:
+            dict: {'requisicoes', 'conexoes_novas', 'conexoes_reutilizadas'}. Cada conexão nova corresponde
+            a um aperto de mão TCP (e TLS, em https); as demais requisições reaproveitaram uma conexão aberta.
+        """
+        requisicoes = 0
+        conexoes_novas = 0
+        with self._trava:
+            for adaptador in {id(a): a for a in self.sessao.adapters.values()}.values():
+                pools = adaptador.poolmanager.pools
+                for chave in list(pools.keys()):
+                    pool = pools.get(chave)
+                    if pool is not None:
+                        requisicoes += pool.num_requests
+                        conexoes_novas += pool.num_connections
+        return {
+            "requisicoes": requisicoes,
+            "conexoes_novas": conexoes_novas,
+            "conexoes_reutilizadas": max(0, requisicoes - conexoes_novas)
+        }
+
+    def fechar(self):
+        """
+        Fecha todas as conexões abertas. O transporte continua utilizável, abrindo novas conexões sob demanda.
+        """
+        self.sessao.close()
@@ -0,0 +1,31 @@
+import asyncio
+
+
+class RepositorioFalso:
+    """
+    Repositório assíncrono simulado, compartilhado pelos testes do PipelineRanking e da IngestaoCompleta.
+
+    O ranking geral ([None]) devolve 'ANA' e 'JOSE', e a API de nomes uma linha da década de 1990 por nome,
+    após um pequeno atraso. Consultas a localidades em `falhar` levantam TimeoutError.
+
+    Atributos:
+        concorrencia (int): Consultas simultâneas permitidas, como em `AsyncRepositorioIBGE`.
+        falhar (iterable of str): Localidades cujas consultas falham.
+        consultas (list of tuple): Combinações (nomes, localidade, sexo, decada) consultadas, em ordem.
+    """
+
+    def __init__(self, concorrencia=4, falhar=()):
+        self.concorrencia = concorrencia
+        self.falhar = set(falhar)
+        self.consultas = []
+
+    async def obter_ranking(self, nomes, localidade, sexo, decada):
+        self.consultas.append((tuple(nomes), localidade, sexo, decada))
+        await asyncio.sleep(0.001)
+        if localidade in self.falhar:
+            raise TimeoutError("Timeout")
+        if nomes == [None]:
+            return [{"localidade": localidade, "sexo": sexo,
+                     "res": [{"nome": "ANA", "frequencia": 20, "ranking": 1},
+                             {"nome": "JOSE", "frequencia": 10, "ranking": 2}]}]
+        return [{"nome": nome.upper(), "res": [{"periodo": "[1990,2000[", "frequencia": 5}]} for nome in nomes]
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.Cache import CacheRespostas
+
+
+class TestCacheRespostas(unittest.TestCase):
+    """
+    Classe de testes para CacheRespostas, cobrindo as camadas em memória e em disco, TTL e despejo.
+    """
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.diretorio.cleanup)
+        self.caminho = os.path.join(self.diretorio.name, "cache.sqlite3")
+
+    def criar_cache(self, **kwargs):
+        cache = CacheRespostas(caminho=self.caminho, **kwargs)
+        self.addCleanup(cache.fechar)
+        return cache
+
+    def test_gerar_chave_normaliza_parametros(self):
+        """
+        Verifica se a chave ignora parâmetros None, a ordem dos parâmetros e a caixa dos valores.
+        """
+        chave1 = CacheRespostas.gerar_chave("v2/censos/nomes/Maria", {"sexo": "f", "localidade": 33, "decada": None})
+        chave2 = CacheRespostas.gerar_chave("v2/censos/nomes/Maria", {"localidade": "33", "sexo": "F"})
+        self.assertEqual(chave1, chave2)
+
+    def test_guardar_e_obter(self):
+        """
+        Testa se uma resposta armazenada é recuperada e se uma chave inexistente retorna None.
+        """
+        cache = self.criar_cache()
+        cache.guardar("v2/censos/nomes/Maria", {"sexo": "F"}, [{"nome": "MARIA"}])
+        self.assertEqual(cache.obter("v2/censos/nomes/Maria", {"sexo": "F"}), [{"nome": "MARIA"}])
+        self.assertIsNone(cache.obter("v2/censos/nomes/Maria", {"sexo": "M"}))
+
+    def test_persistencia_entre_instancias(self):
+        """
+        Testa se uma resposta gravada por uma instância é lida por outra usando o mesmo arquivo.
+        """
+        cache = self.criar_cache()
+        cache.guardar("v1/localidades/estados/SP", None, {"id": 35})
+        cache.fechar()
+        novo_cache = self.criar_cache()
+        self.assertEqual(novo_cache.obter("v1/localidades/estados/SP"), {"id": 35})
+
+    def test_ttl_por_endpoint(self):
+        """
+        Verifica se o TTL usa o prefixo de endpoint mais específico configurado.
+        """
+        cache = self.criar_cache(ttls={"v2/censos/nomes/ranking": 60}, ttl_padrao=10)
+        self.assertEqual(cache.ttl("https://x/api/v2/censos/nomes/ranking"), 60)
+        self.assertEqual(cache.ttl("https://x/api/v2/censos/nomes/Maria"), CacheRespostas.TTLS_PADRAO["v2/censos/nomes"])
+        self.assertEqual(cache.ttl("https://x/api/outro"), 10)
+
+    def test_entrada_expirada(self):
+        """
+        Testa se uma entrada expirada deixa de ser retornada, tanto em memória quanto em disco.
+        """
+        cache = self.criar_cache(ttl_padrao=60)
+        with patch('src.Cache.time.time', return_value=1000.0):
+            cache.guardar("outro", None, [1])
+        with patch('src.Cache.time.time', return_value=1059.0):
+            self.assertEqual(cache.obter("outro"), [1])
+        with patch('src.Cache.time.time', return_value=1061.0):
+            self.assertIsNone(cache.obter("outro"))
+        novo_cache = self.criar_cache(ttl_padrao=60)
+        self.assertIsNone(novo_cache.obter("outro"))
+
+    def test_despejo_por_tamanho(self):
+        """
+        Testa se as entradas acessadas há mais tempo são removidas quando o tamanho máximo é ultrapassado.
+        """
+        cache = self.criar_cache(tamanho_maximo=50, itens_memoria=1)
+        with patch('src.Cache.time.time', return_value=1.0):
+            cache.guardar("a", None, "x" * 20)
+        with patch('src.Cache.time.time', return_value=2.0):
+            cache.guardar("b", None, "y" * 20)
+        with patch('src.Cache.time.time', return_value=3.0):
+            cache.obter("a")
+        with patch('src.Cache.time.time', return_value=4.0):
+            cache.guardar("c", None, "z" * 20)
+        with patch('src.Cache.time.time', return_value=5.0):
+            self.assertIsNone(cache.obter("b"))
+            self.assertEqual(cache.obter("a"), "x" * 20)
+            self.assertEqual(cache.obter("c"), "z" * 20)
+
+    def test_limpar(self):
+        """
+        Testa se limpar remove todas as entradas.
+        """
+        cache = self.criar_cache()
+        cache.guardar("a", None, [1])
+        cache.limpar()
+        self.assertIsNone(cache.obter("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
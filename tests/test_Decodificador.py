@@ -0,0 +1,38 @@
+import importlib
+import sys
+import unittest
+from unittest.mock import patch
+import src.Decodificador
+from src.Decodificador import codificar, decodificar
+
+
+class TestDecodificador(unittest.TestCase):
+    """
+    Classe de testes para a camada de decodificação de JSON.
+    """
+
+    def test_ida_e_volta(self):
+        """
+        Testa se um payload no formato da API de nomes é serializado e decodificado sem perdas.
+        """
+        dados = [{"nome": "JOÃO", "localidade": "BR", "res": [{"periodo": "[1930,1940[", "frequencia": 123}]}]
+        conteudo = codificar(dados)
+        self.assertIsInstance(conteudo, bytes)
+        self.assertIn("JOÃO".encode("utf-8"), conteudo)
+        self.assertEqual(decodificar(conteudo), dados)
+        self.assertEqual(decodificar(conteudo.decode("utf-8")), dados)
+
+    def test_biblioteca_padrao_sem_opcionais(self):
+        """
+        Testa se, sem msgspec e orjson instalados, a biblioteca padrão é usada com o mesmo resultado.
+        """
+        self.addCleanup(importlib.reload, src.Decodificador)
+        with patch.dict(sys.modules, {"msgspec": None, "orjson": None}):
+            modulo = importlib.reload(src.Decodificador)
+        self.assertEqual(modulo.BIBLIOTECA, "json")
+        self.assertEqual(modulo.decodificar(modulo.codificar({"nome": "JOSÉ", "frequencia": 1})),
+                         {"nome": "JOSÉ", "frequencia": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,15 @@
+import json
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock
-from src.IBGE import RepositorioIBGE
+from src.IBGE import RepositorioIBGE, AsyncRepositorioIBGE
 import requests
 import requests.exceptions
 from urllib3.util import Retry
+from src.Metricas import metricas
+from src.Limitador import LimitadorAdaptativo
+from src.Transporte import TIMEOUT_CONEXAO, TIMEOUT_LEITURA
 
 
 class TestRepositorioIBGE(unittest.TestCase):
@@ -40,7 +46,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         url_resultante = repositorio.construir_API([None])
         self.assertEqual(url_resultante, url_esperada)
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_consumir_API_sucesso(self, mock_get):
         """
         Testa o método consumir_API em um cenário de sucesso, verificando se retorna o resultado esperado.
@@ -48,7 +54,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         repositorio = RepositorioIBGE()
         mock_response = Mock()
         expected_json = [{"nome": "João", "res": [{"periodo": "2000[", "frequencia": 1000}]}]
-        mock_response.json.return_value = expected_json
+        mock_response.content = json.dumps(expected_json).encode("utf-8")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -56,7 +62,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         self.assertEqual(resultado, expected_json)
         mock_get.assert_called_once()
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_consumir_API_http_error(self, mock_get):
         """
         Testa o método consumir_API quando ocorre um erro HTTP.
@@ -66,7 +72,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         with self.assertRaises(requests.exceptions.HTTPError):
             repositorio.consumir_API(nomes=["João"])
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_consumir_API_request_exception(self, mock_get):
         """
         Testa o método consumir_API quando ocorre uma exceção de requisição.
@@ -87,7 +93,7 @@ class TestRepositorioIBGE(unittest.TestCase):
 
         resultado = repositorio.obter_ranking(nome="Maria", sexo="F", decada=2000)
         self.assertEqual(resultado, expected_result)
-        mock_consumir_API.assert_called_once_with(["Maria"], None, "F", 2000)
+        mock_consumir_API.assert_called_once_with(["Maria"], None, "F", 2000, None)
 
     @patch('src.IBGE.RepositorioIBGE.consumir_API')
     def test_obter_ranking_sem_nome(self, mock_consumir_API):
@@ -100,9 +106,9 @@ class TestRepositorioIBGE(unittest.TestCase):
 
         resultado = repositorio.obter_ranking()
         self.assertEqual(resultado, expected_result)
-        mock_consumir_API.assert_called_once_with(None, None, None, None)
+        mock_consumir_API.assert_called_once_with(None, None, None, None, None)
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_obter_informacoes_estado_com_sigla(self, mock_get):
         """
         Testa o método obter_informacoes_estado fornecendo a sigla de um estado.
@@ -110,15 +116,16 @@ class TestRepositorioIBGE(unittest.TestCase):
         repositorio = RepositorioIBGE()
         mock_response = Mock()
         expected_json = {"id": 35, "nome": "São Paulo", "sigla": "SP"}
-        mock_response.json.return_value = expected_json
+        mock_response.content = json.dumps(expected_json).encode("utf-8")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
         resultado = repositorio.obter_informacoes_estado("SP")
         self.assertEqual(resultado, expected_json)
-        mock_get.assert_called_once_with("https://servicodados.ibge.gov.br/api/v1/localidades/estados/SP")
+        mock_get.assert_called_once_with("https://servicodados.ibge.gov.br/api/v1/localidades/estados/SP",
+                                         timeout=repositorio.transporte.timeout)
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_obter_informacoes_estado_com_id(self, mock_get):
         """
         Testa o método obter_informacoes_estado fornecendo o ID numérico de um estado.
@@ -126,15 +133,16 @@ class TestRepositorioIBGE(unittest.TestCase):
         repositorio = RepositorioIBGE()
         mock_response = Mock()
         expected_json = {"id": 33, "nome": "Rio de Janeiro", "sigla": "RJ"}
-        mock_response.json.return_value = expected_json
+        mock_response.content = json.dumps(expected_json).encode("utf-8")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
         resultado = repositorio.obter_informacoes_estado(33)
         self.assertEqual(resultado, expected_json)
-        mock_get.assert_called_once_with("https://servicodados.ibge.gov.br/api/v1/localidades/estados/33")
+        mock_get.assert_called_once_with("https://servicodados.ibge.gov.br/api/v1/localidades/estados/33",
+                                         timeout=repositorio.transporte.timeout)
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_obter_informacoes_estado_http_error(self, mock_get):
         """
         Testa o método obter_informacoes_estado quando ocorre um erro HTTP.
@@ -144,7 +152,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         with self.assertRaises(requests.exceptions.HTTPError):
             repositorio.obter_informacoes_estado("SP")
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_obter_informacoes_estado_request_exception(self, mock_get):
         """
         Testa o método obter_informacoes_estado quando ocorre uma exceção de requisição.
@@ -173,7 +181,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         url_resultante = repositorio.construir_API([None])
         self.assertEqual(url_resultante, url_esperada)
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_consumir_API_sem_parametros(self, mock_get):
         """
         Testa o método consumir_API sem parâmetros, verificando se retorna o resultado esperado.
@@ -181,7 +189,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         repositorio = RepositorioIBGE()
         mock_response = Mock()
         expected_json = [{"nome": "Ranking Geral", "res": [{"periodo": "2000[", "frequencia": 5000}]}]
-        mock_response.json.return_value = expected_json
+        mock_response.content = json.dumps(expected_json).encode("utf-8")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -189,7 +197,7 @@ class TestRepositorioIBGE(unittest.TestCase):
         self.assertEqual(resultado, expected_json)
         mock_get.assert_called_once()
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_consumir_API_parametros_none(self, mock_get):
         """
         Testa o método consumir_API com todos os parâmetros como None.
@@ -197,14 +205,14 @@ class TestRepositorioIBGE(unittest.TestCase):
         repositorio = RepositorioIBGE()
         mock_response = Mock()
         expected_json = [{"nome": "Ranking Geral", "res": [{"periodo": "2000[", "frequencia": 5000}]}]
-        mock_response.json.return_value = expected_json
+        mock_response.content = json.dumps(expected_json).encode("utf-8")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
         resultado = repositorio.consumir_API(nomes=[None], localidade=None, sexo=None, decada=None)
         self.assertEqual(resultado, expected_json)
         mock_get.assert_called_once()
 
-    @patch('src.IBGE.requests.Session.get')
+    @patch('requests.Session.get')
     def test_obter_informacoes_estado_parametro_invalido(self, mock_get):
         """
         Testa o método obter_informacoes_estado com um parâmetro inválido, esperando um erro HTTP.
@@ -216,10 +224,10 @@ class TestRepositorioIBGE(unittest.TestCase):
 
     def test_timeout_configurado(self):
         """
-        Verifica se o timeout da sessão está configurado corretamente.
+        Verifica se os tempos máximos de conexão e leitura do transporte estão configurados corretamente.
         """
         repositorio = RepositorioIBGE()
-        self.assertEqual(repositorio.sessao.timeout, 5)
+        self.assertEqual(repositorio.transporte.timeout, (TIMEOUT_CONEXAO, TIMEOUT_LEITURA))
 
     def test_url_base(self):
         """
@@ -238,6 +246,226 @@ class TestRepositorioIBGE(unittest.TestCase):
         self.assertEqual(adapter.max_retries.total, 3)
         self.assertEqual(adapter.max_retries.backoff_factor, 1)
 
+    @patch('requests.Session.get')
+    def test_consumir_API_com_cache(self, mock_get):
+        """
+        Testa se consumir_API armazena a resposta no cache e a reutiliza sem nova requisição.
+        """
+        cache = Mock()
+        cache.obter.return_value = None
+        repositorio = RepositorioIBGE(cache=cache)
+        mock_response = Mock()
+        expected_json = [{"nome": "JOAO", "res": []}]
+        mock_response.content = json.dumps(expected_json).encode("utf-8")
+        mock_get.return_value = mock_response
+
+        resultado = repositorio.consumir_API(nomes=["João"], localidade="33")
+        self.assertEqual(resultado, expected_json)
+        cache.guardar.assert_called_once_with(repositorio.construir_API(["João"]), {"localidade": "33"}, expected_json)
+
+        cache.obter.return_value = expected_json
+        self.assertEqual(repositorio.consumir_API(nomes=["João"], localidade="33"), expected_json)
+        mock_get.assert_called_once()
+
+    @patch('requests.Session.get')
+    def test_obter_informacoes_estado_com_cache(self, mock_get):
+        """
+        Testa se obter_informacoes_estado não vai à rede quando o estado está no cache.
+        """
+        cache = Mock()
+        cache.obter.return_value = {"id": 35, "sigla": "SP"}
+        repositorio = RepositorioIBGE(cache=cache)
+        self.assertEqual(repositorio.obter_informacoes_estado("sp"), {"id": 35, "sigla": "SP"})
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
+    def test_consumir_API_registra_metricas(self, mock_get):
+        """
+        Testa se consumir_API registra latência, código HTTP, bytes recebidos e acertos de cache.
+        """
+        metricas.zerar()
+        cache = Mock()
+        cache.obter.side_effect = [None, [{"nome": "JOAO", "res": []}]]
+        repositorio = RepositorioIBGE(cache=cache)
+        mock_response = Mock(status_code=200, content=b'[{"nome": "JOAO", "res": []}]')
+        mock_get.return_value = mock_response
+
+        repositorio.consumir_API(nomes=["João"])
+        repositorio.consumir_API(nomes=["João"])
+
+        self.assertEqual(metricas.tempo("requisicao", recurso="nomes")[0], 1)
+        self.assertEqual(metricas.contador("respostas", recurso="nomes", status=200), 1)
+        self.assertEqual(metricas.contador("bytes_recebidos", recurso="nomes"), len(mock_response.content))
+        self.assertEqual(metricas.contador("cache_falhas", recurso="nomes"), 1)
+        self.assertEqual(metricas.contador("cache_acertos", recurso="nomes"), 1)
+
+    @patch('src.IBGE.time.sleep')
+    @patch('requests.Session.get')
+    def test_consumir_API_repete_sobrecarga_com_limitador(self, mock_get, mock_sleep):
+        """
+        Testa se respostas 429 são repetidas com o limitador, que reduz a concorrência e respeita o Retry-After.
+        """
+        limitador = LimitadorAdaptativo(concorrencia_inicial=8, concorrencia_maxima=8)
+        repositorio = RepositorioIBGE(limitador=limitador)
+        sobrecarga = Mock(status_code=429, headers={"Retry-After": "0"})
+        sucesso = Mock(status_code=200, headers={})
+        sucesso.content = json.dumps([{"nome": "JOAO", "res": []}]).encode("utf-8")
+        mock_get.side_effect = [sobrecarga, sucesso]
+
+        self.assertEqual(repositorio.consumir_API(nomes=["João"]), [{"nome": "JOAO", "res": []}])
+        self.assertEqual(mock_get.call_count, 2)
+        mock_sleep.assert_called_once()
+        self.assertLess(limitador.limite, 8)
+        self.assertEqual(limitador.em_uso, 0)
+
+    @patch('src.IBGE.time.sleep')
+    @patch('requests.Session.get')
+    def test_consumir_API_sobrecarga_persistente(self, mock_get, mock_sleep):
+        """
+        Testa se, esgotadas as novas tentativas, o erro HTTP da última resposta é levantado.
+        """
+        repositorio = RepositorioIBGE(limitador=LimitadorAdaptativo(), tentativas_sobrecarga=2)
+        resposta = Mock(status_code=503, headers={})
+        resposta.raise_for_status.side_effect = requests.exceptions.HTTPError("503 Server Error")
+        mock_get.return_value = resposta
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            repositorio.consumir_API(nomes=["João"])
+        self.assertEqual(mock_get.call_count, 3)
+
+
+class TestAsyncRepositorioIBGE(unittest.TestCase):
+    """
+    Classe de teste para AsyncRepositorioIBGE.
+    """
+
+    def test_pool_dimensionado_pela_concorrencia(self):
+        """
+        Verifica se o pool de conexões do transporte compartilhado comporta a concorrência configurada.
+        """
+        repositorio = AsyncRepositorioIBGE(concorrencia=24)
+        adapter = repositorio.repositorio.sessao.get_adapter("https://")
+        self.assertGreaterEqual(adapter._pool_maxsize, 24)
+        self.assertIs(repositorio.repositorio.transporte, RepositorioIBGE().transporte)
+        repositorio.fechar()
+
+    def test_concorrencia_invalida(self):
+        """
+        Verifica se uma concorrência menor que 1 é rejeitada.
+        """
+        with self.assertRaises(ValueError):
+            AsyncRepositorioIBGE(concorrencia=0)
+
+    @patch('src.IBGE.RepositorioIBGE.consumir_API')
+    def test_executar_mantem_ordem_e_captura_excecoes(self, mock_consumir_API):
+        """
+        Testa se executar retorna as respostas na ordem das combinações, com as exceções no lugar das falhas.
+        """
+        def responder(nomes, localidade, sexo, decada, tentativa=None):
+            if localidade == "33":
+                raise requests.exceptions.HTTPError("HTTP Error")
+            return [{"nome": nomes[0], "localidade": localidade}]
+
+        mock_consumir_API.side_effect = responder
+        repositorio = AsyncRepositorioIBGE(concorrencia=2)
+        combinacoes = [(["Maria"], "35", "F", None), (["Maria"], "33", "F", None), (["Ana"], "BR", "-", 1990)]
+        respostas = repositorio.executar(combinacoes)
+        repositorio.fechar()
+
+        self.assertEqual(respostas[0], [{"nome": "Maria", "localidade": "35"}])
+        self.assertIsInstance(respostas[1], requests.exceptions.HTTPError)
+        self.assertEqual(respostas[2], [{"nome": "Ana", "localidade": "BR"}])
+        self.assertEqual(mock_consumir_API.call_count, 3)
+
+    def test_limite_de_concorrencia(self):
+        """
+        Verifica se nunca há mais requisições simultâneas do que a concorrência configurada.
+        """
+        import threading
+        import time
+        em_andamento = []
+        maximo = []
+        trava = threading.Lock()
+
+        def responder(*args, **kwargs):
+            with trava:
+                em_andamento.append(1)
+                maximo.append(len(em_andamento))
+            time.sleep(0.01)
+            with trava:
+                em_andamento.pop()
+            return []
+
+        repositorio = AsyncRepositorioIBGE(concorrencia=3)
+        with patch.object(repositorio.repositorio, 'obter_ranking', side_effect=responder):
+            repositorio.executar([([f"Nome{i}"], "BR", "-", None) for i in range(12)])
+        repositorio.fechar()
+        self.assertLessEqual(max(maximo), 3)
+
+
+
+class TestSobrecargaComLimitador(unittest.TestCase):
+    """
+    Testes contra um servidor local que sempre responde 429 com Retry-After.
+    """
+
+    def setUp(self):
+        self.requisicoes = 0
+        self.caminhos = []
+        teste = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                teste.requisicoes += 1
+                teste.caminhos.append(self.path.split("?")[0].rsplit("/", 1)[-1])
+                if self.path.split("?")[0].endswith("/Livre"):
+                    self.send_response(200)
+                    self.send_header("Content-Length", "2")
+                    self.end_headers()
+                    self.wfile.write(b"[]")
+                    return
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        self.url = f"http://127.0.0.1:{self.servidor.server_address[1]}/api/"
+
+    def test_sobrecarga_repetida_apenas_pelo_limitador(self):
+        """
+        Testa se, com limitador, cada tentativa do limitador é uma única requisição HTTP
+        (o urllib3 não repete a resposta 429 por conta própria).
+        """
+        repositorio = RepositorioIBGE(url=self.url, tentativas_sobrecarga=3,
+                                      limitador=LimitadorAdaptativo(espera_base=0.01))
+        with self.assertLogs(level="ERROR"), self.assertRaises(requests.exceptions.HTTPError):
+            repositorio.consumir_API(["Maria"])
+        self.assertEqual(self.requisicoes, 1 + 3)
+        self.assertFalse(repositorio.transporte.repetir_sobrecarga)
+
+    def test_espera_assincrona_nao_ocupa_vaga(self):
+        """
+        Testa se, no AsyncRepositorioIBGE, a espera entre as tentativas após sobrecarga devolve a vaga de
+        concorrência: com uma única vaga, outra consulta é atendida enquanto a primeira aguarda.
+        """
+        limitador = LimitadorAdaptativo()
+        repositorio = AsyncRepositorioIBGE(concorrencia=1, repositorio=RepositorioIBGE(
+            url=self.url, tentativas_sobrecarga=1, limitador=limitador))
+        with patch.object(limitador, "espera_nova_tentativa", return_value=0.3), self.assertLogs(level="ERROR"):
+            respostas = repositorio.executar([(["Maria"], None, None, None), (["Livre"], None, None, None)])
+        repositorio.fechar()
+
+        self.assertIsInstance(respostas[0], requests.exceptions.HTTPError)
+        self.assertEqual(respostas[1], [])
+        self.assertEqual(self.caminhos, ["Maria", "Livre", "Maria"])
+
 
 if __name__ == "__main__":
     unittest.main()
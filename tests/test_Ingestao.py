@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from main import Main
+from src.Ingestao import Checkpoint, IngestaoCompleta
+from src.Lotes import PlanejadorLotes
+from src.Postgre import Postgre
+from tests.auxiliares import RepositorioFalso
+
+
+class TestIngestaoCompleta(unittest.TestCase):
+    """
+    Classe de testes para a ingestão completa com checkpoint.
+    """
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.caminho = os.path.join(diretorio.name, "ingestao.jsonl")
+        self.gravados = []
+        self.registrados = []
+
+    def ingerir(self, repositorio, nomes_extras=()):
+        with Checkpoint(self.caminho) as checkpoint:
+            ingestao = IngestaoCompleta(repositorio, Main.converter_resposta, self.gravar, checkpoint,
+                                        PlanejadorLotes(), localidades=["BR", "35"], sexos=["-"], decadas=[None, 1990],
+                                        registrar_rankings=self.registrados.extend)
+            return ingestao.executar(nomes_extras)
+
+    def gravar(self, itens):
+        self.gravados.extend(itens)
+        return {"inseridos": len(itens)}
+
+    def test_percorre_rankings_e_nomes_descobertos(self):
+        """
+        Testa se os nomes descobertos nos rankings (e os extras) são consultados em cada localidade e sexo.
+        """
+        repositorio = RepositorioFalso()
+        resumo = self.ingerir(repositorio, nomes_extras=["Maria"])
+        self.assertEqual(resumo["falhas"], 0)
+        self.assertEqual(resumo["nomes"], 3)
+        self.assertEqual(len(repositorio.consultas), 4 + 2)
+        nomes_consultados = {(nome, localidade) for nomes, localidade, _, _ in repositorio.consultas
+                             for nome in nomes if nome is not None}
+        self.assertEqual(nomes_consultados, {(nome, localidade) for nome in ("ANA", "JOSE", "MARIA")
+                                             for localidade in ("BR", "35")})
+        self.assertEqual(resumo["inseridos"], len(self.gravados))
+        self.assertIn(("MARIA", "35", "-", 1990, 5),
+                      {(i.nome, i.localidade, i.sexo, i.decada, i.frequencia) for i in self.gravados})
+        self.assertCountEqual(self.registrados, [("BR", "-", None), ("BR", "-", 1990), ("35", "-", None),
+                                                 ("35", "-", 1990)])
+
+    def test_retoma_do_checkpoint(self):
+        """
+        Testa se uma nova execução repete apenas as consultas que falharam na anterior.
+        """
+        self.ingerir(RepositorioFalso(falhar={"35"}))
+        repositorio = RepositorioFalso()
+        resumo = self.ingerir(repositorio)
+        self.assertTrue(all(localidade == "35" for _, localidade, _, _ in repositorio.consultas))
+        self.assertEqual(len(repositorio.consultas), 2 + 1)
+        self.assertEqual(resumo["falhas"], 0)
+
+        repositorio = RepositorioFalso()
+        self.ingerir(repositorio)
+        self.assertEqual(repositorio.consultas, [])
+
+    def test_falha_de_gravacao_nao_vai_ao_checkpoint(self):
+        """
+        Testa se, quando o COPY do `Postgre.upsert_data` falha, as consultas contam como falhas e não são registradas
+        no checkpoint, sendo repetidas na próxima execução.
+        """
+        conexao = MagicMock()
+        conexao.cursor.return_value.copy_expert.side_effect = RuntimeError("conexão perdida")
+        postgre = Postgre.de_conexao(conexao)
+        self.gravar = lambda itens: postgre.upsert_data(itens, levantar=True)
+        with self.assertLogs(level="ERROR"):
+            resumo = self.ingerir(RepositorioFalso())
+        self.assertEqual(resumo["falhas"], 4)
+        self.assertEqual(resumo["itens"], 0)
+        conexao.rollback.assert_called()
+        conexao.commit.assert_not_called()
+        self.assertEqual(self.registrados, [])
+
+        del self.gravar
+        repositorio = RepositorioFalso()
+        self.ingerir(repositorio)
+        self.assertEqual(len([c for c in repositorio.consultas if c[0] == (None,)]), 4)
+
+    def test_checkpoint_ignora_linha_incompleta(self):
+        """
+        Testa se uma linha truncada por uma queda durante a escrita é ignorada na leitura do checkpoint.
+        """
+        with Checkpoint(self.caminho) as checkpoint:
+            checkpoint.registrar_ranking("BR", "-", None, ["ANA"])
+        with open(self.caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write('{"tipo": "nomes", "localidade": "BR"')
+        with self.assertLogs(level="WARNING"):
+            checkpoint = Checkpoint(self.caminho)
+        checkpoint.registrar_ranking("35", "-", None, [])
+        checkpoint.fechar()
+        checkpoint = Checkpoint(self.caminho)
+        checkpoint.fechar()
+        self.assertEqual(checkpoint.rankings_concluidos, {("BR", "-", None), ("35", "-", None)})
+        self.assertEqual(list(checkpoint.nomes_descobertos), ["ANA"])
+        self.assertEqual(checkpoint.nomes_concluidos, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
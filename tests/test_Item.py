@@ -1,5 +1,5 @@
 import unittest
-from src.Item import Item
+from src.Item import Item, ItemBatch, IndicePeriodos
 
 
 class TestItem(unittest.TestCase):
@@ -212,5 +212,145 @@ class TestItem(unittest.TestCase):
         chave_esperada = 'Ana_None_None_None'
         self.assertEqual(item.get_unique_key(), chave_esperada)
 
+    def test_item_sem_dict(self):
+        """
+        Verifica se o Item usa __slots__ e não aceita atributos arbitrários.
+        """
+        item = Item(nome='Ana', frequencia=500)
+        self.assertFalse(hasattr(item, '__dict__'))
+        with self.assertRaises(AttributeError):
+            item.outro = 1
+
+    def test_identidade_e_chave(self):
+        """
+        Testa se itens mutáveis são comparados por identidade e se chave() retorna a tupla da chave única.
+        """
+        item1 = Item(nome='Ana', sexo='F', localidade='35', decada=1990, frequencia=10)
+        item2 = Item(nome='Ana', sexo='F', localidade='35', decada=1990, frequencia=10)
+        self.assertNotEqual(item1, item2)
+        self.assertEqual(item1.chave(), item2.chave())
+        self.assertEqual(item1.chave(), ('Ana', '35', 'F', 1990))
+
+
+class TestIndicePeriodos(unittest.TestCase):
+    """
+    Suíte de testes para o índice de períodos da resposta da API.
+    """
+
+    def setUp(self):
+        self.indice = IndicePeriodos([
+            {"periodo": "[1950,1960[", "frequencia": 50},
+            {"periodo": "1930[", "frequencia": 5},
+            {"periodo": "[1930,1940[", "frequencia": 30},
+            {"periodo": "[1940,1950[", "frequencia": 40},
+            {"periodo": "[1970,1980[", "frequencia": 70},
+        ])
+
+    def test_periodos_ordenados_e_acumulados(self):
+        """
+        Verifica se os períodos são interpretados, ordenados e acumulados uma única vez.
+        """
+        self.assertEqual(self.indice.inicios, [1930, 1940, 1950, 1970])
+        self.assertEqual(self.indice.acumuladas, [0, 30, 70, 120, 190])
+        self.assertEqual(self.indice.limite_anterior, 1930)
+
+    def test_frequencia_por_decada(self):
+        """
+        Testa a consulta de uma década presente, ausente, anterior a 1930 e do total.
+        """
+        self.assertEqual(self.indice.frequencia(1940), 40)
+        self.assertEqual(self.indice.frequencia(1960), 0)
+        self.assertEqual(self.indice.frequencia(1910), 5)
+        self.assertEqual(self.indice.frequencia(None), 195)
+        self.assertEqual(self.indice.total(), 195)
+
+    def test_intervalo(self):
+        """
+        Testa a soma de intervalos de anos, abertos ou fechados, incluindo o período anterior a 1930.
+        """
+        self.assertEqual(self.indice.intervalo(1940, 1959), 90)
+        self.assertEqual(self.indice.intervalo(1945, 1970), 160)
+        self.assertEqual(self.indice.intervalo(1950), 120)
+        self.assertEqual(self.indice.intervalo(fim=1939), 35)
+        self.assertEqual(self.indice.intervalo(), 195)
+        self.assertEqual(self.indice.intervalo(1990, 2010), 0)
+
+    def test_item_com_indice(self):
+        """
+        Testa se um mesmo índice pode alimentar itens de várias décadas.
+        """
+        itens = [Item(nome='Ana', decada=decada, resposta_api=self.indice) for decada in (1930, 1970, None)]
+        self.assertEqual([item.frequencia for item in itens], [30, 70, 195])
+
+
+class TestItemBatch(unittest.TestCase):
+    """
+    Suíte de testes para a coleção colunar ItemBatch.
+    """
+
+    def setUp(self):
+        self.itens = [
+            Item(nome='ANA', sexo='F', localidade='35', decada=1990, frequencia=10),
+            Item(nome='JOSE', sexo='M', localidade='35', decada=None, frequencia=30),
+            Item(nome='ANA', sexo='F', localidade='33', decada=1990, frequencia=20),
+            Item(nome='ANA', sexo='F', localidade='35', decada=1990, frequencia=10),
+        ]
+        self.lote = ItemBatch.de_itens(self.itens)
+
+    @staticmethod
+    def valores(itens):
+        return [(item.chave(), item.frequencia) for item in itens]
+
+    def test_conversao_ida_e_volta(self):
+        """
+        Testa se a conversão de itens para o lote e de volta preserva todos os valores, inclusive década None.
+        """
+        self.assertEqual(len(self.lote), 4)
+        self.assertEqual(self.valores(self.lote.para_itens()), self.valores(self.itens))
+
+    def test_vocabulario_compartilhado(self):
+        """
+        Verifica se valores repetidos ocupam um único código no vocabulário.
+        """
+        self.assertEqual(list(self.lote.nomes), [0, 1, 0, 0])
+        self.assertEqual(list(self.lote.decadas), [1990, ItemBatch.SEM_DECADA, 1990, 1990])
+
+    def test_ordenar_estavel(self):
+        """
+        Testa a ordenação decrescente pela frequência, mantendo a ordem original nos empates.
+        """
+        ordenado = self.lote.ordenar()
+        self.assertEqual(list(ordenado.frequencias), [30, 20, 10, 10])
+        self.assertEqual(self.valores(ordenado.para_itens()),
+                         self.valores([self.itens[1], self.itens[2], self.itens[0], self.itens[3]]))
+        self.assertEqual(list(self.lote.ordenar(decrescente=False).frequencias), [10, 10, 20, 30])
+
+    def test_deduplicar(self):
+        """
+        Testa se linhas com a mesma chave são removidas, mantendo a primeira ocorrência.
+        """
+        self.assertEqual(self.valores(self.lote.deduplicar().para_itens()), self.valores(self.itens[:3]))
+
+    def test_filtrar(self):
+        """
+        Testa os filtros por coluna, combinados e por frequência mínima.
+        """
+        self.assertEqual(len(self.lote.filtrar(nome='ANA')), 3)
+        self.assertEqual(self.valores(self.lote.filtrar(nome='ANA', localidade='33').para_itens()),
+                         self.valores([self.itens[2]]))
+        self.assertEqual(len(self.lote.filtrar(decada=1990, frequencia_minima=15)), 1)
+        self.assertEqual(len(self.lote.filtrar(nome='INEXISTENTE')), 0)
+
+    def test_localidade_dicionario(self):
+        """
+        Verifica se uma localidade em dicionário é preservada nos itens e representada pela sigla nas linhas.
+        """
+        lote = ItemBatch.de_itens([Item(nome='Maria', localidade={'sigla': 'RJ', 'id': 33}, frequencia=1),
+                                   Item(nome='Ana', localidade={'id': 33, 'sigla': 'RJ'}, frequencia=2)])
+        self.assertEqual(lote.item(0).localidade, {'sigla': 'RJ', 'id': 33})
+        self.assertEqual(list(lote.localidades), [0, 0])
+        self.assertEqual([linha[1] for linha in lote.linhas()], ['RJ', 'RJ'])
+        self.assertEqual(len(lote.filtrar(localidade={'id': 33, 'sigla': 'RJ'})), 2)
+
 if __name__ == '__main__':
     unittest.main()
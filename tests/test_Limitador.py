@@ -0,0 +1,147 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from src.Limitador import LimitadorAdaptativo, interpretar_retry_after
+
+
+class TestInterpretarRetryAfter(unittest.TestCase):
+    """
+    Classe de testes para a leitura do cabeçalho Retry-After.
+    """
+
+    def test_segundos(self):
+        """
+        Testa a leitura do cabeçalho em segundos.
+        """
+        self.assertEqual(interpretar_retry_after("120"), 120.0)
+        self.assertEqual(interpretar_retry_after(" 1.5 "), 1.5)
+        self.assertEqual(interpretar_retry_after("-3"), 0.0)
+
+    def test_data_http(self):
+        """
+        Testa a leitura do cabeçalho como data HTTP.
+        """
+        agora = 1_700_000_000
+        data = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(agora + 30))
+        self.assertAlmostEqual(interpretar_retry_after(data, agora=agora), 30.0)
+
+    def test_ausente_ou_invalido(self):
+        """
+        Testa se cabeçalhos ausentes ou inválidos são ignorados.
+        """
+        self.assertIsNone(interpretar_retry_after(None))
+        self.assertIsNone(interpretar_retry_after(""))
+        self.assertIsNone(interpretar_retry_after("amanhã"))
+
+
+class TestLimitadorAdaptativo(unittest.TestCase):
+    """
+    Classe de testes para o limitador de taxa e concorrência adaptativa.
+    """
+
+    def test_parametros_invalidos(self):
+        """
+        Testa se parâmetros inconsistentes são rejeitados.
+        """
+        with self.assertRaises(ValueError):
+            LimitadorAdaptativo(concorrencia_minima=0)
+        with self.assertRaises(ValueError):
+            LimitadorAdaptativo(concorrencia_minima=4, concorrencia_maxima=2)
+        with self.assertRaises(ValueError):
+            LimitadorAdaptativo(taxa=0)
+        with self.assertRaises(ValueError):
+            LimitadorAdaptativo(fator_reducao=1)
+
+    def test_crescimento_aditivo(self):
+        """
+        Testa se o limite cresce cerca de uma vaga por janela de respostas saudáveis, até o máximo.
+        """
+        limitador = LimitadorAdaptativo(concorrencia_inicial=2, concorrencia_maxima=4, latencia_alvo=1.0)
+        for _ in range(2):
+            limitador.adquirir()
+            limitador.liberar(latencia=0.1)
+        self.assertAlmostEqual(limitador.limite, 2 + 1 / 2 + 1 / 2.5)
+        for _ in range(100):
+            limitador.adquirir()
+            limitador.liberar(latencia=0.1)
+        self.assertEqual(limitador.limite, 4)
+
+    def test_latencia_alta_nao_aumenta_limite(self):
+        """
+        Testa se respostas lentas mantêm o limite de concorrência.
+        """
+        limitador = LimitadorAdaptativo(concorrencia_inicial=2, concorrencia_maxima=4, latencia_alvo=1.0)
+        limitador.adquirir()
+        limitador.liberar(latencia=3.0)
+        self.assertEqual(limitador.limite, 2)
+
+    def test_reducao_multiplicativa_uma_vez_por_janela(self):
+        """
+        Testa se uma rajada de respostas de sobrecarga reduz o limite uma única vez, respeitando o mínimo.
+        """
+        limitador = LimitadorAdaptativo(concorrencia_inicial=8, concorrencia_maxima=8, latencia_alvo=60)
+        for _ in range(3):
+            limitador.adquirir()
+        for _ in range(3):
+            limitador.liberar(sobrecarga=True)
+        self.assertEqual(limitador.limite, 4)
+        self.assertEqual(limitador.em_uso, 0)
+
+        limitador = LimitadorAdaptativo(concorrencia_inicial=2, concorrencia_minima=2, latencia_alvo=0)
+        limitador.adquirir()
+        limitador.liberar(sobrecarga=True)
+        self.assertEqual(limitador.limite, 2)
+
+    def test_limite_de_concorrencia(self):
+        """
+        Testa se adquirir bloqueia enquanto todas as vagas estão em uso.
+        """
+        limitador = LimitadorAdaptativo(concorrencia_inicial=1, concorrencia_maxima=1)
+        limitador.adquirir()
+        liberado = threading.Event()
+
+        def segunda_requisicao():
+            limitador.adquirir()
+            liberado.set()
+
+        thread = threading.Thread(target=segunda_requisicao)
+        thread.start()
+        self.assertFalse(liberado.wait(0.1))
+        limitador.liberar(latencia=0.1)
+        self.assertTrue(liberado.wait(1))
+        thread.join()
+
+    def test_taxa_maxima(self):
+        """
+        Testa se o balde de fichas limita as requisições à taxa configurada após a rajada inicial.
+        """
+        limitador = LimitadorAdaptativo(taxa=50, rajada=1, concorrencia_maxima=10)
+        inicio = time.monotonic()
+        for _ in range(6):
+            limitador.adquirir()
+            limitador.liberar(latencia=0.01)
+        self.assertGreaterEqual(time.monotonic() - inicio, 5 / 50 * 0.9)
+
+    def test_retry_after_pausa_novas_requisicoes(self):
+        """
+        Testa se o Retry-After suspende as novas requisições pelo tempo pedido.
+        """
+        limitador = LimitadorAdaptativo(concorrencia_maxima=4)
+        limitador.adquirir()
+        limitador.liberar(sobrecarga=True, espera=0.1)
+        inicio = time.monotonic()
+        limitador.adquirir()
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.08)
+
+    @patch("src.Limitador.random.uniform", side_effect=lambda inferior, superior: superior)
+    def test_espera_nova_tentativa(self, mock_uniform):
+        """
+        Testa se a espera entre tentativas cresce exponencialmente até o máximo.
+        """
+        limitador = LimitadorAdaptativo(espera_base=0.5, espera_maxima=3)
+        self.assertEqual([limitador.espera_nova_tentativa(t) for t in range(1, 5)], [0.5, 1.0, 2.0, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import Mock
+from src.Localidades import (buscar_localidade, validar_tabela, codigo_localidade, localidade_do_codigo,
+                             ESTADOS, REGIOES, CODIGO_BRASIL)
+
+
+class TestLocalidades(unittest.TestCase):
+    """
+    Classe de testes para a tabela fixa de localidades.
+    """
+
+    def test_tabela_completa(self):
+        """
+        Verifica se a tabela contém os 27 estados e as 5 regiões.
+        """
+        self.assertEqual(len(ESTADOS), 27)
+        self.assertEqual(len(REGIOES), 5)
+
+    def test_buscar_por_sigla_id_e_nome(self):
+        """
+        Testa a busca de um estado por sigla (sem diferenciar maiúsculas), ID numérico, ID em texto e nome.
+        """
+        for chave in ("sp", "SP", 35, "35", "São Paulo", " são paulo "):
+            self.assertEqual(buscar_localidade(chave)["id"], 35)
+
+    def test_colisao_de_sigla_prioriza_estado(self):
+        """
+        Verifica se 'SE' resolve para Sergipe, e a região Sudeste continua acessível pelo ID e pelo nome.
+        """
+        self.assertEqual(buscar_localidade("SE")["nome"], "Sergipe")
+        self.assertEqual(buscar_localidade(3)["nome"], "Sudeste")
+        self.assertEqual(buscar_localidade("sudeste")["id"], 3)
+
+    def test_buscar_inexistente(self):
+        """
+        Testa se localidades inexistentes ou None retornam None.
+        """
+        self.assertIsNone(buscar_localidade("ZZ"))
+        self.assertIsNone(buscar_localidade(99))
+        self.assertIsNone(buscar_localidade(None))
+
+    def test_codigo_localidade(self):
+        """
+        Testa a conversão entre localidades e o código numérico gravado no banco.
+        """
+        self.assertEqual(codigo_localidade("BR"), CODIGO_BRASIL)
+        self.assertEqual(codigo_localidade(None), CODIGO_BRASIL)
+        self.assertEqual(codigo_localidade("sp"), 35)
+        self.assertEqual(codigo_localidade("35"), 35)
+        self.assertEqual(codigo_localidade(REGIOES[3]), 3)
+        with self.assertRaises(ValueError):
+            codigo_localidade("ZZ")
+        self.assertEqual(localidade_do_codigo(CODIGO_BRASIL), "BR")
+        self.assertEqual(localidade_do_codigo(35), "35")
+        self.assertIsNone(localidade_do_codigo(None))
+
+    def test_validar_tabela(self):
+        """
+        Testa se validar_tabela aponta apenas os estados divergentes ou que falharam na consulta.
+        """
+        repositorio = Mock()
+
+        def responder(id_estado):
+            if id_estado == 53:
+                raise Exception("Erro de rede")
+            estado = dict(ESTADOS[id_estado])
+            if id_estado == 11:
+                estado["nome"] = "Outro"
+            return estado
+
+        repositorio.obter_informacoes_estado.side_effect = responder
+        self.assertEqual(validar_tabela(repositorio), [11, 53])
+
+
+if __name__ == '__main__':
+    unittest.main()
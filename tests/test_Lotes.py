@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from urllib.parse import quote
+from src.Lotes import PlanejadorLotes, normalizar_chave, ler_arquivo_nomes
+
+
+class TestLotes(unittest.TestCase):
+    """
+    Classe de testes para o planejamento de lotes de nomes.
+    """
+
+    def test_normalizar_chave(self):
+        """
+        Verifica se a normalização remove acentos, espaços nas bordas e converte para maiúsculas.
+        """
+        self.assertEqual(normalizar_chave(" joão "), "JOAO")
+        self.assertEqual(normalizar_chave("Conceição"), "CONCEICAO")
+
+    def test_planejar_respeita_limite_de_url(self):
+        """
+        Testa se nenhum lote gera uma URL codificada maior que o limite e se todos os nomes são mantidos.
+        """
+        planejador = PlanejadorLotes(url_base="https://x/", limite_url=60)
+        nomes = [f"Nome{i}" for i in range(40)] + ["João"]
+        lotes = planejador.planejar(nomes)
+        for lote in lotes:
+            url = "https://x/" + quote("|".join(lote), safe="")
+            self.assertLessEqual(len(url), 60)
+        self.assertEqual([nome for lote in lotes for nome in lote], nomes)
+
+    def test_planejar_respeita_max_nomes(self):
+        """
+        Testa se cada lote contém no máximo `max_nomes` nomes.
+        """
+        planejador = PlanejadorLotes(max_nomes=3)
+        lotes = planejador.planejar(["A", "B", "C", "D", "E"])
+        self.assertEqual(lotes, [["A", "B", "C"], ["D", "E"]])
+
+    def test_planejar_remove_vazios_e_repetidos(self):
+        """
+        Testa se nomes vazios, None e repetidos após normalização são descartados.
+        """
+        planejador = PlanejadorLotes()
+        self.assertEqual(planejador.planejar(["João", None, "", "JOAO", "Maria"]), [["João", "Maria"]])
+        self.assertEqual(planejador.planejar([]), [])
+
+    def test_nome_maior_que_limite(self):
+        """
+        Testa se um nome que sozinho excede o limite forma um lote próprio.
+        """
+        planejador = PlanejadorLotes(url_base="https://x/", limite_url=15)
+        self.assertEqual(planejador.planejar(["Ana", "Bartolomeu", "Eva"]), [["Ana"], ["Bartolomeu"], ["Eva"]])
+
+    def test_mapear_resposta_e_nomes_ausentes(self):
+        """
+        Testa a associação das linhas da resposta aos nomes pedidos e a detecção de nomes sem resultado.
+        """
+        resposta = [{"nome": "JOAO", "res": []}, {"nome": "MARIA", "res": []}]
+        mapeamento = PlanejadorLotes.mapear_resposta(["João", "Maria", "Xyzw"], resposta)
+        self.assertEqual(mapeamento["João"]["nome"], "JOAO")
+        self.assertIsNone(mapeamento["Xyzw"])
+        self.assertEqual(PlanejadorLotes.nomes_ausentes(["João", "Xyzw"], resposta), ["Xyzw"])
+
+    def test_max_nomes_invalido(self):
+        """
+        Verifica se max_nomes menor que 1 é rejeitado.
+        """
+        with self.assertRaises(ValueError):
+            PlanejadorLotes(max_nomes=0)
+
+    def test_ler_arquivo_nomes(self):
+        """
+        Testa a leitura de um arquivo de nomes, ignorando linhas vazias e comentários.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as arquivo:
+            arquivo.write("João\n\n# comentário\n  Maria  \n")
+        self.addCleanup(os.remove, arquivo.name)
+        self.assertEqual(ler_arquivo_nomes(arquivo.name), ["João", "Maria"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+from src.Metricas import Metricas
+
+
+class TestMetricas(unittest.TestCase):
+    """
+    Classe de testes para o registro de métricas.
+    """
+
+    def test_contadores_por_rotulo(self):
+        """
+        Testa se contadores com rótulos diferentes são somados separadamente.
+        """
+        metricas = Metricas()
+        metricas.incrementar("respostas", status=200)
+        metricas.incrementar("respostas", status=200)
+        metricas.incrementar("respostas", status=503)
+        metricas.incrementar("bytes_recebidos", 120)
+        self.assertEqual(metricas.contador("respostas", status=200), 2)
+        self.assertEqual(metricas.contador("respostas", status="503"), 1)
+        self.assertEqual(metricas.contador("bytes_recebidos"), 120)
+        self.assertEqual(metricas.contador("inexistente"), 0)
+
+    @patch("src.Metricas.time.perf_counter", side_effect=[10.0, 10.5, 20.0, 22.0])
+    def test_cronometrar(self, mock_perf_counter):
+        """
+        Testa se cronometrar registra a duração do bloco, inclusive quando ele levanta uma exceção.
+        """
+        metricas = Metricas()
+        with metricas.cronometrar("ordenacao"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with metricas.cronometrar("ordenacao"):
+                raise RuntimeError("falha")
+        self.assertEqual(metricas.tempo("ordenacao"), (2, 2.5))
+        tempo = metricas.resumo()["tempos"][0]
+        self.assertEqual((tempo["minimo"], tempo["maximo"]), (0.5, 2.0))
+
+    def test_hooks(self):
+        """
+        Testa se os hooks recebem cada observação e se falhas neles não interrompem o registro.
+        """
+        metricas = Metricas()
+        hook = Mock()
+        metricas.adicionar_hook(Mock(side_effect=ValueError("hook com erro")))
+        metricas.adicionar_hook(hook)
+        metricas.incrementar("respostas", status=200)
+        metricas.registrar_tempo("requisicao", 0.25, recurso="nomes")
+        hook.assert_any_call("contador", "respostas", 1, {"status": 200})
+        hook.assert_any_call("tempo", "requisicao", 0.25, {"recurso": "nomes"})
+
+        metricas.remover_hook(hook)
+        metricas.incrementar("respostas")
+        self.assertEqual(hook.call_count, 2)
+
+    def test_resumo_json(self):
+        """
+        Testa se o resumo em JSON traz contadores, tempos e percentis.
+        """
+        metricas = Metricas()
+        for indice in range(1, 101):
+            metricas.registrar_tempo("requisicao", indice / 100)
+        metricas.incrementar("itens_convertidos", 20)
+        resumo = json.loads(metricas.json())
+        self.assertEqual(resumo["contadores"], [{"nome": "itens_convertidos", "rotulos": {}, "valor": 20}])
+        tempo = resumo["tempos"][0]
+        self.assertEqual(tempo["quantidade"], 100)
+        self.assertAlmostEqual(tempo["soma"], 50.5)
+        self.assertEqual((tempo["p50"], tempo["p95"], tempo["p99"]), (0.51, 0.96, 1.0))
+
+    def test_formato_prometheus(self):
+        """
+        Testa se o texto no formato do Prometheus declara os tipos e escapa os rótulos.
+        """
+        metricas = Metricas()
+        metricas.incrementar("respostas", recurso="nomes", status=200)
+        metricas.registrar_tempo("gravacao", 0.5, operacao='com "aspas"')
+        texto = metricas.prometheus()
+        self.assertIn("# TYPE ibge_respostas_total counter", texto)
+        self.assertIn('ibge_respostas_total{recurso="nomes",status="200"} 1', texto)
+        self.assertIn("# TYPE ibge_gravacao_segundos summary", texto)
+        self.assertIn('ibge_gravacao_segundos{operacao="com \\"aspas\\"",quantile="0.5"} 0.5', texto)
+        self.assertIn('ibge_gravacao_segundos_count{operacao="com \\"aspas\\""} 1', texto)
+
+    def test_zerar(self):
+        """
+        Testa se zerar descarta os valores registrados.
+        """
+        metricas = Metricas()
+        metricas.incrementar("respostas")
+        metricas.registrar_tempo("requisicao", 1.0)
+        metricas.zerar()
+        self.assertEqual(metricas.resumo(), {"contadores": [], "tempos": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from src.Normalizacao import IndiceNomes, normalizar_nome
+
+
+class TestNormalizacao(unittest.TestCase):
+    """
+    Classe de testes para a normalização de nomes e o índice de grafias.
+    """
+
+    def test_normalizar_nome(self):
+        """
+        Verifica se a normalização remove acentos, normaliza espaços e converte para maiúsculas.
+        """
+        self.assertEqual(normalizar_nome("  joão "), "JOAO")
+        self.assertEqual(normalizar_nome("Maria\t da  Graça"), "MARIA DA GRACA")
+        self.assertEqual(normalizar_nome("ÇÃO"), "CAO")
+        self.assertEqual(normalizar_nome("   "), "")
+
+    def test_indice_colapsa_grafias(self):
+        """
+        Testa se grafias do mesmo nome são reduzidas a um nome canônico, na ordem da primeira aparição.
+        """
+        indice = IndiceNomes(["joão", "Maria", "JOÃO", "Joao", "joão", "", None])
+        self.assertEqual(indice.canonicos(), ["JOAO", "MARIA"])
+        self.assertEqual(indice.grafias["JOAO"], ["joão", "JOÃO", "Joao"])
+        self.assertEqual(indice.total_grafias, 4)
+
+    def test_resultados_voltam_para_as_grafias(self):
+        """
+        Testa se os resultados por nome canônico são associados a todas as grafias originais.
+        """
+        indice = IndiceNomes(["joão", "Joao", "Ana"])
+        self.assertEqual(indice.expandir(["JOAO", "XYZ"]), ["joão", "Joao", "XYZ"])
+        self.assertEqual(indice.distribuir({"JOAO": 10, "ANA": 5}), {"joão": 10, "Joao": 10, "Ana": 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
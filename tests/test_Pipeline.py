@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from src.Item import Item
+from src.Pipeline import (PipelineRanking, salvar_manifesto_falhas, ler_manifesto_falhas,
+                          OK, VAZIA, FALHA)
+from tests.auxiliares import RepositorioFalso
+
+
+def converter(combinacao, resposta):
+    nomes, localidade, sexo, decada = combinacao
+    return [Item(nome=dado["nome"], localidade=localidade, sexo=sexo, decada=decada,
+                 frequencia=dado["res"][0]["frequencia"]) for dado in resposta]
+
+
+class TestPipelineRanking(unittest.TestCase):
+    """
+    Classe de testes para o PipelineRanking.
+    """
+
+    def test_grava_em_micro_lotes_com_flush_final(self):
+        """
+        Testa se todos os itens são gravados em lotes de no máximo `tamanho_lote`, incluindo o lote final incompleto.
+        """
+        lotes = []
+        pipeline = PipelineRanking(RepositorioFalso(), converter, gravar=lambda lote: lotes.append(lote) or {"inseridos": len(lote)},
+                                   tamanho_lote=3)
+        resumo = pipeline.processar(((["Nome"], str(uf), "-", None) for uf in range(10)))
+        self.assertEqual(sorted(len(lote) for lote in lotes), [1, 3, 3, 3])
+        self.assertEqual(resumo["itens"], 10)
+        self.assertEqual(resumo["lotes"], 4)
+        self.assertEqual(resumo["inseridos"], 10)
+
+    def test_deduplica_e_chama_ao_item(self):
+        """
+        Testa se itens repetidos são descartados antes de chegar ao ranking e ao banco.
+        """
+        recebidos = []
+        pipeline = PipelineRanking(RepositorioFalso(), converter, ao_item=recebidos.append)
+        resumo = pipeline.processar([(["Ana"], "35", "F", None)] * 3 + [(["Ana"], "33", "F", None)])
+        self.assertEqual(len(recebidos), 2)
+        self.assertEqual(resumo["duplicados"], 2)
+
+    def test_conjunto_de_vistos_limitado(self):
+        """
+        Testa se o conjunto de chaves vistas não ultrapassa `max_vistos`.
+        """
+        pipeline = PipelineRanking(RepositorioFalso(), converter, max_vistos=5)
+        pipeline.processar([([f"Nome{i}"], "BR", "-", None) for i in range(20)])
+        self.assertEqual(len(pipeline._vistos), 5)
+
+    def test_falhas_nao_interrompem(self):
+        """
+        Testa se combinações com erro são contadas como falhas sem impedir as demais.
+        """
+        respostas = []
+        pipeline = PipelineRanking(RepositorioFalso(falhar=("33",)), converter,
+                                   ao_resposta=lambda combinacao, resposta: respostas.append(combinacao))
+        with self.assertLogs(level='ERROR'):
+            resumo = pipeline.processar([(["Ana"], uf, "F", None) for uf in ("33", "35", "41")])
+        self.assertEqual(resumo["falhas"], 1)
+        self.assertEqual(resumo["itens"], 2)
+        self.assertEqual(len(respostas), 2)
+
+    def test_estados_e_novas_tentativas(self):
+        """
+        Testa se respostas vazias e falhas são distinguidas e se falhas transitórias são recuperadas
+        nas novas tentativas feitas após a passagem principal.
+        """
+        repositorio = RepositorioFalso(falhar=("33", "41"))
+        original = repositorio.obter_ranking
+
+        async def obter_ranking(nomes, localidade, sexo, decada):
+            if localidade == "33" and len(repositorio.consultas) >= 4:
+                repositorio.falhar = {"41"}
+            if localidade == "53":
+                repositorio.consultas.append((tuple(nomes), localidade, sexo, decada))
+                return []
+            return await original(nomes, localidade, sexo, decada)
+
+        repositorio.obter_ranking = obter_ranking
+        pipeline = PipelineRanking(repositorio, converter, novas_tentativas=2, espera_base=0.001)
+        with self.assertLogs(level='ERROR'):
+            resumo = pipeline.processar([(["Ana"], uf, "F", None) for uf in ("33", "35", "41", "53")])
+        self.assertEqual(pipeline.estados[(("Ana",), "33", "F", None)], OK)
+        self.assertEqual(pipeline.estados[(("Ana",), "53", "F", None)], VAZIA)
+        self.assertEqual(pipeline.estados[(("Ana",), "41", "F", None)], FALHA)
+        self.assertEqual([combinacao for combinacao, _ in pipeline.falhas()], [(["Ana"], "41", "F", None)])
+        self.assertIn("TimeoutError", pipeline.falhas()[0][1])
+        self.assertEqual((resumo["combinacoes"], resumo["falhas"], resumo["vazias"], resumo["repetidas"]), (4, 1, 1, 3))
+        self.assertEqual(resumo["itens"], 2)
+
+    def test_falha_de_gravacao(self):
+        """
+        Testa se as combinações de um lote não gravado passam a FALHA e, nas novas tentativas, são regravadas
+        sem repetir os itens no ranking.
+        """
+        gravados = []
+        tentativas = []
+
+        def gravar(lote):
+            tentativas.append(len(lote))
+            if len(tentativas) == 1:
+                raise RuntimeError("conexão perdida")
+            gravados.extend(lote)
+            return {"inseridos": len(lote)}
+
+        combinacoes = [(["Nome"], str(uf), "-", None) for uf in range(3)]
+        pipeline = PipelineRanking(RepositorioFalso(), converter, gravar=gravar, tamanho_lote=10)
+        with self.assertLogs(level="ERROR"):
+            resumo = pipeline.processar(combinacoes)
+        self.assertEqual(resumo["falhas"], 3)
+        self.assertEqual({combinacao[1] for combinacao, _ in pipeline.falhas()}, {"0", "1", "2"})
+        self.assertIn("RuntimeError: conexão perdida", pipeline.falhas()[0][1])
+        self.assertEqual(set(pipeline.estados.values()), {FALHA})
+
+        tentativas.clear()
+        recebidos = []
+        pipeline = PipelineRanking(RepositorioFalso(), converter, gravar=gravar, ao_item=recebidos.append,
+                                   tamanho_lote=10, novas_tentativas=1, espera_base=0.001)
+        with self.assertLogs(level="ERROR"):
+            resumo = pipeline.processar(combinacoes)
+        self.assertEqual(resumo["falhas"], 0)
+        self.assertEqual(set(pipeline.estados.values()), {OK})
+        self.assertEqual(sorted(item.localidade for item in gravados), ["0", "1", "2"])
+        self.assertEqual(len(recebidos), 3)
+        self.assertEqual(resumo["itens"], 3)
+
+    def test_manifesto_de_falhas(self):
+        """
+        Testa se o manifesto de falhas é gravado e lido de volta com as mesmas combinações e décadas.
+        """
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        caminho = os.path.join(diretorio.name, "falhas.json")
+        salvar_manifesto_falhas(caminho, [((["Ana", "José"], "35", "F", None), "TimeoutError: Timeout")], [1990, None])
+        self.assertEqual(ler_manifesto_falhas(caminho), ([(["Ana", "José"], "35", "F", None)], [1990, None]))
+
+    def test_contrapressao(self):
+        """
+        Testa se a busca para de produzir quando a fila de gravação está cheia.
+        """
+        liberar = threading.Event()
+        repositorio = RepositorioFalso(concorrencia=1)
+
+        def gravar(lote):
+            liberar.wait(timeout=2)
+            return {}
+
+        pipeline = PipelineRanking(repositorio, converter, gravar=gravar, tamanho_lote=1, capacidade_fila=1, escritores=1)
+        thread = threading.Thread(target=pipeline.processar, args=([([f"N{i}"], "BR", "-", None) for i in range(50)],))
+        thread.start()
+        time.sleep(0.2)
+        consultas_com_fila_cheia = len(repositorio.consultas)
+        liberar.set()
+        thread.join()
+        self.assertLess(consultas_com_fila_cheia, 5)
+        self.assertEqual(len(repositorio.consultas), 50)
+
+    def test_limites_invalidos(self):
+        """
+        Verifica se limites menores que 1 são rejeitados.
+        """
+        with self.assertRaises(ValueError):
+            PipelineRanking(RepositorioFalso(), converter, tamanho_lote=0)
+        with self.assertRaises(ValueError):
+            PipelineRanking(RepositorioFalso(), converter, novas_tentativas=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from src.Postgre import Postgre
+import src.Postgre
+from src.Postgre import Postgre, PoolPostgre, MIGRACOES
+from src.Localidades import ESTADOS, REGIOES
 from src.Item import Item
 import psycopg2
 import psycopg2.extras
@@ -199,6 +201,285 @@ class TestPostgre(unittest.TestCase):
         with self.assertRaises(AttributeError):
             postgre.insert_data(items)
 
+    def criar_postgre(self, mock_connect):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        return Postgre('host', 'port', 'database', 'user', 'password'), mock_connection, mock_cursor
+
+    @patch('psycopg2.connect')
+    def test_upsert_data_contagens(self, mock_connect):
+        """
+        Testa se upsert_data envia os itens via COPY e calcula inseridos, atualizados e inalterados.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        conteudos = []
+        mock_cursor.copy_expert.side_effect = lambda sql, buffer: conteudos.append(buffer.read())
+        mock_cursor.fetchall.return_value = [(True,), (False,)]
+        items = [
+            Item(nome='ANA', localidade='35', sexo='F', decada=1990, frequencia=10),
+            Item(nome='JOSE', localidade='35', sexo='M', decada=1990, frequencia=20),
+            Item(nome='MARIA', localidade='35', sexo='F', decada=None, frequencia=30),
+        ]
+
+        totais = postgre.upsert_data(iter(items))
+
+        self.assertEqual(totais, {"inseridos": 1, "atualizados": 1, "inalterados": 1})
+        self.assertEqual(conteudos, ["ANA\t35\tF\t1990\t10\nJOSE\t35\tM\t1990\t20\nMARIA\t35\tF\t\\N\t30\n"])
+        self.assertIn("ON CONFLICT", mock_cursor.execute.call_args[0][0])
+        self.assertIn("DO UPDATE", mock_cursor.execute.call_args[0][0])
+
+    @patch('psycopg2.connect')
+    def test_upsert_data_em_lotes(self, mock_connect):
+        """
+        Testa se upsert_data divide os itens em lotes de tamanho_lote, confirmando cada um.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_connection.commit.reset_mock()
+        mock_cursor.fetchall.return_value = []
+        items = (Item(nome=f'N{i}', frequencia=i) for i in range(5))
+
+        totais = postgre.upsert_data(items, tamanho_lote=2)
+
+        self.assertEqual(mock_cursor.copy_expert.call_count, 3)
+        self.assertEqual(mock_connection.commit.call_count, 3)
+        self.assertEqual(totais["inalterados"], 5)
+
+    @patch('psycopg2.connect')
+    def test_upsert_data_erro(self, mock_connect):
+        """
+        Testa se um erro durante o COPY é registrado e a transação é desfeita.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_cursor.copy_expert.side_effect = Exception("Erro no COPY")
+        with self.assertLogs(level='ERROR') as log:
+            postgre.upsert_data([Item(nome='Teste', frequencia=1)])
+        self.assertIn("Erro no COPY", log.output[0])
+        mock_connection.rollback.assert_called_once()
+
+        with self.assertLogs(level='ERROR'), self.assertRaises(Exception):
+            postgre.upsert_data([Item(nome='Teste', frequencia=1)], levantar=True)
+        self.assertEqual(mock_connection.rollback.call_count, 2)
+
+    @patch('psycopg2.connect')
+    def test_upsert_data_renova_atualizado_em(self, mock_connect):
+        """
+        Testa se upsert_data renova atualizado_em das linhas inalteradas antes de mesclar as demais.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_cursor.execute.reset_mock()
+        mock_cursor.fetchall.return_value = []
+        postgre.upsert_data([Item(nome='ANA', localidade='35', sexo='F', decada=1990, frequencia=10)])
+        comandos = [chamada[0][0] for chamada in mock_cursor.execute.call_args_list]
+        self.assertIn("SET atualizado_em = now()", comandos[1])
+        self.assertIn("atualizado_em = now()", comandos[2])
+
+    @patch('psycopg2.connect')
+    def test_buscar_atualizados(self, mock_connect):
+        """
+        Testa se buscar_atualizados filtra pela idade máxima e converte localidade e década para o esquema tipado.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_cursor.fetchall.return_value = [("ANA", 35, "F", 1990, 30), ("ANA", 35, "F", None, 90)]
+        linhas = postgre.buscar_atualizados({"ANA"}, ["35"], ["F"], [1990, None], 3600)
+        self.assertEqual(linhas, [("ANA", "35", "F", 1990, 30), ("ANA", "35", "F", None, 90)])
+        consulta, parametros = mock_cursor.execute.call_args[0]
+        self.assertIn("atualizado_em >=", consulta)
+        self.assertIn("decada IS NULL", consulta)
+        self.assertEqual(parametros, (["ANA"], [35], ["F"], [1990], True, 3600))
+
+    @patch('psycopg2.connect')
+    def test_buscar_ranking_por_grupo(self, mock_connect):
+        """
+        Testa se buscar aplica apenas os filtros informados e limita as linhas por grupo com ROW_NUMBER.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_cursor.fetchall.return_value = [("MARIA", 35, "-", None, 100)]
+        linhas = postgre.buscar(localidades=["35"], decadas=[None], limite=20, por_grupo=True)
+        self.assertEqual(linhas, [("MARIA", "35", "-", None, 100)])
+        consulta, parametros = mock_cursor.execute.call_args[0]
+        self.assertIn("PARTITION BY localidade, sexo, decada", consulta)
+        self.assertNotIn("nome = ANY", consulta)
+        self.assertEqual(parametros, ([35], [], True, 20))
+
+        postgre.buscar(nomes=["ANA"], limite=5)
+        consulta, parametros = mock_cursor.execute.call_args[0]
+        self.assertIn("ORDER BY frequencia DESC", consulta)
+        self.assertIn("LIMIT %s", consulta)
+        self.assertEqual(parametros, (["ANA"], 5))
+
+    @patch('psycopg2.extras.execute_values')
+    @patch('psycopg2.connect')
+    def test_registrar_e_consultar_rankings(self, mock_connect, mock_execute_values):
+        """
+        Testa se as consultas de ranking são registradas com o código da localidade e a década como número ou NULL.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        postgre.registrar_rankings([("35", "-", None), ("BR", "F", 1990)])
+        self.assertEqual(mock_execute_values.call_args[0][2], [(35, "-", None), (0, "F", 1990)])
+
+        mock_cursor.fetchall.return_value = [(0, "F", 1990)]
+        self.assertEqual(postgre.rankings_atualizados(["BR"], ["F"], [1990], 3600), {("BR", "F", 1990)})
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ([0], ["F"], [1990], False, 3600))
+
+    @patch('psycopg2.extras.execute_values')
+    @patch('psycopg2.connect')
+    def test_registrar_e_consultar_nomes_sem_resultado(self, mock_connect, mock_execute_values):
+        """
+        Testa se os nomes sem resultado são registrados sem repetição com o código da localidade e lidos de volta.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        postgre.registrar_nomes_sem_resultado([("XPTO", "35", "F"), ("XPTO", "35", "F")])
+        self.assertEqual(mock_execute_values.call_args[0][2], [("XPTO", 35, "F")])
+        mock_connection.commit.assert_called()
+
+        mock_execute_values.reset_mock()
+        postgre.registrar_nomes_sem_resultado([])
+        mock_execute_values.assert_not_called()
+
+        mock_cursor.fetchall.return_value = [("XPTO", 35, "F")]
+        self.assertEqual(postgre.nomes_sem_resultado_atualizados({"XPTO"}, ["35"], ["F"], 3600), {("XPTO", "35", "F")})
+        self.assertEqual(mock_cursor.execute.call_args[0][1], (["XPTO"], [35], ["F"], 3600))
+
+    @patch('psycopg2.connect')
+    def test_particionar_por_localidade(self, mock_connect):
+        """
+        Testa se a tabela é convertida em particionada uma única vez, com uma partição por localidade conhecida.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_cursor.execute.reset_mock()
+        mock_cursor.fetchone.return_value = ("r",)
+        self.assertTrue(postgre.particionar_por_localidade())
+        comandos = [chamada[0][0] for chamada in mock_cursor.execute.call_args_list]
+        self.assertTrue(any("PARTITION BY LIST (localidade)" in comando for comando in comandos))
+        self.assertEqual(sum("PARTITION OF nomes_particionada FOR VALUES" in comando for comando in comandos),
+                         1 + len(REGIOES) + len(ESTADOS))
+        self.assertIn("DROP TABLE nomes", comandos)
+        mock_connection.commit.assert_called()
+
+        mock_cursor.execute.reset_mock()
+        mock_cursor.fetchone.return_value = ("p",)
+        self.assertFalse(postgre.particionar_por_localidade())
+        self.assertEqual(mock_cursor.execute.call_count, 2)
+
+    def test_linha_copy_escapa_caracteres(self):
+        """
+        Verifica se a linha do COPY escapa tabulações, quebras de linha e barras, e representa None como \\N.
+        """
+        self.assertEqual(Postgre._linha_copy(("a\tb", None, "c\\d\n")), "a\\tb\t\\N\tc\\\\d\\n\n")
+
+    @patch('psycopg2.connect')
+    def test_create_table_aplica_apenas_migracoes_pendentes(self, mock_connect):
+        """
+        Testa se create_table executa somente as migrações ainda não registradas em esquema_versao.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        mock_cursor.execute.reset_mock()
+        mock_cursor.fetchall.return_value = [(versao,) for versao, _ in MIGRACOES]
+        postgre.create_table()
+        comandos = [chamada[0][0] for chamada in mock_cursor.execute.call_args_list]
+        self.assertFalse(any("CREATE TABLE IF NOT EXISTS nomes" in comando for comando in comandos))
+        self.assertFalse(any("INSERT INTO esquema_versao" in comando for comando in comandos))
+
+        mock_cursor.execute.reset_mock()
+        mock_cursor.fetchall.return_value = []
+        postgre.create_table()
+        comandos = [chamada[0][0] for chamada in mock_cursor.execute.call_args_list]
+        self.assertTrue(any("CREATE TABLE IF NOT EXISTS nomes" in comando for comando in comandos))
+        self.assertEqual(sum("INSERT INTO esquema_versao" in comando for comando in comandos), len(MIGRACOES))
+
+    @patch('psycopg2.connect')
+    def test_context_manager(self, mock_connect):
+        """
+        Testa se a conexão é fechada ao sair do bloco with.
+        """
+        postgre, mock_connection, mock_cursor = self.criar_postgre(mock_connect)
+        with postgre as sessao:
+            self.assertIs(sessao, postgre)
+        mock_connection.close.assert_called_once()
+
+
+class TestPoolPostgre(unittest.TestCase):
+    """
+    Classe de testes para PoolPostgre.
+    """
+
+    def setUp(self):
+        src.Postgre._esquemas_verificados.clear()
+        patcher = patch('psycopg2.pool.ThreadedConnectionPool')
+        self.mock_pool_classe = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_pool = self.mock_pool_classe.return_value
+        self.conexoes = []
+
+        def nova_conexao():
+            conexao = MagicMock()
+            self.conexoes.append(conexao)
+            return conexao
+
+        self.mock_pool.getconn.side_effect = nova_conexao
+
+    def test_esquema_verificado_uma_vez_por_processo(self):
+        """
+        Testa se apenas o primeiro pool para um mesmo banco verifica o esquema.
+        """
+        PoolPostgre('host', 5432, 'database', 'user', 'password', max_conexoes=2)
+        PoolPostgre('host', 5432, 'database', 'user', 'password', max_conexoes=2)
+        self.assertEqual(len(self.conexoes), 1)
+        self.conexoes[0].commit.assert_called_once()
+        self.mock_pool.putconn.assert_called_once_with(self.conexoes[0])
+
+    def test_sessao_devolve_conexao_e_desfaz_em_erro(self):
+        """
+        Testa se a sessão devolve a conexão ao pool e desfaz a transação quando ocorre uma exceção.
+        """
+        pool = PoolPostgre('host', 5432, 'database', 'user', 'password')
+        with self.assertRaises(RuntimeError):
+            with pool.sessao():
+                raise RuntimeError("falha")
+        self.conexoes[-1].rollback.assert_called_once()
+        self.mock_pool.putconn.assert_called_with(self.conexoes[-1])
+
+    def test_sessoes_concorrentes_aguardam_vaga(self):
+        """
+        Testa se, com o pool esgotado, novos escritores aguardam em vez de falhar.
+        """
+        import threading
+        pool = PoolPostgre('host', 5432, 'database', 'user', 'password', max_conexoes=1)
+        em_uso = []
+        maximo = []
+
+        def escrever():
+            with pool.sessao():
+                em_uso.append(1)
+                maximo.append(len(em_uso))
+                em_uso.pop()
+
+        threads = [threading.Thread(target=escrever) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(maximo), 1)
+
+    def test_upsert_data_usa_sessao(self):
+        """
+        Testa se upsert_data grava por meio de uma conexão emprestada do pool.
+        """
+        pool = PoolPostgre('host', 5432, 'database', 'user', 'password')
+        with patch.object(Postgre, 'upsert_data', return_value={"inseridos": 1}) as mock_upsert:
+            self.assertEqual(pool.upsert_data([Item(nome='Ana', frequencia=1)]), {"inseridos": 1})
+        mock_upsert.assert_called_once()
+
+    def test_close(self):
+        """
+        Testa se close encerra todas as conexões do pool.
+        """
+        with PoolPostgre('host', 5432, 'database', 'user', 'password'):
+            pass
+        self.mock_pool.closeall.assert_called_once()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
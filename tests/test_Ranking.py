@@ -1,7 +1,7 @@
 import unittest
-from src.Ranking import Ranking
+from src.Ranking import Ranking, TopK
 from src.Item import Item
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import io
 
 class TestRanking(unittest.TestCase):
@@ -23,7 +23,7 @@ class TestRanking(unittest.TestCase):
         ranking = Ranking()
         item = Item(nome='João', frequencia=100)
         ranking.adicionar_item(item)
-        self.assertIn(item, ranking.itens)
+        self.assertEqual([(i.chave(), i.frequencia) for i in ranking.itens], [(item.chave(), 100)])
         self.assertEqual(len(ranking.itens), 1)
 
     def test_ordenar_ranking(self):
@@ -38,9 +38,9 @@ class TestRanking(unittest.TestCase):
         ranking.adicionar_item(item2)
         ranking.adicionar_item(item3)
         ranking.ordenar_ranking()
-        self.assertEqual(ranking.itens[0], item2)  # Frequência 150
-        self.assertEqual(ranking.itens[1], item3)  # Frequência 100
-        self.assertEqual(ranking.itens[2], item1)  # Frequência 50
+        self.assertEqual(ranking.itens[0].chave(), item2.chave())  # Frequência 150
+        self.assertEqual(ranking.itens[1].chave(), item3.chave())  # Frequência 100
+        self.assertEqual(ranking.itens[2].chave(), item1.chave())  # Frequência 50
 
     def test_ordenar_ranking_frequencias_iguais(self):
         """
@@ -53,8 +53,36 @@ class TestRanking(unittest.TestCase):
         ranking.adicionar_item(item2)
         ranking.ordenar_ranking()
         # Verifica se a ordem original é mantida
-        self.assertEqual(ranking.itens[0], item1)
-        self.assertEqual(ranking.itens[1], item2)
+        self.assertEqual(ranking.itens[0].chave(), item1.chave())
+        self.assertEqual(ranking.itens[1].chave(), item2.chave())
+
+    def test_itens_somente_leitura(self):
+        """
+        Testa se `itens` devolve os mesmos objetos até a próxima alteração e se alterá-los levanta erro,
+        em vez de a alteração ser perdida.
+        """
+        ranking = Ranking()
+        ranking.adicionar_item(Item(nome='Ana', localidade={'id': 35, 'sigla': 'SP'}, frequencia=1))
+        itens = ranking.itens
+        self.assertIs(ranking.itens[0], itens[0])
+        self.assertEqual(itens[0].localidade, {'id': 35, 'sigla': 'SP'})
+        with self.assertRaises(AttributeError):
+            itens[0].frequencia = 2
+        ranking.adicionar_item(Item(nome='Bia', frequencia=3))
+        self.assertEqual([item.nome for item in ranking.itens], ['Ana', 'Bia'])
+        self.assertEqual(ranking.itens, list(ranking.itens))
+
+    def test_ordenar_ranking_usa_coluna_numerica(self):
+        """
+        Testa se a ordenação reorganiza o lote colunar e se `itens` reflete a nova ordem.
+        """
+        ranking = Ranking()
+        for nome, frequencia in (('Ana', 1), ('Bia', 3), ('Caio', 2)):
+            ranking.adicionar_item(Item(nome=nome, frequencia=frequencia))
+        self.assertEqual([item.nome for item in ranking.itens], ['Ana', 'Bia', 'Caio'])
+        ranking.ordenar_ranking()
+        self.assertEqual(list(ranking.lote.frequencias), [3, 2, 1])
+        self.assertEqual([item.nome for item in ranking.itens], ['Bia', 'Caio', 'Ana'])
 
     @patch('sys.stdout', new_callable=io.StringIO)
     def test_exibir_ranking(self, mock_stdout):
@@ -88,5 +116,66 @@ class TestRanking(unittest.TestCase):
         expected_output = f"{'Nome':<15}{'Localidade':<15}{'Sexo':<15}{'Década':<15}{'Frequência'}\n" + '-' * 70 + '\n'
         self.assertEqual(output.getvalue(), expected_output)
 
+    def test_top(self):
+        """
+        Testa se top retorna os k maiores itens, com desempate estável, sem alterar a ordem do ranking.
+        """
+        ranking = Ranking()
+        for nome, frequencia in (('Ana', 5), ('Bia', 9), ('Caio', 7), ('Davi', 9), ('Eva', 1)):
+            ranking.adicionar_item(Item(nome=nome, frequencia=frequencia))
+        self.assertEqual([item.nome for item in ranking.top(3)], ['Bia', 'Davi', 'Caio'])
+        self.assertEqual([item.nome for item in ranking.top(2, deslocamento=2)], ['Caio', 'Ana'])
+        self.assertEqual([item.nome for item in ranking.top(2, por='nome')], ['Eva', 'Davi'])
+        self.assertEqual([item.nome for item in ranking.itens], ['Ana', 'Bia', 'Caio', 'Davi', 'Eva'])
+
+    def test_top_agrupado(self):
+        """
+        Testa se o top-k por grupo seleciona os maiores itens de cada localidade, na ordem em que apareceram.
+        """
+        ranking = Ranking()
+        for nome, localidade, frequencia in (('Ana', '35', 5), ('Bia', '33', 9), ('Caio', '35', 7),
+                                             ('Davi', '33', 2), ('Eva', '35', 6)):
+            ranking.adicionar_item(Item(nome=nome, localidade=localidade, frequencia=frequencia))
+        self.assertEqual([item.nome for item in ranking.top(2, agrupar_por='localidade')],
+                         ['Caio', 'Eva', 'Bia', 'Davi'])
+
+    def test_ranking_limitado_ao_top(self):
+        """
+        Testa se um ranking criado com top guarda apenas os maiores itens à medida que eles chegam.
+        """
+        ranking = Ranking(top=2, agrupar_por=['sexo'])
+        for nome, sexo, frequencia in (('Ana', 'F', 5), ('Bia', 'F', 9), ('Caio', 'M', 7),
+                                       ('Davi', 'M', 8), ('Eva', 'F', 6), ('Gil', 'M', 1)):
+            ranking.adicionar_item(Item(nome=nome, sexo=sexo, frequencia=frequencia))
+        self.assertEqual(len(ranking.selecao._heaps[('F',)]), 2)
+        ranking.ordenar_ranking()
+        self.assertEqual([item.nome for item in ranking.itens], ['Bia', 'Eva', 'Davi', 'Caio'])
+        self.assertEqual(len(ranking.lote), 4)
+
+    def test_carregar_do_banco(self):
+        """
+        Testa se carregar_do_banco adiciona ao ranking as linhas retornadas pela consulta ao banco.
+        """
+        banco = MagicMock()
+        banco.buscar.return_value = [("MARIA", "35", "F", 1990, 50), ("ANA", "35", "F", None, 20)]
+        ranking = Ranking()
+        self.assertEqual(ranking.carregar_do_banco(banco, localidades=["35"], limite=20, por_grupo=True), 2)
+        banco.buscar.assert_called_once_with(None, ["35"], None, None, idade_maxima=None, limite=20, por_grupo=True)
+        self.assertEqual((ranking.itens[0].chave(), ranking.itens[0].frequencia), (("MARIA", "35", "F", 1990), 50))
+        self.assertIsNone(ranking.itens[1].decada)
+
+        ranking = Ranking()
+        self.assertEqual(ranking.carregar_do_banco(banco, grupos={("35", "F", None)}), 1)
+        self.assertEqual([item.nome for item in ranking.itens], ["ANA"])
+
+    def test_topk_parametros_invalidos(self):
+        """
+        Testa se TopK rejeita k menor que 1 e deslocamento negativo.
+        """
+        with self.assertRaises(ValueError):
+            TopK(0)
+        with self.assertRaises(ValueError):
+            TopK(5, deslocamento=-1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.Item import Item, ItemBatch
+from src.Saida import EscritorCSV, EscritorJSONL, EscritorParquet, EscritorTabela, escrever_ranking
+
+
+def criar_itens():
+    return [
+        Item(nome='MARIA', localidade='35', sexo='F', decada=1980, frequencia=105247),
+        Item(nome='JOAO', localidade={'sigla': 'RJ'}, sexo=None, decada=None, frequencia=85),
+    ]
+
+
+class TestSaida(unittest.TestCase):
+    """
+    Classe de testes para os escritores de ranking.
+    """
+
+    def test_tabela_igual_a_exibir_informacoes(self):
+        """
+        Testa se a tabela produz as mesmas linhas de Item.exibir_informacoes, a partir de itens e de um lote.
+        """
+        itens = criar_itens()
+        for fonte in (itens, ItemBatch.de_itens(itens)):
+            destino = io.StringIO()
+            self.assertEqual(EscritorTabela(destino).escrever(fonte), 2)
+            linhas = destino.getvalue().splitlines()
+            self.assertEqual(linhas[0], f"{'Nome':<15}{'Localidade':<15}{'Sexo':<15}{'Década':<15}{'Frequência'}")
+            self.assertEqual(linhas[1], '-' * 70)
+            self.assertEqual(linhas[2:], [item.exibir_informacoes() for item in itens])
+
+    def test_escrita_em_blocos(self):
+        """
+        Testa se cada bloco de linhas é enviado ao destino em uma única escrita.
+        """
+        destino = io.StringIO()
+        itens = [Item(nome=f'NOME{indice}', frequencia=indice) for indice in range(5)]
+        with patch.object(destino, 'write', wraps=destino.write) as mock_write:
+            EscritorTabela(destino, tamanho_bloco=2).escrever(itens)
+        self.assertEqual(mock_write.call_count, 1 + 3)
+        self.assertEqual(len(destino.getvalue().splitlines()), 2 + 5)
+
+    def test_csv(self):
+        """
+        Testa se o CSV tem cabeçalho, uma coluna por campo e década vazia quando ausente.
+        """
+        destino = io.StringIO()
+        EscritorCSV(destino).escrever(criar_itens())
+        linhas = list(csv.reader(io.StringIO(destino.getvalue())))
+        self.assertEqual(linhas, [
+            ['nome', 'localidade', 'sexo', 'decada', 'frequencia'],
+            ['MARIA', '35', 'F', '1980', '105247'],
+            ['JOAO', 'RJ', '', '', '85'],
+        ])
+
+    def test_jsonl(self):
+        """
+        Testa se cada linha do JSON Lines é um objeto com os campos do item.
+        """
+        destino = io.StringIO()
+        EscritorJSONL(destino).escrever(ItemBatch.de_itens(criar_itens()))
+        linhas = [json.loads(linha) for linha in destino.getvalue().splitlines()]
+        self.assertEqual(linhas[0], {'nome': 'MARIA', 'localidade': '35', 'sexo': 'F', 'decada': 1980,
+                                     'frequencia': 105247})
+        self.assertIsNone(linhas[1]['decada'])
+
+    def test_escrever_ranking_em_arquivo(self):
+        """
+        Testa se escrever_ranking grava o formato pedido no arquivo indicado.
+        """
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'ranking.csv')
+            self.assertEqual(escrever_ranking(criar_itens(), 'csv', caminho), 2)
+            with open(caminho, encoding='utf-8') as arquivo:
+                self.assertEqual(arquivo.readline(), 'nome,localidade,sexo,decada,frequencia\n')
+
+    def test_formato_invalido(self):
+        """
+        Testa se formatos desconhecidos ou indisponíveis são rejeitados antes de criar o arquivo.
+        """
+        with self.assertRaises(ValueError):
+            escrever_ranking([], 'xml')
+        with patch.object(EscritorParquet, 'disponivel', False):
+            with tempfile.TemporaryDirectory() as diretorio:
+                caminho = os.path.join(diretorio, 'ranking.parquet')
+                with self.assertRaises(ImportError):
+                    escrever_ranking([], 'parquet', caminho)
+                self.assertFalse(os.path.exists(caminho))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+from benchmarks.servidor_mock import ServidorMockIBGE
+from main import Main
+from src.Servidor import CacheResultados, ServidorConsultas, ler_parametros
+
+
+class TestLerParametros(unittest.TestCase):
+    """
+    Classe de testes para a validação dos parâmetros das consultas do servidor.
+    """
+
+    def test_parametros_como_na_linha_de_comando(self):
+        """
+        Testa se valores separados por vírgula ou repetidos são aceitos e convertidos como na linha de comando.
+        """
+        parametros = ler_parametros("nomes=ana,jos%C3%A9&local=sp&local=BR&sexo=f&decada=1995"
+                                    "&decada-range=1980:2000&top=5&agrupar-por=localidade")
+        self.assertEqual(parametros["nomes"], ["ana", "josé"])
+        self.assertEqual(parametros["localidades"], ["35", "BR"])
+        self.assertEqual(parametros["sexos"], ["F"])
+        self.assertEqual(parametros["decadas"], [1990, 1980, 2000])
+        self.assertEqual(parametros["top"], 5)
+        self.assertEqual(parametros["agrupar_por"], ["localidade"])
+        self.assertEqual(ler_parametros("intervalo=1999:1970,1940:1949")["intervalos"], [(1970, 1999), (1940, 1949)])
+
+        padrao = ler_parametros("")
+        self.assertEqual((padrao["localidades"], padrao["sexos"], padrao["decadas"]), (["BR"], ["-"], [None]))
+
+    def test_parametros_invalidos(self):
+        """
+        Testa se parâmetros desconhecidos ou valores inválidos são recusados em vez de substituídos por padrões.
+        """
+        for consulta in ("local=ZZ", "sexo=X", "decada=abc", "decada-range=1980", "top=-1", "agrupar-por=nome",
+                         "cidade=SP", "intervalo=1970", "intervalo=a:b"):
+            with self.assertRaises(ValueError, msg=consulta):
+                ler_parametros(consulta)
+
+
+class TestCacheResultados(unittest.TestCase):
+    """
+    Classe de testes para o cache de resultados com coalescência de consultas.
+    """
+
+    def test_coalesce_consultas_identicas(self):
+        """
+        Testa se consultas idênticas simultâneas compartilham um único cálculo e as seguintes vêm do cache.
+        """
+        cache = CacheResultados(ttl=60)
+        calculos = []
+
+        async def calcular():
+            calculos.append(1)
+            await asyncio.sleep(0.01)
+            return b"resultado"
+
+        async def executar():
+            resultados = await asyncio.gather(*(cache.obter("chave", calcular) for _ in range(10)))
+            resultados.append(await cache.obter("chave", calcular))
+            return resultados
+
+        self.assertEqual(asyncio.run(executar()), [b"resultado"] * 11)
+        self.assertEqual(len(calculos), 1)
+
+    def test_falhas_e_expiracao(self):
+        """
+        Testa se falhas são repassadas sem serem guardadas, se resultados expirados são recalculados
+        e se o limite de entradas descarta as menos usadas.
+        """
+        cache = CacheResultados(ttl=0, max_entradas=1)
+        chamadas = []
+
+        async def falhar():
+            raise TimeoutError("Timeout")
+
+        async def calcular():
+            chamadas.append(1)
+            return len(chamadas)
+
+        async def executar():
+            with self.assertRaises(TimeoutError):
+                await cache.obter("a", falhar)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(await cache.obter("a", calcular), 1)
+            self.assertEqual(await cache.obter("a", calcular), 2)
+            await cache.obter("b", calcular)
+            self.assertEqual(len(cache), 1)
+
+        asyncio.run(executar())
+
+
+class TestServidorConsultas(unittest.TestCase):
+    """
+    Classe de testes para o servidor HTTP de consultas, usando o servidor simulado da API do IBGE.
+    """
+
+    def setUp(self):
+        self.api = ServidorMockIBGE(razao_ausentes=0, latencia=0.05).iniciar()
+        self.addCleanup(self.api.parar)
+        main = Main()
+        main.sem_banco = True
+        main.repositorio_ibge.url = self.api.url
+        self.servidor = ServidorConsultas(main, porta=0, concorrencia=4)
+
+    def executar(self, corrotina):
+        async def envolver():
+            await self.servidor.iniciar()
+            try:
+                return await corrotina()
+            finally:
+                await self.servidor.fechar()
+        return asyncio.run(envolver())
+
+    def test_ranking_coalescido_e_em_cache(self):
+        """
+        Testa se consultas idênticas simultâneas geram uma única requisição à API e as seguintes vêm da memória.
+        """
+        async def consultar():
+            respostas = await asyncio.gather(*(self.servidor.responder("GET", "/ranking?local=SP&sexo=F&top=3")
+                                               for _ in range(20)))
+            respostas.append(await self.servidor.responder("GET", "/ranking/?local=35&sexo=F&top=3"))
+            return respostas
+
+        respostas = self.executar(consultar)
+        self.assertEqual(self.api.requisicoes, 1)
+        self.assertTrue(all(status == 200 for status, _ in respostas))
+        self.assertEqual(len({corpo for _, corpo in respostas}), 1)
+        itens = json.loads(respostas[0][1])["itens"]
+        self.assertEqual(len(itens), 3)
+        self.assertEqual({(item["localidade"], item["sexo"]) for item in itens}, {("35", "F")})
+        self.assertEqual(itens, sorted(itens, key=lambda item: -item["frequencia"]))
+
+    def test_ranking_em_cache_com_grafias_de_cada_consulta(self):
+        """
+        Testa se grafias diferentes compartilham o resultado do ranking, mas cada resposta lista os nomes sem
+        resultado na grafia da própria consulta.
+        """
+        self.api.razao_ausentes = 1
+
+        async def consultar():
+            return [await self.servidor.responder("GET", f"/ranking?nomes={nomes}") for nomes in ("jo%C3%A3o,zzyx",
+                                                                                                  "JOAO,Zzyx")]
+
+        respostas = [json.loads(corpo) for _, corpo in self.executar(consultar)]
+        self.assertEqual([resposta["sem_resultado"] for resposta in respostas], [["zzyx"], ["Zzyx"]])
+        self.assertEqual(respostas[0]["itens"], respostas[1]["itens"])
+        self.assertEqual(self.api.requisicoes, 1)
+
+    def test_nomes_nas_grafias_da_consulta(self):
+        """
+        Testa se /nomes devolve a frequência de cada grafia informada, consultando cada nome uma única vez.
+        """
+        async def consultar():
+            return await self.servidor.responder("GET", "/nomes?nomes=maria,Mar%C3%ADa&decada=1980,1990")
+
+        status, corpo = self.executar(consultar)
+        self.assertEqual(status, 200)
+        nomes = json.loads(corpo)["nomes"]
+        self.assertEqual(set(nomes), {"maria", "María"})
+        self.assertEqual([linha["decada"] for linha in nomes["maria"]], [1980, 1990])
+        self.assertEqual(self.api.requisicoes, 1)
+
+    def test_nomes_com_soma_em_intervalo(self):
+        """
+        Testa se /nomes com 'intervalo' devolve a frequência somada nas décadas do intervalo, na grafia da consulta.
+        """
+        async def consultar():
+            return await self.servidor.responder("GET", "/nomes?nomes=Maria&decada=1980,1990&intervalo=1980:1999")
+
+        status, corpo = self.executar(consultar)
+        self.assertEqual(status, 200)
+        resposta = json.loads(corpo)
+        decadas = sum(linha["frequencia"] for linha in resposta["nomes"]["Maria"])
+        self.assertEqual(resposta["intervalos"], {"Maria": [
+            {"localidade": "BR", "sexo": "-", "inicio": 1980, "fim": 1999, "frequencia": decadas}]})
+        self.assertEqual(self.api.requisicoes, 1)
+
+    def test_erros_de_requisicao(self):
+        """
+        Testa as respostas para rotas desconhecidas, métodos não permitidos, parâmetros e cabeçalhos inválidos.
+        """
+        async def consultar():
+            return [await self.servidor.responder(metodo, alvo) for metodo, alvo in
+                    [("GET", "/outra"), ("POST", "/ranking"), ("GET", "/ranking?sexo=X"), ("GET", "/nomes")]]
+
+        self.assertEqual([status for status, _ in self.executar(consultar)], [404, 405, 400, 400])
+
+        async def enviar_tamanho_invalido():
+            leitor, escritor = await asyncio.open_connection("127.0.0.1", self.servidor.porta)
+            escritor.write(b"GET /ranking HTTP/1.1\r\nHost: localhost\r\nContent-Length: abc\r\n\r\n")
+            await escritor.drain()
+            resposta = await leitor.read()
+            escritor.close()
+            return resposta
+
+        resposta = self.executar(enviar_tamanho_invalido)
+        self.assertTrue(resposta.startswith(b"HTTP/1.1 400 Bad Request\r\n"))
+        self.assertIn(b"Connection: close", resposta)
+        self.assertEqual(self.api.requisicoes, 0)
+
+    @patch('src.Postgre.PoolPostgre')
+    def test_pool_do_banco_aberto_em_iniciar(self, mock_pool):
+        """
+        Testa se o pool do banco é criado em `iniciar`, com todas as conexões mantidas abertas entre as requisições.
+        """
+        self.servidor.main.sem_banco = False
+        self.servidor.conexoes_banco = 3
+
+        async def consultar():
+            mock_pool.assert_called_once()
+
+        self.executar(consultar)
+        self.assertEqual((mock_pool.call_args[1]["min_conexoes"], mock_pool.call_args[1]["max_conexoes"]), (3, 3))
+        mock_pool.return_value.close.assert_called_once()
+
+    def test_conexao_http_persistente(self):
+        """
+        Testa se duas requisições são atendidas pela mesma conexão TCP (keep-alive).
+        """
+        async def consultar():
+            leitor, escritor = await asyncio.open_connection("127.0.0.1", self.servidor.porta)
+            respostas = []
+            for _ in range(2):
+                escritor.write(b"GET /ranking?local=RJ HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                await escritor.drain()
+                cabecalho = (await leitor.readuntil(b"\r\n\r\n")).decode("latin-1")
+                tamanho = int(cabecalho.lower().split("content-length:")[1].split("\r\n")[0])
+                respostas.append((cabecalho.split("\r\n")[0], json.loads(await leitor.readexactly(tamanho))))
+            escritor.close()
+            return respostas
+
+        respostas = self.executar(consultar)
+        self.assertEqual([linha for linha, _ in respostas], ["HTTP/1.1 200 OK"] * 2)
+        self.assertEqual(len(respostas[1][1]["itens"]), 20)
+        self.assertEqual(self.api.requisicoes, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+from benchmarks.servidor_mock import ServidorMockIBGE
+from src.Transporte import Transporte
+
+
+class TestTransporte(unittest.TestCase):
+    """
+    Classe de testes para o transporte HTTP compartilhado.
+    """
+
+    def test_reutiliza_conexoes(self):
+        """
+        Testa se requisições sucessivas ao mesmo host reaproveitam a conexão aberta.
+        """
+        transporte = Transporte(tamanho_pool=2)
+        self.addCleanup(transporte.fechar)
+        with ServidorMockIBGE() as servidor:
+            for _ in range(5):
+                resposta = transporte.get(servidor.url + "v1/localidades/estados/SP")
+                self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(transporte.estatisticas(),
+                         {"requisicoes": 5, "conexoes_novas": 1, "conexoes_reutilizadas": 4})
+
+    @patch('requests.Session.get')
+    def test_timeout_em_todas_as_requisicoes(self, mock_get):
+        """
+        Testa se os tempos máximos de conexão e leitura são passados em cada requisição, salvo se informados.
+        """
+        transporte = Transporte(timeout_conexao=1, timeout_leitura=7)
+        transporte.get("http://exemplo/", params={"a": 1})
+        mock_get.assert_called_with("http://exemplo/", params={"a": 1}, timeout=(1, 7))
+        transporte.get("http://exemplo/", timeout=3)
+        mock_get.assert_called_with("http://exemplo/", timeout=3)
+        self.assertIn("gzip", transporte.sessao.headers["Accept-Encoding"])
+
+    def test_compartilhado_so_amplia_o_pool(self):
+        """
+        Testa se o transporte compartilhado é único no processo e se o pool cresce, mas não diminui.
+        """
+        transporte = Transporte.compartilhado(4)
+        tamanho = transporte.tamanho_pool
+        self.assertIs(Transporte.compartilhado(1), transporte)
+        self.assertEqual(transporte.tamanho_pool, tamanho)
+        Transporte.compartilhado(tamanho + 8)
+        self.assertEqual(transporte.tamanho_pool, tamanho + 8)
+        self.assertEqual(transporte.sessao.get_adapter("https://")._pool_maxsize, tamanho + 8)
+
+    def test_repeticoes_de_sobrecarga(self):
+        """
+        Testa se o transporte usado com limitador repete só falhas de conexão e leitura, e se há um transporte
+        compartilhado para cada modo.
+        """
+        repeticoes = Transporte(repetir_sobrecarga=False).sessao.get_adapter("https://").max_retries
+        self.assertFalse(repeticoes.status_forcelist)
+        self.assertFalse(repeticoes.respect_retry_after_header)
+        self.assertTrue(Transporte().sessao.get_adapter("https://").max_retries.respect_retry_after_header)
+        self.assertIsNot(Transporte.compartilhado(repetir_sobrecarga=False), Transporte.compartilhado())
+        self.assertIs(Transporte.existente(repetir_sobrecarga=False), Transporte.compartilhado(repetir_sobrecarga=False))
+
+    def test_pool_invalido(self):
+        """
+        Verifica se um pool sem conexões é rejeitado.
+        """
+        with self.assertRaises(ValueError):
+            Transporte(tamanho_pool=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
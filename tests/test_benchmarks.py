@@ -0,0 +1,100 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import unittest
+import requests
+from benchmarks.executar import aguardar_resultado, comparar, formatar, percentil
+from benchmarks.servidor_mock import ServidorMockIBGE
+from src.IBGE import RepositorioIBGE
+
+
+class TestServidorMockIBGE(unittest.TestCase):
+    """
+    Classe de testes para o servidor simulado usado nos benchmarks.
+    """
+
+    def test_respostas_no_formato_da_api(self):
+        """
+        Testa se o RepositorioIBGE consegue consultar ranking, nomes e estados no servidor simulado.
+        """
+        with ServidorMockIBGE(razao_ausentes=0) as servidor:
+            repositorio = RepositorioIBGE(url=servidor.url)
+            ranking = repositorio.obter_ranking([None], "35", "F", 1990)
+            nomes = repositorio.obter_ranking(["Maria", "Zélia"], "35")
+            estado = repositorio.obter_informacoes_estado("sp")
+        self.assertEqual(len(ranking[0]["res"]), 20)
+        self.assertEqual([dado["nome"] for dado in nomes], ["MARIA", "ZELIA"])
+        self.assertTrue(all("periodo" in periodo for periodo in nomes[1]["res"]))
+        self.assertEqual(estado["id"], 35)
+        self.assertEqual(servidor.requisicoes, 3)
+
+    def test_taxa_de_erro(self):
+        """
+        Testa se, com taxa de erro 1, o servidor responde 503.
+        """
+        with ServidorMockIBGE(taxa_erro=1.0) as servidor:
+            resposta = requests.get(servidor.url + "v2/censos/nomes/ranking")
+        self.assertEqual(resposta.status_code, 503)
+
+    def test_nomes_ausentes_deterministicos(self):
+        """
+        Verifica se a escolha dos nomes sem resultado é determinística.
+        """
+        servidor = ServidorMockIBGE(razao_ausentes=2)
+        primeira = [servidor._linha_nome(f"Nome{i}", "BR", None) is None for i in range(20)]
+        segunda = [servidor._linha_nome(f"Nome{i}", "BR", None) is None for i in range(20)]
+        servidor.parar()
+        self.assertEqual(primeira, segunda)
+        self.assertTrue(any(primeira))
+
+
+class TestPercentil(unittest.TestCase):
+    """
+    Classe de testes para o cálculo de percentis dos benchmarks.
+    """
+
+    def test_percentil(self):
+        """
+        Testa percentis com interpolação linear e lista vazia.
+        """
+        self.assertEqual(percentil([3, 1, 2, 4], 50), 2.5)
+        self.assertEqual(percentil([1, 2, 3, 4, 5], 100), 5)
+        self.assertIsNone(percentil([], 95))
+
+
+class TestExibicaoResultados(unittest.TestCase):
+    """
+    Classe de testes para a coleta e exibição dos resultados dos cenários.
+    """
+
+    def test_metricas_ausentes(self):
+        """
+        Testa se métricas que não puderam ser calculadas são exibidas como "n/a", também na comparação.
+        """
+        self.assertEqual(formatar(None, ".1f", 1000), "n/a")
+        self.assertEqual(formatar(0.0125, ".1f", 1000), "12.5")
+
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            comparar({"cenarios": {"a": {"requisicoes_s": 10.0, "latencia_p95_s": None}}},
+                     {"cenarios": {"a": {"requisicoes_s": 5.0, "latencia_p95_s": 0.1}}})
+        linhas = saida.getvalue().strip().splitlines()
+        self.assertIn("(+100.0%)", linhas[1])
+        self.assertIn("n/a", linhas[2])
+
+    def test_processo_que_termina_sem_resultado(self):
+        """
+        Testa se a espera pelas métricas termina quando o processo do cenário morre sem enviá-las.
+        """
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        processo = contexto.Process(target=os._exit, args=(3,))
+        processo.start()
+        self.assertIsNone(aguardar_resultado(fila, processo, intervalo=0.1))
+        processo.join()
+        self.assertEqual(processo.exitcode, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
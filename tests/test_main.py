@@ -0,0 +1,362 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import ANY, patch, AsyncMock
+from main import Main
+from src.Item import Item
+
+
+class TestMain(unittest.TestCase):
+    """
+    Classe de testes para a classe Main, cobrindo o processamento das combinações de parâmetros.
+    """
+
+    def setUp(self):
+        patcher = patch('src.Postgre.PoolPostgre')
+        self.mock_postgre = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.main = Main()
+
+    def test_tratar_localidade_sem_rede(self):
+        """
+        Testa se tratar_localidade resolve siglas pela tabela fixa, sem consultar a API.
+        """
+        with patch.object(self.main.repositorio_ibge, 'obter_informacoes_estado') as mock_estado:
+            self.assertEqual(self.main.tratar_localidade("sp"), "35")
+            self.assertEqual(self.main.tratar_localidade("BR"), "BR")
+            self.assertEqual(self.main.tratar_localidade(None), "BR")
+            with self.assertLogs(level='ERROR'):
+                self.assertEqual(self.main.tratar_localidade("ZZ"), "BR")
+            mock_estado.assert_not_called()
+
+    def test_tratar_args_divide_nomes_em_lotes(self):
+        """
+        Testa se tratar_args reduz as grafias ao nome canônico, divide os nomes em lotes e usa [None]
+        quando nenhum nome é informado.
+        """
+        self.main.planejador.max_nomes = 2
+        self.main.nomes_argumento = ["ana", "maria", "jose"]
+        self.main.tratar_args()
+        self.assertEqual(self.main.nomes, [["ANA", "MARIA"], ["JOSE"]])
+
+        self.main.nomes_argumento = ["joão", "JOÃO", " Joao ", "Maria"]
+        self.main.tratar_args()
+        self.assertEqual(self.main.nomes, [["JOAO", "MARIA"]])
+        self.assertEqual(self.main.indice_nomes.expandir(["JOAO"]), ["joão", "JOÃO", " Joao "])
+
+        self.main.nomes_argumento = None
+        self.main.tratar_args()
+        self.assertEqual(self.main.nomes, [[None]])
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_nomes_sem_resultado(self, mock_async):
+        """
+        Testa se mult_ranking registra os nomes que não retornaram linha em nenhuma combinação.
+        """
+        self.configurar_repositorio(mock_async, {
+            ("35", None): [{"nome": "ANA", "res": [{"periodo": "[1990,2000[", "frequencia": 30}]}],
+            ("33", None): [{"nome": "XYZW", "res": [{"periodo": "[1990,2000[", "frequencia": 1}]}],
+        })
+        self.main.mult_ranking([["Ana", "Xyzw", "Qwer"]], ["35", "33"], ["-"], [1990])
+        self.assertEqual(self.main.nomes_sem_resultado, ["Qwer"])
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_linhas_para_cada_grafia(self, mock_async):
+        """
+        Testa se o ranking traz uma linha para cada grafia informada, enquanto o banco recebe só o nome canônico.
+        """
+        self.configurar_repositorio(mock_async, {
+            ("35", None): [{"nome": "JOAO", "res": [{"periodo": "[1990,2000[", "frequencia": 30}]}],
+        })
+        self.main.nomes_argumento = ["joão", "JOÃO"]
+        self.main.tratar_args()
+        self.main.mult_ranking(self.main.nomes, ["35"], ["-"], [1990])
+
+        self.assertEqual(sorted(item.nome for item in self.main.ranking.itens), ["JOÃO", "joão"])
+        self.assertTrue(all(item.frequencia == 30 for item in self.main.ranking.itens))
+        gravados = [item.nome for chamada in self.main.postgre.upsert_data.call_args_list for item in chamada.args[0]]
+        self.assertEqual(gravados, ["JOAO"])
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_expande_decadas_localmente(self, mock_async):
+        """
+        Testa se um lote de nomes é consultado uma única vez por localidade e sexo, gerando itens para todas as décadas.
+        """
+        resposta = [{"nome": "ANA", "res": [{"periodo": "[1980,1990[", "frequencia": 20},
+                                            {"periodo": "[1990,2000[", "frequencia": 30}]}]
+        self.configurar_repositorio(mock_async, {("35", None): resposta})
+
+        self.main.mult_ranking([["Ana"]], ["35"], ["F"], [1980, 1990, 2000])
+
+        mock_async.return_value.obter_ranking.assert_called_once_with(["Ana"], "35", "F", None)
+        frequencias = {item.decada: item.frequencia for item in self.main.ranking.itens}
+        self.assertEqual(frequencias, {1980: 20, 1990: 30, 2000: 0})
+
+    def test_tratar_args_intervalo_de_decadas(self):
+        """
+        Testa se --decada-range é convertido nas décadas do intervalo, somadas às de --decada sem repetições.
+        """
+        self.main.decada_argumento = ["1995"]
+        self.main.intervalo_decadas_argumento = "1980:2005"
+        self.main.tratar_args()
+        self.assertEqual(self.main.decadas, [1990, 1980, 2000])
+
+        self.main.decada_argumento = None
+        self.main.intervalo_decadas_argumento = None
+        self.main.tratar_args()
+        self.assertEqual(self.main.decadas, [None])
+
+    def test_tratar_intervalo_decadas_invalido(self):
+        """
+        Testa se um intervalo inválido é registrado como erro e ignorado.
+        """
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(self.main.tratar_intervalo_decadas("1950-2010"), [])
+        self.assertEqual(self.main.tratar_intervalo_decadas("2010:1990"), [1990, 2000, 2010])
+
+    def test_converter_resposta_ranking(self):
+        """
+        Testa a conversão da resposta do ranking geral em itens.
+        """
+        resposta = [{"res": [{"nome": "MARIA", "frequencia": 100}, {"nome": "JOSE", "frequencia": 50}]}]
+        itens = Main.converter_resposta(([None], "BR", "-", None), resposta)
+        self.assertEqual([item.nome for item in itens], ["MARIA", "JOSE"])
+        self.assertEqual([item.frequencia for item in itens], [100, 50])
+
+    def test_converter_resposta_nomes(self):
+        """
+        Testa a conversão da resposta da API de nomes em itens, calculando a frequência da década.
+        """
+        resposta = [{"nome": "ANA", "res": [{"periodo": "[1990,2000[", "frequencia": 30}]}]
+        itens = Main.converter_resposta((["Ana"], "35", "F", 1990), resposta)
+        self.assertEqual(len(itens), 1)
+        self.assertEqual(itens[0].frequencia, 30)
+        self.assertEqual(itens[0].localidade, "35")
+
+    def configurar_repositorio(self, mock_async, respostas):
+        """
+        Configura o repositório assíncrono simulado para responder conforme o dicionário
+        {(localidade, decada): resposta ou exceção}.
+        """
+        async def obter_ranking(nomes, localidade, sexo, decada):
+            resposta = respostas[(localidade, decada)]
+            if isinstance(resposta, Exception):
+                raise resposta
+            return resposta
+
+        mock_async.return_value.concorrencia = 2
+        mock_async.return_value.obter_ranking = AsyncMock(side_effect=obter_ranking)
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_deduplica_e_ignora_falhas(self, mock_async):
+        """
+        Testa se mult_ranking deduplica os itens, ignora combinações com erro e grava tudo no banco.
+        """
+        resposta = [{"res": [{"nome": "MARIA", "frequencia": 100}]}]
+        self.configurar_repositorio(mock_async, {("BR", None): resposta, ("35", None): resposta,
+                                                 ("BR", 1990): Exception("Timeout"), ("35", 1990): resposta})
+        self.main.postgre.upsert_data.return_value = {"inseridos": 1}
+        self.main.novas_tentativas = 0
+
+        with self.assertLogs(level='ERROR'):
+            resumo = self.main.mult_ranking([[None]], ["BR", "35"], ["-"], [None, 1990])
+
+        self.assertEqual(len(self.main.ranking.itens), 3)
+        inseridos = [item for chamada in self.main.postgre.upsert_data.call_args_list for item in chamada[0][0]]
+        self.assertEqual(len(inseridos), 3)
+        self.assertIsInstance(inseridos[0], Item)
+        self.assertEqual(resumo["falhas"], 1)
+        self.assertEqual(resumo["duplicados"], 0)
+        self.assertEqual(resumo["inseridos"], 1)
+        mock_async.return_value.fechar.assert_called_once()
+
+    @patch('src.Pipeline.random.uniform', return_value=0)
+    @patch('main.AsyncRepositorioIBGE')
+    def test_manifesto_de_falhas_e_repeticao(self, mock_async, mock_uniform):
+        """
+        Testa se as combinações que falham em todas as tentativas vão para o manifesto e se
+        repetir_falhas_anteriores consulta apenas elas, removendo o manifesto quando todas são concluídas.
+        """
+        resposta = [{"res": [{"nome": "MARIA", "frequencia": 100}]}]
+        self.configurar_repositorio(mock_async, {("BR", None): resposta, ("35", None): Exception("Timeout")})
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.main.arquivo_falhas = os.path.join(diretorio.name, "falhas.json")
+
+        with self.assertLogs(level='ERROR'):
+            resumo = self.main.mult_ranking([[None]], ["BR", "35"], ["-"], [None])
+        self.assertEqual(resumo["falhas"], 1)
+        self.assertEqual(resumo["repetidas"], 2)
+        self.assertEqual(mock_async.return_value.obter_ranking.await_count, 4)
+        self.assertEqual([combinacao for combinacao, _ in self.main.falhas], [([None], "35", "-", None)])
+        self.assertTrue(os.path.exists(self.main.arquivo_falhas))
+
+        self.configurar_repositorio(mock_async, {("35", None): resposta})
+        self.main.repetir_falhas_anteriores()
+        mock_async.return_value.obter_ranking.assert_awaited_once_with([None], "35", "-", None)
+        self.assertEqual(self.main.falhas, [])
+        self.assertFalse(os.path.exists(self.main.arquivo_falhas))
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_incremental(self, mock_async):
+        """
+        Testa se o modo incremental serve do banco os nomes atualizados e consulta na API apenas os demais.
+        """
+        resposta = [{"nome": "JOSE", "res": [{"periodo": "[1990,2000[", "frequencia": 7}]}]
+        self.configurar_repositorio(mock_async, {("35", None): resposta})
+        self.main.postgre.buscar_atualizados.return_value = [
+            ("ANA", "35", "F", 1980, 20), ("ANA", "35", "F", 1990, 30), ("JOSE", "35", "F", 1990, 5),
+        ]
+        self.main.incremental = True
+        self.main.idade_maxima = 3600
+
+        self.main.mult_ranking([["Ana", "José"]], ["35"], ["F"], [1980, 1990])
+
+        self.main.postgre.buscar_atualizados.assert_called_once_with({"ANA", "JOSE"}, ["35"], ["F"], [1980, 1990], 3600)
+        mock_async.return_value.obter_ranking.assert_called_once_with(["José"], "35", "F", None)
+        frequencias = {(item.nome, item.decada): item.frequencia for item in self.main.ranking.itens}
+        self.assertEqual(frequencias, {("ANA", 1980): 20, ("ANA", 1990): 30, ("JOSE", 1980): 0, ("JOSE", 1990): 7})
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_incremental_nomes_sem_resultado(self, mock_async):
+        """
+        Testa se nomes sem linhas na API são registrados e, enquanto o registro for recente, não são consultados de novo.
+        """
+        resposta = [{"nome": "JOSE", "res": [{"periodo": "[1990,2000[", "frequencia": 7}]}]
+        self.configurar_repositorio(mock_async, {("35", None): resposta})
+        self.main.postgre.buscar_atualizados.return_value = []
+        self.main.postgre.nomes_sem_resultado_atualizados.return_value = {("XPTO", "35", "F")}
+        self.main.incremental = True
+        self.main.idade_maxima = 3600
+
+        self.main.mult_ranking([["José", "Xpto", "Zzyx"]], ["35"], ["F"], [1990])
+
+        self.main.postgre.nomes_sem_resultado_atualizados.assert_called_once_with(
+            {"JOSE", "XPTO", "ZZYX"}, ["35"], ["F"], 3600)
+        mock_async.return_value.obter_ranking.assert_called_once_with(["José", "Zzyx"], "35", "F", None)
+        self.main.postgre.registrar_nomes_sem_resultado.assert_called_once_with([("ZZYX", "35", "F")])
+        self.assertEqual({item.nome for item in self.main.ranking.itens}, {"JOSE"})
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_somas_em_intervalo(self, mock_async):
+        """
+        Testa se a frequência de cada nome é somada nos intervalos de anos pedidos, a partir da mesma resposta.
+        """
+        resposta = [{"nome": "ANA", "res": [{"periodo": "1930[", "frequencia": 1},
+                                            {"periodo": "[1970,1980[", "frequencia": 10},
+                                            {"periodo": "[1980,1990[", "frequencia": 20},
+                                            {"periodo": "[1990,2000[", "frequencia": 30}]}]
+        self.configurar_repositorio(mock_async, {("35", None): resposta})
+        self.main.intervalos_soma = [self.main.tratar_intervalo_soma("1999:1970"), (1900, 1929)]
+
+        self.main.mult_ranking([["Ana"]], ["35"], ["F"], [None])
+
+        self.assertEqual(self.main.somas_intervalo, {("ANA", "35", "F", 1970, 1999): 60, ("ANA", "35", "F", 1900, 1929): 1})
+        with self.assertLogs(level='ERROR'):
+            self.assertIsNone(self.main.tratar_intervalo_soma("1970"))
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_mult_ranking_incremental_le_rankings_do_banco(self, mock_async):
+        """
+        Testa se rankings gerais registrados recentemente são lidos do banco e os demais consultados e registrados.
+        """
+        resposta = [{"res": [{"nome": "MARIA", "frequencia": 100}]}]
+        self.configurar_repositorio(mock_async, {("33", None): resposta})
+        self.main.postgre.rankings_atualizados.return_value = {("35", "-", None)}
+        self.main.postgre.buscar.return_value = [("JOSE", "35", "-", None, 300), ("JOSE", "33", "-", None, 1)]
+        self.main.incremental = True
+
+        self.main.mult_ranking([[None]], ["35", "33"], ["-"], [None])
+
+        mock_async.return_value.obter_ranking.assert_called_once_with([None], "33", "-", None)
+        self.assertEqual(self.main.postgre.buscar.call_args[1]["limite"], 20)
+        self.assertEqual({(item.nome, item.localidade) for item in self.main.ranking.itens},
+                         {("JOSE", "35"), ("MARIA", "33")})
+        self.main.postgre.registrar_rankings.assert_called_once_with([("33", "-", None)])
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_ranking_nao_gravado_nao_e_registrado(self, mock_async):
+        """
+        Testa se um ranking cujos itens não chegaram ao banco não é registrado como atualizado e fica entre as falhas.
+        """
+        resposta = [{"res": [{"nome": "MARIA", "frequencia": 100}]}]
+        self.configurar_repositorio(mock_async, {("35", None): resposta, ("33", None): resposta})
+        self.main.novas_tentativas = 0
+        self.main.postgre.upsert_data.side_effect = RuntimeError("conexão perdida")
+        combinacoes = [([None], "35", "-", None), ([None], "33", "-", None)]
+
+        with self.assertLogs(level='ERROR'):
+            self.main.processar_combinacoes(combinacoes, [None])
+
+        self.main.postgre.upsert_data.assert_called_with(ANY, levantar=True)
+        self.main.postgre.registrar_rankings.assert_not_called()
+        self.assertEqual(sorted(combinacao[1] for combinacao, _ in self.main.falhas), ["33", "35"])
+
+        self.main.postgre.upsert_data.side_effect = None
+        self.main.postgre.upsert_data.return_value = {"inseridos": 2}
+        self.main.processar_combinacoes(combinacoes, [None])
+        self.main.postgre.registrar_rankings.assert_called_once()
+        self.assertEqual(sorted(self.main.postgre.registrar_rankings.call_args[0][0]),
+                         [("33", "-", None), ("35", "-", None)])
+        self.assertEqual(self.main.falhas, [])
+
+    def test_banco_aberto_apenas_no_primeiro_uso(self):
+        """
+        Testa se o pool do banco só é criado no primeiro acesso a `postgre`, mantendo uma conexão ociosa para reuso,
+        e fechado apenas se tiver sido aberto.
+        """
+        self.mock_postgre.assert_not_called()
+        self.main.fechar_banco()
+        self.main.postgre
+        self.main.postgre
+        self.mock_postgre.assert_called_once()
+        self.assertEqual(self.mock_postgre.call_args[1]["min_conexoes"], 1)
+        self.main.fechar_banco()
+        self.mock_postgre.return_value.close.assert_called_once()
+
+    @patch('main.AsyncRepositorioIBGE')
+    def test_sem_banco_nao_grava(self, mock_async):
+        """
+        Testa se, com --sem-banco, o ranking é montado sem abrir a conexão com o banco.
+        """
+        resposta = [{"res": [{"nome": "MARIA", "frequencia": 100}]}]
+        self.configurar_repositorio(mock_async, {("35", None): resposta})
+        self.main.sem_banco = True
+
+        self.main.mult_ranking([[None]], ["35"], ["-"], [None])
+
+        self.assertEqual([item.nome for item in self.main.ranking.itens], ["MARIA"])
+        self.mock_postgre.assert_not_called()
+
+    def test_importacao_nao_carrega_modulos_pesados(self):
+        """
+        Testa se importar main não carrega requests, urllib3, psycopg2 nem pyarrow.
+        """
+        codigo = ("import sys, main; print(','.join(m for m in ('requests', 'urllib3', 'psycopg2', 'pyarrow') "
+                  "if m in sys.modules))")
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, check=True)
+        self.assertEqual(resultado.stdout.strip(), "")
+
+    def test_saida_padrao_contem_apenas_o_ranking(self):
+        """
+        Testa se, sem --saida, a saída padrão contém apenas o CSV exportado e o tempo de execução vai para a
+        saída de erro.
+        """
+        from benchmarks.servidor_mock import ServidorMockIBGE
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with ServidorMockIBGE() as servidor:
+            resultado = subprocess.run(
+                [sys.executable, "main.py", "--local", "SP", "--formato", "csv", "--sem-banco", "--sem-cache"],
+                cwd=raiz, capture_output=True, text=True, env=dict(os.environ, IBGE_API_URL=servidor.url))
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+        linhas = resultado.stdout.splitlines()
+        self.assertEqual(linhas[0], "nome,localidade,sexo,decada,frequencia")
+        self.assertEqual(len(linhas), 21)
+        self.assertIn("Tempo total de execução", resultado.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()